@@ -0,0 +1,82 @@
+"""Time LTTB and min/max downsampling of visitor series against the raw series.
+
+Run from the repository root with the usual environment (no database is
+touched):
+
+    python -m benchmarks.bench_downsample --points 10000 100000 --max-points 800
+"""
+import argparse
+import json
+import numpy as np
+from benchmarks.common import timed
+from services.timeseries_services import downsample, lttb_indices, minmax_indices, series_points
+
+
+def reference_lttb(x, y, threshold):
+    # Straightforward loop version of Largest-Triangle-Three-Buckets.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    every = (n - 2) / (threshold - 2)
+    selected, previous = [0], 0
+    for i in range(threshold - 2):
+        start = int(np.floor(i * every)) + 1
+        end = int(np.floor((i + 1) * every)) + 1
+        next_end = min(int(np.floor((i + 2) * every)) + 1, n)
+        mean_x = np.mean(x[end:next_end])
+        mean_y = np.mean(y[end:next_end])
+        best_area, best = -1.0, start
+        for j in range(start, end):
+            area = abs(
+                (x[previous] - mean_x) * (y[j] - y[previous])
+                - (x[previous] - x[j]) * (mean_y - y[previous])
+            )
+            if area > best_area:
+                best_area, best = area, j
+        selected.append(best)
+        previous = best
+    selected.append(n - 1)
+    return selected
+
+
+def encode(stamps, counts, max_points, method):
+    stamps, counts = downsample(stamps, counts, max_points, method)
+    points = series_points(stamps, counts)
+    return points, json.dumps([point.model_dump(mode="json") for point in points])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--max-points", type=int, default=800)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    x = (np.arange(5000) * 300).astype(np.float64)
+    y = rng.integers(0, 100, 5000).astype(np.float64)
+    matches = np.array_equal(lttb_indices(x, y, 500), reference_lttb(x, y, 500))
+    kept = y[minmax_indices(y, 500)]
+    print(f"lttb matches reference: {matches}")
+    print(f"minmax keeps extremes: {kept.max() == y.max() and kept.min() == y.min()}")
+
+    print(f"{'points':>8} {'method':8} {'returned':>8} {'body':>10} {'time':>9}")
+    for points in args.points:
+        stamps = np.datetime64("2026-01-01T00:00", "s") + np.arange(points) * np.timedelta64(60, "s")
+        counts = rng.integers(0, 80, points)
+        for label, max_points, method in (
+            ("raw", None, "lttb"),
+            ("lttb", args.max_points, "lttb"),
+            ("minmax", args.max_points, "minmax"),
+        ):
+            seconds, (returned, body) = timed(
+                encode, stamps, counts, max_points, method, repeat=args.repeat
+            )
+            print(
+                f"{points:>8} {label:8} {len(returned):>8} "
+                f"{len(body) / 1024:>6.0f} KiB {seconds * 1000:>6.0f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
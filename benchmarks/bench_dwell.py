@@ -0,0 +1,59 @@
+"""Time dwell sessionization on synthetic device frames.
+
+Run from the repository root with the usual environment (only the settings
+are read, no database is touched):
+
+    python -m benchmarks.bench_dwell --frames 1000000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from services.session_services import (
+    dwell_distribution,
+    encode_addresses,
+    seconds_since,
+    sessionize,
+    sighting_order,
+)
+
+
+def synthetic_frames(frames: int, devices: int, zones: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    origin = datetime(2026, 1, 1)
+    offsets = rng.integers(0, 86400, frames)
+    # Each device keeps to one zone, so visits split on time gaps only.
+    devices_seen = rng.integers(0, devices, frames)
+    addrs = [f"aa:bb:cc:{code:06x}" for code in devices_seen]
+    zone_ids = devices_seen % zones + 1
+    moments = [origin + timedelta(seconds=int(offset)) for offset in offsets]
+    return origin, addrs, zone_ids, moments
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=1_000_000)
+    parser.add_argument("--devices", type=int, default=20_000)
+    parser.add_argument("--zones", type=int, default=10)
+    args = parser.parse_args()
+
+    origin, addrs, zone_ids, moments = synthetic_frames(args.frames, args.devices, args.zones)
+
+    started = time.perf_counter()
+    codes = encode_addresses(addrs)
+    seconds = seconds_since(moments, origin)
+    decoded = time.perf_counter()
+
+    order = sighting_order(codes, zone_ids, seconds)
+    visits = sessionize(codes[order], zone_ids[order], seconds[order])
+    distributions = dwell_distribution(visits.zones, visits.dwell_seconds)
+    finished = time.perf_counter()
+
+    print(f"frames      {args.frames}")
+    print(f"visits      {len(visits)} in {len(distributions)} zones")
+    print(f"decode      {decoded - started:.2f} s")
+    print(f"sessionize  {finished - decoded:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
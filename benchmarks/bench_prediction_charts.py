@@ -0,0 +1,78 @@
+"""Time the prediction score chart with ORM rows and with each column layout.
+
+Run from the repository root with the usual environment (data goes to an
+in-memory SQLite database):
+
+    python -m benchmarks.bench_prediction_charts --predictions 1000000
+"""
+import argparse
+import json
+from datetime import datetime
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, joinedload
+from benchmarks.common import sqlite_session, timed
+from database.models import Prediction, Zones
+from schema.chart_schema import PredictionScore
+from services.charts_services import ROW_FIELDS, ROW_FORMATS, _prediction_columns
+from services.columnar_services import columns_response
+
+
+def previous_rows(db: Session) -> bytes:
+    # One ORM object with its joined zone and one model per prediction.
+    predictions = db.query(Prediction).options(joinedload(Prediction.zone)).all()
+    rows = [
+        PredictionScore(
+            zone_name=prediction.zone.name,
+            count=prediction.estimated_count,
+            score=prediction.score,
+        )
+        for prediction in predictions
+    ]
+    body = json.dumps(jsonable_encoder(rows)).encode()
+    db.expunge_all()
+    return body
+
+
+def layout_body(db: Session, layout: str) -> bytes:
+    # The uncached builder, so every layout pays for its own query.
+    return columns_response(_prediction_columns(db), layout, ROW_FIELDS, ROW_FORMATS).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--predictions", type=int, default=1_000_000)
+    parser.add_argument("--zones", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    db = sqlite_session()
+    db.add_all(Zones(name=f"Zone {index}", description="Reading area") for index in range(args.zones))
+    db.flush()
+    zone_ids = [zone_id for (zone_id,) in db.query(Zones.id)]
+    now = datetime.now()
+    db.execute(
+        insert(Prediction),
+        [
+            {
+                "zone_id": zone_ids[index % len(zone_ids)],
+                "score": 0.9,
+                "estimated_count": index % 60,
+                "first_seen": now,
+                "last_seen": now,
+                "scanned_minutes": 5,
+            }
+            for index in range(args.predictions)
+        ],
+    )
+    db.commit()
+
+    seconds, body = timed(previous_rows, db, repeat=args.repeat)
+    print(f"{'previous rows':14} {len(body) / 2 ** 20:6.1f} MiB {seconds:6.2f} s")
+    for layout in ("rows", "columnar", "binary"):
+        seconds, body = timed(layout_body, db, layout, repeat=args.repeat)
+        print(f"{layout:14} {len(body) / 2 ** 20:6.1f} MiB {seconds:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
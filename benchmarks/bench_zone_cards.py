@@ -0,0 +1,145 @@
+"""Compare the previous grouped zone-card queries with the pre-aggregated query.
+
+Run from the repository root with the usual environment (data goes to an
+in-memory SQLite database):
+
+    python -m benchmarks.bench_zone_cards --zones 3 --comments 3000 --predictions 3000
+"""
+import argparse
+from datetime import datetime, timedelta
+from sqlalchemy import and_, case, func, insert
+from sqlalchemy.orm import Session, joinedload
+from benchmarks.common import sqlite_session, timed
+from database.models import Comment, Prediction, User, ZoneImage, Zones
+from services.zone_card_services import build_zone_cards
+
+
+def previous_popular(db: Session):
+    # One join across comments and images, grouped per zone.
+    return (
+        db.query(
+            Zones,
+            func.avg(Comment.rating).label("average_rating"),
+            func.min(ZoneImage.image_url).label("image_url"),
+        )
+        .outerjoin(Comment)
+        .outerjoin(ZoneImage)
+        .group_by(Zones.id)
+        .order_by(func.avg(Comment.rating).desc())
+        .options(joinedload(Zones.comment_related))
+        .all()
+    )
+
+
+def previous_recommended(db: Session):
+    # Comments, predictions and images joined together multiply per zone.
+    current_hour = datetime.now().replace(minute=0, second=0, microsecond=0)
+    return (
+        db.query(
+            Zones,
+            func.coalesce(func.avg(Comment.rating), 0.0).label("average_rating"),
+            func.max(ZoneImage.image_url).label("image_url"),
+            func.count(
+                case(
+                    (
+                        and_(
+                            Prediction.first_seen >= current_hour,
+                            Prediction.first_seen < current_hour + timedelta(hours=1),
+                        ),
+                        Prediction.estimated_count,
+                    )
+                )
+            ).label("current_hour_count"),
+        )
+        .outerjoin(Comment)
+        .outerjoin(Prediction)
+        .outerjoin(ZoneImage)
+        .group_by(Zones.id)
+        .order_by(Zones.id)
+        .options(joinedload(Zones.predictions))
+        .all()
+    )
+
+
+def previous_all_sections(db: Session):
+    return (
+        db.query(
+            Zones,
+            func.coalesce(func.avg(Comment.rating), 0.0).label("average_rating"),
+            func.max(ZoneImage.image_url).label("image_url"),
+        )
+        .outerjoin(Comment)
+        .outerjoin(ZoneImage)
+        .group_by(Zones.id)
+        .all()
+    )
+
+
+def seed(db: Session, zones: int, comments: int, predictions: int) -> None:
+    user = User(username="bench", email="bench@example.com", first_name="Bench", last_name="User")
+    db.add(user)
+    db.flush()
+
+    now = datetime.now()
+    for index in range(zones):
+        ratings = [(index + k) % 5 + 1 for k in range(comments)]
+        zone = Zones(
+            name=f"Zone {index}",
+            description="A quiet reading area with tables for study",
+            rating_sum=sum(ratings),
+            rating_count=len(ratings),
+        )
+        db.add(zone)
+        db.flush()
+        db.add_all(ZoneImage(zone_id=zone.id, image_url=f"{zone.id}-{k}.jpg") for k in range(2))
+        db.execute(
+            insert(Comment),
+            [{"user_id": user.id, "zone_id": zone.id, "comment": "Quiet", "rating": rating} for rating in ratings],
+        )
+        db.execute(
+            insert(Prediction),
+            [
+                {
+                    "zone_id": zone.id,
+                    "score": 0.9,
+                    "estimated_count": k % 60,
+                    "first_seen": now - timedelta(minutes=15 * k),
+                    "last_seen": now - timedelta(minutes=15 * k - 5),
+                    "scanned_minutes": 5,
+                }
+                for k in range(predictions)
+            ],
+        )
+    db.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--zones", type=int, default=3)
+    parser.add_argument("--comments", type=int, default=3000)
+    parser.add_argument("--predictions", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    db = sqlite_session()
+    seed(db, args.zones, args.comments, args.predictions)
+
+    for label, query in (
+        ("previous popular", previous_popular),
+        ("previous recommended", previous_recommended),
+        ("previous all-sections", previous_all_sections),
+    ):
+        seconds, rows = timed(query, db, repeat=args.repeat)
+        db.expunge_all()
+        print(f"{label:24} {seconds * 1000:10.1f} ms")
+
+    seconds, cards = timed(build_zone_cards, db, repeat=args.repeat)
+    print(f"{'zone cards':24} {seconds * 1000:10.1f} ms")
+
+    expected = {zone.id: round(rating or 0.0, 2) for zone, rating, _ in previous_all_sections(db)}
+    ratings_match = all(round(card.average_rating, 2) == expected[card.zone_id] for card in cards)
+    print(f"ratings match: {ratings_match}")
+
+
+if __name__ == "__main__":
+    main()
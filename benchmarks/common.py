@@ -0,0 +1,23 @@
+import time
+from typing import Any, Callable, Tuple
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from database.models import Base
+
+
+def sqlite_session(path: str = "") -> Session:
+    # Benchmarks build their own data and never touch the configured database.
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def timed(function: Callable[..., Any], *args, repeat: int = 3, **kwargs) -> Tuple[float, Any]:
+    """Best wall time in seconds over ``repeat`` calls, and the last result."""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
@@ -28,11 +28,54 @@ ALGORITHM = get_env_variable("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = expiration_token
 ZONE_UPLOAD_DIRECTORY = get_env_variable("ZONE_UPLOAD_DIRECTORY")
 PROFILE_UPLOAD_DIRECTORY = get_env_variable("PROFILE_UPLOAD_DIRECTORY")
+MAX_UPLOAD_SIZE_BYTES = int(get_env_variable("MAX_UPLOAD_SIZE_MB", 10)) * 1024 * 1024
+IMAGE_VARIANT_DIRECTORY = get_env_variable("IMAGE_VARIANT_DIRECTORY", "static/variants")
+IMAGE_VARIANT_CACHE_BYTES = int(get_env_variable("IMAGE_VARIANT_CACHE_MB", 512)) * 1024 * 1024
+IMAGE_WORKERS = int(get_env_variable("IMAGE_WORKERS", 2))
 SMTP_SERVER = get_env_variable("SMTP_SERVER")
 SMTP_USERNAME = get_env_variable("SMTP_USERNAME")
 SMTP_PASSWORD = get_env_variable("SMTP_PASSWORD")
 SMTP_PORT = get_env_variable("SMTP_PORT")
 
+ZONE_CARD_SYNC_SECONDS = int(get_env_variable("ZONE_CARD_SYNC_SECONDS", 60))
+ZONE_CARD_REBUILD_SECONDS = int(get_env_variable("ZONE_CARD_REBUILD_SECONDS", 3600))
+RATING_RECONCILE_SECONDS = int(get_env_variable("RATING_RECONCILE_SECONDS", 3600))
+POPULARITY_REFRESH_SECONDS = int(get_env_variable("POPULARITY_REFRESH_SECONDS", 300))
+POPULARITY_VISITOR_DAYS = int(get_env_variable("POPULARITY_VISITOR_DAYS", 7))
+POPULARITY_PRIOR_WEIGHT = float(get_env_variable("POPULARITY_PRIOR_WEIGHT", 10))
+SEARCH_INDEX_REBUILD_SECONDS = int(get_env_variable("SEARCH_INDEX_REBUILD_SECONDS", 300))
+SYNC_OVERLAP_SECONDS = int(get_env_variable("SYNC_OVERLAP_SECONDS", 5))
+SYNC_TOMBSTONE_RETENTION_DAYS = int(get_env_variable("SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+SYNC_TOMBSTONE_PRUNE_SECONDS = int(get_env_variable("SYNC_TOMBSTONE_PRUNE_SECONDS", 86400))
+PREDICTION_ROLLUP_SECONDS = int(get_env_variable("PREDICTION_ROLLUP_SECONDS", 60))
+PREDICTION_ROLLUP_BATCH_SIZE = int(get_env_variable("PREDICTION_ROLLUP_BATCH_SIZE", 5000))
+PIPELINE_GAP_SECONDS = int(get_env_variable("PIPELINE_GAP_SECONDS", 300))
+TIMESERIES_MAX_POINTS = int(get_env_variable("TIMESERIES_MAX_POINTS", 2000))
+TIMESERIES_MAX_RAW_POINTS = int(get_env_variable("TIMESERIES_MAX_RAW_POINTS", 200000))
+# "memory" keeps entries and tag versions per process, so an invalidation only
+# reaches the worker that made the write; others serve stale entries until
+# their TTL runs out. Use "redis" when running more than one worker.
+CACHE_BACKEND = get_env_variable("CACHE_BACKEND", "memory")
+CACHE_REDIS_URL = get_env_variable("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_MAX_ENTRIES = int(get_env_variable("CACHE_MAX_ENTRIES", 1024))
+CACHE_DEFAULT_TTL_SECONDS = int(get_env_variable("CACHE_DEFAULT_TTL_SECONDS", 300))
+CACHE_INGEST_CHECK_SECONDS = int(get_env_variable("CACHE_INGEST_CHECK_SECONDS", 30))
+CACHE_REFRESH_WORKERS = int(get_env_variable("CACHE_REFRESH_WORKERS", 2))
+DASHBOARD_CACHE_TTL_SECONDS = int(get_env_variable("DASHBOARD_CACHE_TTL_SECONDS", 60))
+DASHBOARD_MAX_STALE_SECONDS = int(get_env_variable("DASHBOARD_MAX_STALE_SECONDS", 900))
+OCCUPANCY_ESTIMATOR_ENABLED = get_env_variable("OCCUPANCY_ESTIMATOR_ENABLED", "false").lower() in ("1", "true", "yes")
+OCCUPANCY_ESTIMATOR_SECONDS = int(get_env_variable("OCCUPANCY_ESTIMATOR_SECONDS", 60))
+OCCUPANCY_WINDOW_SECONDS = int(get_env_variable("OCCUPANCY_WINDOW_SECONDS", 300))
+OCCUPANCY_LATENESS_SECONDS = int(get_env_variable("OCCUPANCY_LATENESS_SECONDS", 120))
+OCCUPANCY_MAX_WINDOWS_PER_BATCH = int(get_env_variable("OCCUPANCY_MAX_WINDOWS_PER_BATCH", 288))
+OCCUPANCY_CONFIDENT_PROBES = int(get_env_variable("OCCUPANCY_CONFIDENT_PROBES", 5))
+SESSION_GAP_SECONDS = int(get_env_variable("SESSION_GAP_SECONDS", 600))
+SESSION_MAX_RANGE_DAYS = int(get_env_variable("SESSION_MAX_RANGE_DAYS", 31))
+DEVICE_CLUSTERING_SECONDS = int(get_env_variable("DEVICE_CLUSTERING_SECONDS", 60))
+DEVICE_CLUSTERING_BATCH_SIZE = int(get_env_variable("DEVICE_CLUSTERING_BATCH_SIZE", 50000))
+DEVICE_CLUSTER_LINK_SECONDS = int(get_env_variable("DEVICE_CLUSTER_LINK_SECONDS", 90))
+DEVICE_CLUSTER_POWER_TOLERANCE = float(get_env_variable("DEVICE_CLUSTER_POWER_TOLERANCE", 8))
+
 DIR_UPLOAD_ZONE_IMG = ZONE_UPLOAD_DIRECTORY.split('/')[1]
 DIR_UPLOAD_PROFILE_IMG = PROFILE_UPLOAD_DIRECTORY.split('/')[1]
 
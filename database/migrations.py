@@ -0,0 +1,123 @@
+import logging
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+# create_all only creates missing tables; columns added to existing tables
+# are brought in here. Each migration checks the live schema first, so the
+# whole list is safe to run on every startup.
+
+
+def _columns(conn: Connection, table: str) -> set:
+    return {column["name"] for column in inspect(conn).get_columns(table)}
+
+
+def _indexes(conn: Connection, table: str) -> set:
+    return {index["name"] for index in inspect(conn).get_indexes(table)}
+
+
+def add_zone_rating_columns(conn: Connection) -> None:
+    if "rating_sum" in _columns(conn, "zones"):
+        return
+    logger.info("Adding rating aggregate columns to zones")
+    conn.execute(text("ALTER TABLE zones ADD COLUMN rating_sum INTEGER NOT NULL DEFAULT 0"))
+    conn.execute(text("ALTER TABLE zones ADD COLUMN rating_count INTEGER NOT NULL DEFAULT 0"))
+    conn.execute(
+        text(
+            "UPDATE zones SET "
+            "rating_sum = (SELECT COALESCE(SUM(rating), 0) FROM comments WHERE comments.zone_id = zones.id), "
+            "rating_count = (SELECT COUNT(rating) FROM comments WHERE comments.zone_id = zones.id)"
+        )
+    )
+
+
+def add_zone_image_timestamps(conn: Connection) -> None:
+    if "date_added" not in _columns(conn, "zone_images"):
+        logger.info("Adding timestamp columns to zone_images")
+        if conn.dialect.name == "mysql":
+            date_added = "DATETIME DEFAULT CURRENT_TIMESTAMP"
+            update_date = "DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"
+        else:
+            date_added = update_date = "DATETIME"
+        conn.execute(text(f"ALTER TABLE zone_images ADD COLUMN date_added {date_added}"))
+        conn.execute(text(f"ALTER TABLE zone_images ADD COLUMN update_date {update_date}"))
+        # Existing images are dated from their zone; the fresh update_date
+        # makes every delta-sync client fetch them once.
+        conn.execute(
+            text(
+                "UPDATE zone_images SET "
+                "date_added = COALESCE((SELECT zones.date_added FROM zones WHERE zones.id = zone_images.zone_id), CURRENT_TIMESTAMP), "
+                "update_date = CURRENT_TIMESTAMP"
+            )
+        )
+
+    # The delta-sync endpoint scans each family by update_date.
+    for table in ("zones", "zone_images", "comments", "categories"):
+        name = f"ix_{table}_update_date"
+        if name not in _indexes(conn, table):
+            conn.execute(text(f"CREATE INDEX {name} ON {table} (update_date)"))
+
+
+def add_device_indexes(conn: Connection) -> None:
+    # Zone charts and per-device history both filter on date_detected.
+    for name, columns in (
+        ("ix_devices_zone_date_detected", "zone, date_detected"),
+        ("ix_devices_addr_date_detected", "device_addr, date_detected"),
+    ):
+        if name not in _indexes(conn, "devices"):
+            logger.info("Creating index %s", name)
+            conn.execute(text(f"CREATE INDEX {name} ON devices ({columns})"))
+
+
+def add_prediction_indexes(conn: Connection) -> None:
+    # Per-zone prediction charts filter on zone_id and a first_seen range.
+    name = "ix_predictions_zone_first_seen"
+    if name not in _indexes(conn, "predictions"):
+        logger.info("Creating index %s", name)
+        conn.execute(text(f"CREATE INDEX {name} ON predictions (zone_id, first_seen)"))
+
+
+def add_zone_category_constraints(conn: Connection) -> None:
+    name = "uq_zone_category_zone_category"
+    unique = {constraint["name"] for constraint in inspect(conn).get_unique_constraints("zone_category")}
+    # MySQL reports unique constraints as indexes as well.
+    if name not in unique | _indexes(conn, "zone_category"):
+        logger.info("Removing duplicate zone_category links")
+        # The derived table lets MySQL read the table it is deleting from.
+        conn.execute(
+            text(
+                "DELETE FROM zone_category WHERE id NOT IN ("
+                "SELECT id FROM (SELECT MIN(id) AS id FROM zone_category "
+                "GROUP BY zone_id, category_id) AS keep)"
+            )
+        )
+        logger.info("Creating unique index %s", name)
+        conn.execute(text(f"CREATE UNIQUE INDEX {name} ON zone_category (zone_id, category_id)"))
+
+    # Category deletes and renames look up zones by category_id.
+    name = "ix_zone_category_category_id"
+    if name not in _indexes(conn, "zone_category"):
+        logger.info("Creating index %s", name)
+        conn.execute(text(f"CREATE INDEX {name} ON zone_category (category_id)"))
+
+
+MIGRATIONS = [
+    add_zone_rating_columns,
+    add_zone_image_timestamps,
+    add_device_indexes,
+    add_prediction_indexes,
+    add_zone_category_constraints,
+]
+
+
+def run_migrations(engine: Engine) -> None:
+    with engine.begin() as conn:
+        for migration in MIGRATIONS:
+            migration(conn)
+
+
+if __name__ == "__main__":
+    from services.db_services import engine
+
+    run_migrations(engine)
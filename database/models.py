@@ -4,11 +4,15 @@ from sqlalchemy import (
     String,
     Integer,
     ForeignKey,
+    Date,
     DateTime,
     Table,
     Boolean,
     Numeric,
+    Float,
     UniqueConstraint,
+    Index,
+    Text,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -52,6 +56,8 @@ zone_category_association = Table(
     Column("id", Integer, primary_key=True),
     Column("zone_id", Integer, ForeignKey("zones.id")),
     Column("category_id", Integer, ForeignKey("categories.id")),
+    UniqueConstraint("zone_id", "category_id", name="uq_zone_category_zone_category"),
+    Index("ix_zone_category_category_id", "category_id"),
 )
 
 
@@ -61,10 +67,13 @@ class Zones(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String(255))
     description = Column(String(555))
+    rating_sum = Column(Integer, default=0, nullable=False)
+    rating_count = Column(Integer, default=0, nullable=False)
 
     date_added = Column(DateTime(timezone=True), index=True, default=func.now())
     update_date = Column(
         DateTime(timezone=True),
+        index=True,
         server_default=func.current_timestamp(),
         onupdate=func.now(),
     )
@@ -93,12 +102,42 @@ class Zones(Base):
         return f"<Zone(id={self.id}, name={self.name})>"
 
 
+class ZoneCard(Base):
+    __tablename__ = "zone_cards"
+
+    zone_id = Column(Integer, ForeignKey("zones.id", ondelete="CASCADE"), primary_key=True)
+    name = Column(String(255))
+    description = Column(String(555))
+    rating_sum = Column(Integer, default=0, nullable=False)
+    rating_count = Column(Integer, default=0, nullable=False)
+    review_count = Column(Integer, default=0, nullable=False)
+    cover_image = Column(String(255))
+    categories = Column(Text)
+    status = Column(String(50))
+    update_date = Column(
+        DateTime(timezone=True),
+        index=True,
+        server_default=func.current_timestamp(),
+        onupdate=func.now(),
+    )
+
+    def __repr__(self):
+        return f"<ZoneCard(zone_id={self.zone_id}, name={self.name}, status={self.status})>"
+
+
 class ZoneImage(Base):
     __tablename__ = "zone_images"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     image_url = Column(String(255))
     zone_id = Column(Integer, ForeignKey("zones.id"))
+    date_added = Column(DateTime(timezone=True), server_default=func.current_timestamp())
+    update_date = Column(
+        DateTime(timezone=True),
+        index=True,
+        server_default=func.current_timestamp(),
+        onupdate=func.now(),
+    )
 
     zone = relationship("Zones", back_populates="images")
 
@@ -106,6 +145,35 @@ class ZoneImage(Base):
         return f"<ZoneImage(id={self.id}, zone_id={self.zone_id}, image_url={self.image_url})>"
 
 
+class ImageBlob(Base):
+    __tablename__ = "image_blobs"
+
+    kind = Column(String(20), primary_key=True)
+    filename = Column(String(255), primary_key=True)
+    content_hash = Column(String(64), nullable=False)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, default=0, nullable=False)
+    date_added = Column(DateTime(timezone=True), server_default=func.current_timestamp())
+
+    def __repr__(self):
+        return f"<ImageBlob(kind={self.kind}, filename={self.filename}, ref_count={self.ref_count})>"
+
+
+class Tombstone(Base):
+    __tablename__ = "tombstones"
+    __table_args__ = (Index("ix_tombstones_entity_deleted_at", "entity", "deleted_at"),)
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    entity = Column(String(50), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    deleted_at = Column(
+        DateTime(timezone=True), index=True, server_default=func.current_timestamp()
+    )
+
+    def __repr__(self):
+        return f"<Tombstone(entity={self.entity}, entity_id={self.entity_id}, deleted_at={self.deleted_at})>"
+
+
 class Comment(Base):
 
     __tablename__ = "comments"
@@ -122,6 +190,7 @@ class Comment(Base):
     )
     update_date = Column(
         DateTime(timezone=True),
+        index=True,
         server_default=func.current_timestamp(),
         onupdate=func.now(),
     )
@@ -143,6 +212,7 @@ class Category(Base):
     )
     update_date = Column(
         DateTime(timezone=True),
+        index=True,
         server_default=func.current_timestamp(),
         onupdate=func.now(),
     )
@@ -158,6 +228,10 @@ class Category(Base):
 class Device(Base):
 
     __tablename__ = "devices"
+    __table_args__ = (
+        Index("ix_devices_zone_date_detected", "zone", "date_detected"),
+        Index("ix_devices_addr_date_detected", "device_addr", "date_detected"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     device_addr = Column(String(255), index=True)
@@ -193,6 +267,9 @@ class VerificationCode(Base):
 
 class Prediction(Base):
     __tablename__ = "predictions"
+    __table_args__ = (
+        Index("ix_predictions_zone_first_seen", "zone_id", "first_seen"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     zone_id = Column(Integer, ForeignKey("zones.id"), index=True)
@@ -206,3 +283,96 @@ class Prediction(Base):
 
     def __repr__(self):
         return f"<Prediction(id={self.id}, zone_id={self.zone_id}, estimated_count={self.estimated_count}, first_seen={self.first_seen}, last_seen={self.last_seen}, scanned_minutes={self.scanned_minutes})>"
+
+
+class PredictionHourly(Base):
+    __tablename__ = "prediction_hourly"
+    __table_args__ = (Index("ix_prediction_hourly_bucket_start", "bucket_start"),)
+
+    zone_id = Column(Integer, ForeignKey("zones.id", ondelete="CASCADE"), primary_key=True)
+    bucket_start = Column(DateTime(), primary_key=True)
+    visitor_count = Column(Integer, default=0, nullable=False)
+    prediction_count = Column(Integer, default=0, nullable=False)
+    scanned_minutes = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<PredictionHourly(zone_id={self.zone_id}, bucket_start={self.bucket_start}, visitor_count={self.visitor_count})>"
+
+
+class PredictionDaily(Base):
+    __tablename__ = "prediction_daily"
+    __table_args__ = (Index("ix_prediction_daily_bucket_date", "bucket_date"),)
+
+    zone_id = Column(Integer, ForeignKey("zones.id", ondelete="CASCADE"), primary_key=True)
+    bucket_date = Column(Date(), primary_key=True)
+    visitor_count = Column(Integer, default=0, nullable=False)
+    prediction_count = Column(Integer, default=0, nullable=False)
+    scanned_minutes = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<PredictionDaily(zone_id={self.zone_id}, bucket_date={self.bucket_date}, visitor_count={self.visitor_count})>"
+
+
+class PipelineState(Base):
+    __tablename__ = "pipeline_state"
+
+    name = Column(String(64), primary_key=True)
+    last_id = Column(Integer, default=0, nullable=False)
+    update_date = Column(
+        DateTime(timezone=True),
+        server_default=func.current_timestamp(),
+        onupdate=func.now(),
+    )
+
+    def __repr__(self):
+        return f"<PipelineState(name={self.name}, last_id={self.last_id})>"
+
+
+class ResourceVersion(Base):
+    __tablename__ = "resource_versions"
+
+    family = Column(String(64), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+    update_date = Column(
+        DateTime(timezone=True),
+        server_default=func.current_timestamp(),
+        onupdate=func.now(),
+    )
+
+    def __repr__(self):
+        return f"<ResourceVersion(family={self.family}, version={self.version})>"
+
+
+class EstimatorWatermark(Base):
+    __tablename__ = "estimator_watermarks"
+
+    zone_id = Column(Integer, ForeignKey("zones.id", ondelete="CASCADE"), primary_key=True)
+    window_end = Column(DateTime(), nullable=False)
+    update_date = Column(
+        DateTime(timezone=True),
+        server_default=func.current_timestamp(),
+        onupdate=func.now(),
+    )
+
+    def __repr__(self):
+        return f"<EstimatorWatermark(zone_id={self.zone_id}, window_end={self.window_end})>"
+
+
+class DeviceCluster(Base):
+    __tablename__ = "device_clusters"
+    __table_args__ = (
+        Index("ix_device_clusters_last_seen", "last_seen"),
+    )
+
+    device_addr = Column(String(255), primary_key=True)
+    cluster_id = Column(String(255), index=True, nullable=False)
+    zone = Column(Integer, ForeignKey("zones.id"))
+    frame_type = Column(String(255))
+    first_seen = Column(DateTime(), nullable=False)
+    last_seen = Column(DateTime(), nullable=False)
+    device_power = Column(Float)
+    frame_count = Column(Integer, default=0, nullable=False)
+    has_successor = Column(Boolean, default=False, nullable=False)
+
+    def __repr__(self):
+        return f"<DeviceCluster(device_addr={self.device_addr}, cluster_id={self.cluster_id})>"
@@ -3,6 +3,7 @@ from fastapi import FastAPI
 from routes.auth_route import auth_router
 from routes.zone_route import zone_router
 from database.models import Base
+from database.migrations import run_migrations
 from services.db_services import engine
 from routes.comment_route import comment_router
 from routes.prediction_route import prediction_router
@@ -10,14 +11,41 @@ from routes.users_route import users_router
 from routes.websocket_routes import count_route, realsocket_router
 from routes.device_route import device_router
 from routes.chart_routes import charts_router
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from routes.category_routes import category_router
-from fastapi.staticfiles import StaticFiles
+from services.static_services import ContentAddressedStaticFiles
 from routes.generate_route import generate_report_router
+from routes.image_route import image_router
+from routes.sync_route import sync_router
+from routes.cache_route import cache_router
+from services.scheduler_services import scheduler
+from services.zone_card_services import zone_card_store
+from services.rating_services import reconcile_zone_ratings
+from services.popularity_services import popularity_index
+from services.image_services import image_processor
+from services.sync_services import prune_tombstones
+from services.search_services import search_index
+from services.rollup_services import apply_new_predictions
+from services.visitor_services import ingest_watcher, warm_dashboard_cache
+from services.cache_services import cache_refresher
+from services.estimator_services import run_estimator
+from services.cluster_services import cluster_new_devices
+from config.settings import (
+    ZONE_CARD_SYNC_SECONDS,
+    RATING_RECONCILE_SECONDS,
+    POPULARITY_REFRESH_SECONDS,
+    SYNC_TOMBSTONE_PRUNE_SECONDS,
+    SEARCH_INDEX_REBUILD_SECONDS,
+    PREDICTION_ROLLUP_SECONDS,
+    CACHE_INGEST_CHECK_SECONDS,
+    OCCUPANCY_ESTIMATOR_ENABLED,
+    OCCUPANCY_ESTIMATOR_SECONDS,
+    DEVICE_CLUSTERING_SECONDS,
+)
 
 
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 
 
 app = FastAPI(
@@ -26,9 +54,34 @@ app = FastAPI(
     version="1.0.0",
 )
 
+scheduler.add_job("zone_cards", ZONE_CARD_SYNC_SECONDS, zone_card_store.sync)
+scheduler.add_job("zone_ratings", RATING_RECONCILE_SECONDS, reconcile_zone_ratings)
+scheduler.add_job("popularity_index", POPULARITY_REFRESH_SECONDS, popularity_index.recompute)
+scheduler.add_job("search_index", SEARCH_INDEX_REBUILD_SECONDS, search_index.rebuild)
+scheduler.add_job("sync_tombstones", SYNC_TOMBSTONE_PRUNE_SECONDS, prune_tombstones)
+scheduler.add_job("prediction_rollups", PREDICTION_ROLLUP_SECONDS, apply_new_predictions)
+scheduler.add_job("cache_ingest", CACHE_INGEST_CHECK_SECONDS, ingest_watcher.check)
+scheduler.add_job("device_clustering", DEVICE_CLUSTERING_SECONDS, cluster_new_devices)
+scheduler.add_startup_job("dashboard_warmup", warm_dashboard_cache)
+if OCCUPANCY_ESTIMATOR_ENABLED:
+    scheduler.add_job("occupancy_estimator", OCCUPANCY_ESTIMATOR_SECONDS, run_estimator)
+
+
+@app.on_event("startup")
+async def start_background_jobs():
+    await scheduler.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_jobs():
+    await scheduler.stop()
+    image_processor.shutdown()
+    cache_refresher.shutdown()
+
+
 app.mount(
     "/static",
-    app=StaticFiles(directory="static"),
+    app=ContentAddressedStaticFiles(directory="static"),
     name="static",
 )
 
@@ -52,3 +105,6 @@ app.include_router(prediction_router, prefix="/api/v1", tags=["Predictions"])
 app.include_router(charts_router, prefix="/api/v1", tags=["Charts"])
 app.include_router(category_router, prefix="/api/v1", tags=["Category"])
 app.include_router(users_router, prefix="/api/v1", tags=["Users"])
+app.include_router(image_router, prefix="/api/v1", tags=["Images"])
+app.include_router(sync_router, prefix="/api/v1", tags=["Sync"])
+app.include_router(cache_router, prefix="/api/v1", tags=["Cache"])
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, File, Form, UploadFile
-from config.settings import DIR_UPLOAD_PROFILE_IMG
+from typing import Optional
+from fastapi import APIRouter, Depends, File, Form, Query, UploadFile
+from starlette.concurrency import run_in_threadpool
 from schema.auth_schema import *
 from schema.user_schema import UserCreate
 from sqlalchemy.orm import Session
 from services.auth_services import *
 from services.db_services import get_db
+from services.upload_services import save_upload
+from services.image_services import PROFILE_IMAGES, ImageSize, profile_image_url
 from database.models import User
 from fastapi.security import OAuth2PasswordRequestForm
 
@@ -42,14 +45,17 @@ class UserResponseData(BaseModel):
     is_active: bool
 
 @auth_router.get("/users/me", response_model=UserResponseData)
-async def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(
+    size: Optional[ImageSize] = Query(None),
+    current_user: User = Depends(get_current_user),
+):
     return UserResponseData(
         id=current_user.id,
         email=current_user.email,
         username=current_user.username,
         first_name=current_user.first_name,
         last_name=current_user.last_name,
-        profile_img=f"/static/{DIR_UPLOAD_PROFILE_IMG}/{current_user.profile_img}",
+        profile_img=profile_image_url(current_user.profile_img, size),
         is_superuser=current_user.is_superuser,
         is_staff=current_user.is_staff,
         is_active=current_user.is_active,
@@ -80,7 +86,7 @@ def change_password_email(
 
 
 @auth_router.put("/users/me/update", response_model=UpdateProfile)
-def update_profile_route(
+async def update_profile_route(
     user_id: int,
     current_user: str = Depends(get_current_user),
     email: str = Form(...),
@@ -89,6 +95,10 @@ def update_profile_route(
     profile_img: UploadFile = File(None),
     db: Session = Depends(get_db),
 ):
+    stored_img = (
+        await save_upload(profile_img, PROFILE_IMAGES) if profile_img else None
+    )
+
     try:
         profile = UpdateProfile(
             email=email,
@@ -97,10 +107,11 @@ def update_profile_route(
             user_id=user_id,
         )
 
-        return update_profile_service(
+        return await run_in_threadpool(
+            update_profile_service,
             db=db,
             update_profile_data=profile,
-            profile_img=profile_img,
+            profile_img=stored_img,
         )
     except Exception as e:
         raise HTTPException(
@@ -0,0 +1,21 @@
+from typing import Dict
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+from database.models import User
+from services.auth_services import get_current_user
+from services.cache_services import cache_metrics
+
+cache_router = APIRouter()
+
+
+class CacheStatsResponse(BaseModel):
+    hits: int
+    stale: int
+    misses: int
+    coalesced: int
+    hit_rate: float
+
+
+@cache_router.get("/cache/stats", response_model=Dict[str, CacheStatsResponse])
+def get_cache_stats(current_user: User = Depends(get_current_user)):
+    return cache_metrics.snapshot()
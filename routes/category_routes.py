@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from schema.category_schema import *
 from typing import List
 from services.category_services import *
 from sqlalchemy.orm import Session
 from services.auth_services import get_current_user
 from services.db_services import get_db
+from services.version_services import CATEGORIES, conditional_get
 
 category_router = APIRouter()
 
@@ -22,10 +23,12 @@ async def add_category_route(
 
 
 @category_router.get("/category/", response_model=List[CategoryResponse])
-async def get_prediction_all(
+def get_prediction_all(
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user),
+    etag: str = Depends(conditional_get(CATEGORIES)),
 ) -> List[CategoryResponse]:
+    response.headers["ETag"] = etag
     return get_categories(db=db)
 
 
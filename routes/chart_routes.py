@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query, Response
 from schema.chart_schema import *
-from typing import List
+from typing import List, Optional
 from services.charts_services import *
+from services.columnar_services import ChartLayout, columns_response
+from services.session_services import get_dwell_distribution
+from config.settings import SESSION_GAP_SECONDS
 from sqlalchemy.orm import Session
 from services.auth_services import get_current_user
 from services.db_services import get_db
@@ -10,41 +14,53 @@ charts_router = APIRouter()
 
 
 @charts_router.get("/chart/predictions/score", response_model=List[PredictionScore])
-async def get_prediction_all(
+def get_prediction_all(
+    layout: ChartLayout = Query("rows"),
     db: Session = Depends(get_db),
     current_user: str = Depends(get_current_user),
-) -> List[PredictionScore]:
-    return get_all_predictions_score(db=db)
+) -> Response:
+    return columns_response(
+        get_all_predictions_score(db=db), layout, ROW_FIELDS, ROW_FORMATS
+    )
 
 
 @charts_router.get(
     "/chart/predictions/score/zone/{zone_id}", response_model=List[PredictionScore]
 )
-async def get_predictiom_by_zone(
+def get_predictiom_by_zone(
     zone_id: int,
+    layout: ChartLayout = Query("rows"),
     db: Session = Depends(get_db),
     current_user: str = Depends(get_current_user),
-) -> List[PredictionScore]:
-    return get_prediction_by_zone(db=db, zone_id=zone_id)
+) -> Response:
+    return columns_response(
+        get_prediction_by_zone(db=db, zone_id=zone_id), layout, ROW_FIELDS, ROW_FORMATS
+    )
 
 
 @charts_router.get("/chart/predictions/estimated/", response_model=List[EstimatedCount])
-async def get_prediction_estimated_count(
+def get_prediction_estimated_count(
+    layout: ChartLayout = Query("rows"),
     db: Session = Depends(get_db),
     current_user: str = Depends(get_current_user),
-) -> List[EstimatedCount]:
-    return get_all_estimated_count(db=db)
+) -> Response:
+    return columns_response(
+        get_all_estimated_count(db=db), layout, ROW_FIELDS, ROW_FORMATS
+    )
 
 
 @charts_router.get(
     "/chart/predictions/estimated/zone/{zone_id}", response_model=List[EstimatedCount]
 )
-async def get_prediction_estimated_count(
+def get_prediction_estimated_count(
     zone_id: int,
+    layout: ChartLayout = Query("rows"),
     db: Session = Depends(get_db),
     current_user: str = Depends(get_current_user),
-) -> List[EstimatedCount]:
-    return get_estimated_count_by_zone(db=db, zone_id=zone_id)
+) -> Response:
+    return columns_response(
+        get_estimated_count_by_zone(db=db, zone_id=zone_id), layout, ROW_FIELDS, ROW_FORMATS
+    )
 
 
 from database.models import User
@@ -53,9 +69,21 @@ from database.models import User
     "/charts/prediction/daily/zone/{zone_id}",
     response_model=List[DailyVisitorsData],
 )
-async def get_daily_visitors_per_section(
+def get_daily_visitors_per_section(
     zone_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> List[DailyVisitorsData]:
-    return get_daily_visitors_by_section(db=db, zone_id=zone_id)
\ No newline at end of file
+    return get_daily_visitors_by_section(db=db, zone_id=zone_id)
+
+
+@charts_router.get("/chart/dwell", response_model=List[DwellDistribution])
+def get_dwell_time_distribution(
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    zone: Optional[int] = Query(None),
+    gap_minutes: int = Query(SESSION_GAP_SECONDS // 60, ge=1, le=240),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> List[DwellDistribution]:
+    return get_dwell_distribution(db, start, end, zone, gap_minutes * 60)
\ No newline at end of file
@@ -1,5 +1,8 @@
+from datetime import datetime
+from typing import Optional
 from fastapi import APIRouter, Depends, Query
-from services.device_services import get_all_devices
+from fastapi.responses import StreamingResponse
+from services.device_services import get_all_devices, iter_device_export
 from services.db_services import get_db
 from sqlalchemy.orm import Session
 from database.models import User
@@ -13,6 +16,50 @@ def get_devices(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     page: int = Query(1, ge=1),
-    limit: int = Query(500, gt=0)
+    limit: int = Query(500, gt=0),
+    exact: bool = Query(False),
+    zone: Optional[int] = Query(None),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    device_addr: Optional[str] = Query(None),
 ) -> dict:
-    return get_all_devices(db=db, page=page, limit=limit)
+    return get_all_devices(
+        db=db,
+        page=page,
+        limit=limit,
+        exact=exact,
+        zone=zone,
+        start=start,
+        end=end,
+        device_addr=device_addr,
+    )
+
+
+@device_router.get("/devices/export")
+def export_devices(
+    current_user: User = Depends(get_current_user),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    zone: Optional[int] = Query(None),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    after_id: int = Query(0, ge=0),
+    gzip: bool = Query(False),
+) -> StreamingResponse:
+    filename = f"devices_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    if gzip:
+        filename = f"{filename}.gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        iter_device_export(
+            export_format=format,
+            zone=zone,
+            start=start,
+            end=end,
+            after_id=after_id,
+            compress=gzip,
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
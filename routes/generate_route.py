@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from database.models import Prediction, Zones, Comment
+from database.models import Prediction, Zones
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime
+from datetime import datetime, timedelta
 from routes.service_utils import (
     create_html_template,
     generate_feedback_chart,
@@ -13,9 +14,14 @@ from routes.service_utils import (
     visitors_count_by_section_chart,
 )
 from services.db_services import get_db
-from typing import List, Dict, Any
+from services.rating_services import average_rating
+from services.session_services import collect_dwell, dwell_distribution
+from services.timeseries_services import MIN_DOWNSAMPLE_POINTS, DownsampleMethod, downsample_indices
+from config.settings import SESSION_MAX_RANGE_DAYS, TIMESERIES_MAX_POINTS
+from typing import List, Dict, Any, Optional
 from sqlalchemy import func, and_
 from io import BytesIO
+import numpy as np
 import pdfkit
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
@@ -30,17 +36,16 @@ def get_feedback_and_satisfaction(db: Session) -> List[Dict[str, Any]]:
     try:
         results = db.query(
             Zones.name.label("zone_name"),
-            func.avg(Comment.rating).label("average_rating"),
-            func.count(Comment.id).label("feedback_count"),
-        ).join(Zones, Comment.zone_id == Zones.id) \
-         .group_by(Zones.name) \
+            Zones.rating_sum,
+            Zones.rating_count,
+        ).filter(Zones.rating_count > 0) \
          .order_by(Zones.name).all()
 
         return [
             {
                 "zone_name": r.zone_name,
-                "average_rating": float(r.average_rating),
-                "feedback_count": int(r.feedback_count),
+                "average_rating": average_rating(r.rating_sum, r.rating_count),
+                "feedback_count": int(r.rating_count),
             }
             for r in results
         ]
@@ -51,26 +56,28 @@ def get_feedback_and_satisfaction(db: Session) -> List[Dict[str, Any]]:
         )
 
 def get_average_time_spent_in_zone(db: Session, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+    # Averaged over sessionized visits rather than per-window predictions, so
+    # a long stay counts once at its full length.
     try:
-        results = db.query(
-            Zones.name.label("zone_name"),
-            func.avg(Prediction.scanned_minutes).label("average_time_spent"),
-        ).join(Zones, Prediction.zone_id == Zones.id) \
-         .filter(
-             and_(
-                 func.date(Prediction.first_seen) >= start_date,
-                 func.date(Prediction.first_seen) < end_date,
-             )
-         ).group_by(Zones.name) \
-         .order_by(Zones.name).all()
+        zones, dwell = collect_dwell(db, start_date, end_date)
+        distributions = dwell_distribution(zones, dwell)
+        names = dict(
+            db.query(Zones.id, Zones.name)
+            .filter(Zones.id.in_([d["zone_id"] for d in distributions]))
+            .all()
+        )
 
-        return [
-            {
-                "zone_name": r.zone_name,
-                "average_time_spent": float(r.average_time_spent),
-            }
-            for r in results
-        ]
+        return sorted(
+            (
+                {
+                    "zone_name": names[d["zone_id"]],
+                    "average_time_spent": d["mean_minutes"],
+                }
+                for d in distributions
+                if d["zone_id"] in names
+            ),
+            key=lambda r: r["zone_name"],
+        )
     except SQLAlchemyError:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -177,17 +184,28 @@ def get_visitor_counts_by_section(db: Session, start_date: datetime, end_date: d
 async def generate_pdf_report(
     start_date: str = Query(...),
     end_date: str = Query(...),
+    max_points: Optional[int] = Query(None, ge=MIN_DOWNSAMPLE_POINTS, le=TIMESERIES_MAX_POINTS),
+    method: DownsampleMethod = Query("lttb"),
     db: Session = Depends(get_db),
 ) -> StreamingResponse:
     try:
 
         start_date = datetime.strptime(start_date, "%Y-%m-%d")
         end_date = datetime.strptime(end_date, "%Y-%m-%d")
+        # Dwell times are sessionized from raw device frames, which bounds
+        # the report to the range the dwell endpoint accepts.
+        if end_date - start_date > timedelta(days=SESSION_MAX_RANGE_DAYS):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"The report range may span at most {SESSION_MAX_RANGE_DAYS} days.",
+            )
 
         daily_data = get_daily_visitor_counts(db, start_date, end_date)
         section_data = get_visitor_counts_by_section(db, start_date, end_date)
         peak_hours_data = get_peak_visitor_times(db, start_date, end_date)
-        average_time_spent = get_average_time_spent_in_zone(db, start_date, end_date)
+        average_time_spent = await run_in_threadpool(
+            get_average_time_spent_in_zone, db, start_date, end_date
+        )
         feedback_satisfaction = get_feedback_and_satisfaction(db)
         trends_data = get_visitor_trends(db, start_date, end_date)
 
@@ -197,6 +215,12 @@ async def generate_pdf_report(
                 detail="No daily visitor data found",
             )
 
+        if max_points and len(daily_data) > max_points:
+            stamps = np.array([r["date"] for r in daily_data], dtype="datetime64[m]")
+            counts = np.array([r["total_visits"] for r in daily_data], dtype=np.int64)
+            indices = downsample_indices(stamps, counts, max_points, method)
+            daily_data = [daily_data[i] for i in indices.tolist()]
+
         line_chart_image = generate_seaborn_chart(daily_data)
         bar_chart_image = visitors_count_by_section_chart(section_data)
         chart_image = generate_visitors_trends_chart(trends_data)
@@ -231,6 +255,8 @@ async def generate_pdf_report(
             media_type="application/pdf",
             headers={"Content-Disposition": f"attachment; filename={pdf_filename}"},
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
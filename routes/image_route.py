@@ -0,0 +1,50 @@
+import os
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+from services.image_services import (
+    IMAGE_SOURCES,
+    VARIANT_SIZES,
+    image_processor,
+    parse_variant_name,
+)
+from services.static_services import IMMUTABLE_CACHE_CONTROL
+from services.upload_services import is_content_addressed
+
+image_router = APIRouter()
+
+VARIANT_MEDIA_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+@image_router.get("/images/{kind}/{size}/{name}")
+def get_image_variant(kind: str, size: str, name: str, request: Request):
+    parsed = parse_variant_name(name)
+    if kind not in IMAGE_SOURCES or size not in VARIANT_SIZES or parsed is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+
+    filename, image_format = parsed
+    if not filename or filename != os.path.basename(filename) or filename.startswith("."):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+
+    # Variants of hash-named sources never change, so they are cached for good.
+    headers = {"Cache-Control": "public, max-age=86400"}
+    if is_content_addressed(filename):
+        etag = f'"{os.path.splitext(filename)[0]}-{size}-{image_format}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "ETag": etag}
+
+    try:
+        path = image_processor.get_variant(kind, filename, size, image_format)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+    except OSError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to generate image variant: {str(e)}",
+        )
+
+    return FileResponse(
+        path,
+        media_type=VARIANT_MEDIA_TYPES[image_format],
+        headers=headers,
+    )
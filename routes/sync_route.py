@@ -0,0 +1,19 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from database.models import User
+from schema.sync_schema import SyncChangesResponse
+from services.auth_services import get_current_user
+from services.db_services import get_db
+from services.sync_services import get_changes
+
+sync_router = APIRouter()
+
+
+@sync_router.get("/sync/changes", response_model=SyncChangesResponse)
+def get_sync_changes(
+    sync_token: Optional[str] = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    return get_changes(db=db, sync_token=sync_token)
@@ -1,5 +1,6 @@
 from typing import List
 from fastapi import APIRouter, Depends, UploadFile, File
+from starlette.concurrency import run_in_threadpool
 from schema.auth_schema import *
 from schema.user_schema import (
     AddUserResponse, UserDeleteResponse, UserUpdateResponse, UsersListResponse
@@ -8,6 +9,8 @@ from sqlalchemy.orm import Session
 from services.auth_services import *
 from services.db_services import get_db
 from services.users_services import add_user, delete_user, get_users, update_user
+from services.upload_services import save_upload
+from services.image_services import PROFILE_IMAGES
 from database.models import User
 
 users_router = APIRouter()
@@ -39,7 +42,7 @@ def users_remove(
 
 
 @users_router.put("/users/edit", response_model=UserUpdateResponse)
-def update_user_account(
+async def update_user_account(
     user_id: int,
     username: str,
     email: EmailStr,
@@ -53,9 +56,21 @@ def update_user_account(
     profile_img: Optional[UploadFile] = File(None),
     current_user: User = Depends(get_current_user),
 ):
+    stored_img = None
+    if profile_img:
+        allowed_extensions = {"jpg", "jpeg", "png"}
+        ext = (profile_img.filename or "").split(".")[-1].lower()
+        if ext not in allowed_extensions:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid file type. Only JPEG and PNG are allowed.",
+            )
+        stored_img = await save_upload(profile_img, PROFILE_IMAGES)
+
     try:
-        if profile_img:
-            return update_user(
+        if stored_img:
+            return await run_in_threadpool(
+                update_user,
                 db=db,
                 user_id=user_id,
                 username=username,
@@ -66,10 +81,11 @@ def update_user_account(
                 is_verified=is_verified,
                 is_staff=is_staff,
                 is_active=is_active,
-                profile_img=profile_img,
+                profile_img=stored_img,
             )
         else:
-            return update_user(
+            return await run_in_threadpool(
+                update_user,
                 db=db,
                 user_id=user_id,
                 username=username,
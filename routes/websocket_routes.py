@@ -1,13 +1,33 @@
-from datetime import datetime, timedelta, timezone
-from typing import List
-from fastapi import Depends, APIRouter, WebSocket, WebSocketDisconnect
-from sqlalchemy import and_, func, or_
+from datetime import datetime
+from typing import List, Optional
+from fastapi import Depends, APIRouter, Query, Response, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
 from services.auth_services import get_current_user
+from services.cache_services import set_age_header
 from services.db_services import get_db
 from pydantic import BaseModel
-from database.models import Device, Prediction, User, Zones
+from database.models import Device, User
+from schema.chart_schema import TimeSeriesData
 from services.socket_charts_service import manager
+from services.timeseries_services import (
+    MIN_DOWNSAMPLE_POINTS,
+    DownsampleMethod,
+    Granularity,
+    get_visitor_series,
+    series_points,
+)
+from services.visitor_services import (
+    LAST_DAY,
+    LAST_MONTH,
+    LAST_WEEK,
+    TODAY,
+    count_sections,
+    count_superusers,
+    count_users,
+    get_visitors_count,
+    get_section_utilization_counts,
+)
+from config.settings import TIMESERIES_MAX_POINTS
 import random
 import asyncio
 import logging
@@ -39,11 +59,6 @@ class SectionVsSectionUtilizationResponse(BaseModel):
     percentage: float
 
 
-class TimeSeriesData(BaseModel):
-    count: int
-    timestamp: datetime
-
-
 class RealTimeChartData(BaseModel):
     timestamp: datetime
     count: int
@@ -93,318 +108,145 @@ async def websocket_endpoint(websocket: WebSocket, db: Session = Depends(get_db)
         manager.disconnect(websocket)
 # count staff
 @count_route.get("/detail/count/staff", response_model=DetailsCount)
-async def get_count_staff(
+def get_count_staff(
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    db_count = db.query(User).filter(User.is_superuser == True).count()
-    return DetailsCount(count=db_count, total_type="Total Staff")
+    count = count_superusers(db)
+    set_age_header(response)
+    return DetailsCount(count=count, total_type="Total Staff")
 # count admin
 @count_route.get("/detail/count/admin", response_model=DetailsCount)
-async def get_count_admin(
+def get_count_admin(
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    db_count = db.query(User).filter(User.is_superuser == True).count()
-    return DetailsCount(count=db_count, total_type="Total Admin")
+    count = count_superusers(db)
+    set_age_header(response)
+    return DetailsCount(count=count, total_type="Total Admin")
 # count users
 @count_route.get("/detail/count/users", response_model=DetailsCount)
-async def get_count_users(
+def get_count_users(
+    response: Response,
     db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    db_count = db.query(User).count()
-    return DetailsCount(count=db_count, total_type="Total Users")
+    count = count_users(db)
+    set_age_header(response)
+    return DetailsCount(count=count, total_type="Total Users")
 # count section
 @count_route.get("/detail/count/section", response_model=DetailsCount)
-async def get_count_section(
+def get_count_section(
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    db_count = db.query(Zones).count()
-    return DetailsCount(count=db_count, total_type="Total Sections")
+    count = count_sections(db)
+    set_age_header(response)
+    return DetailsCount(count=count, total_type="Total Sections")
 
 # dashboard
 @count_route.get("/visitors/count/last-month", response_model=VisitorsCount)
-async def get_visitors_count_last_month(
+def get_visitors_count_last_month(
+    response: Response,
     db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    month_start = datetime.now(timezone.utc).replace(
-        hour=0, minute=0, second=0, microsecond=0
-    ) - timedelta(days=30)
-    today_end = datetime.now(timezone.utc).replace(
-        hour=23, minute=59, second=59, microsecond=999999
-    )
-
-    subquery_probe_request = (
-        db.query(Device.device_addr)
-        .filter(
-            and_(
-                Device.date_detected >= month_start,
-                Device.date_detected < today_end,
-                Device.frame_type == "Probe Request"
-            )
-        )
-        .group_by(Device.device_addr)
-        .having(func.count(Device.device_addr) > 25)
-        .subquery()
-    )
-
-    subquery_other_frame = (
-        db.query(Device.device_addr)
-        .filter(
-            and_(
-                Device.date_detected >= month_start,
-                Device.date_detected < today_end,
-                Device.frame_type != "Probe Request"
-            )
-        )
-        .group_by(Device.device_addr)
-        .subquery()
-    )
-
-
-    count = (
-        db.query(func.coalesce(func.count(func.distinct(Device.device_addr)), 0))
-        .filter(
-            or_(
-                Device.device_addr.in_(subquery_probe_request),
-                Device.device_addr.in_(subquery_other_frame)
-            )
-        )
-        .scalar()
-        or 0
-    )
-
+    count = get_visitors_count(db, LAST_MONTH)
+    set_age_header(response)
     return VisitorsCount(count=count, analysis_type="Last Month")
 
 # dashboard
 @count_route.get("/visitors/count/last-day", response_model=VisitorsCount)
-async def get_visitors_count_last_day(
+def get_visitors_count_last_day(
+    response: Response,
     db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    yesterday_start = datetime.now(timezone.utc).replace(
-        hour=0, minute=0, second=0, microsecond=0
-    ) - timedelta(days=1)
-    yesterday_end = yesterday_start + timedelta(days=1)
-
-    subquery_probe_request = (
-        db.query(Device.device_addr)
-        .filter(
-            and_(
-                Device.date_detected >= yesterday_start,
-                Device.date_detected < yesterday_end,
-                Device.frame_type == "Probe Request"
-            )
-        )
-        .group_by(Device.device_addr)
-        .having(func.count(Device.device_addr) > 25)
-        .subquery()
-    )
-
-    subquery_other_frame = (
-        db.query(Device.device_addr)
-        .filter(
-            and_(
-                Device.date_detected >= yesterday_start,
-                Device.date_detected < yesterday_end,
-                Device.frame_type != "Probe Request"
-            )
-        )
-        .group_by(Device.device_addr)
-        .subquery()
-    )
-
-
-    count = (
-        db.query(func.coalesce(func.count(func.distinct(Device.device_addr)), 0))
-        .filter(
-            or_(
-                Device.device_addr.in_(subquery_probe_request),
-                Device.device_addr.in_(subquery_other_frame)
-            )
-        )
-        .scalar()
-        or 0
-    )
-
+    count = get_visitors_count(db, LAST_DAY)
+    set_age_header(response)
     return VisitorsCount(count=count, analysis_type="Last Day")
 # dashboard
 @count_route.get("/visitors/count/last-week", response_model=VisitorsCount)
-async def get_visitors_count_last_week(
+def get_visitors_count_last_week(
+    response: Response,
     db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    week_start = datetime.now(timezone.utc).replace(
-        hour=0, minute=0, second=0, microsecond=0
-    ) - timedelta(days=7)
-    today_end = datetime.now(timezone.utc).replace(
-        hour=23, minute=59, second=59, microsecond=999999
-    )
-
-    subquery_probe_request = (
-        db.query(Device.device_addr)
-        .filter(
-            and_(
-                Device.date_detected >= week_start,
-                Device.date_detected < today_end,
-                Device.frame_type == "Probe Request"
-            )
-        )
-        .group_by(Device.device_addr)
-        .having(func.count(Device.device_addr) > 25)
-        .subquery()
-    )
-
-    subquery_other_frame = (
-        db.query(Device.device_addr)
-        .filter(
-            and_(
-                Device.date_detected >= week_start,
-                Device.date_detected < today_end,
-                Device.frame_type != "Probe Request"
-            )
-        )
-        .group_by(Device.device_addr)
-        .subquery()
-    )
-
-
-    count = (
-        db.query(func.coalesce(func.count(func.distinct(Device.device_addr)), 0))
-        .filter(
-            or_(
-                Device.device_addr.in_(subquery_probe_request),
-                Device.device_addr.in_(subquery_other_frame)
-            )
-        )
-        .scalar()
-        or 0
-    )
-
+    count = get_visitors_count(db, LAST_WEEK)
+    set_age_header(response)
     return VisitorsCount(count=count, analysis_type="Last Week")
 # dashboard
 @count_route.get("/visitors/count/today", response_model=VisitorsCount)
-async def get_visitors_count_today(
+def get_visitors_count_today(
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    today_start = datetime.now(timezone.utc).replace(
-        hour=0, minute=0, second=0, microsecond=0
-    )
-    
-    today_end = today_start + timedelta(days=1)
-
-    subquery_probe_request = (
-        db.query(Device.device_addr)
-        .filter(
-            and_(
-                Device.date_detected >= today_start,
-                Device.date_detected < today_end,
-                Device.frame_type == "Probe Request"
-            )
-        )
-        .group_by(Device.device_addr)
-        .having(func.count(Device.device_addr) > 25)
-        .subquery()
-    )
-
-    subquery_other_frame = (
-        db.query(Device.device_addr)
-        .filter(
-            and_(
-                Device.date_detected >= today_start,
-                Device.date_detected < today_end,
-                Device.frame_type != "Probe Request"
-            )
-        )
-        .group_by(Device.device_addr)
-        .subquery()
-    )
-
-
-    count = (
-        db.query(func.coalesce(func.count(func.distinct(Device.device_addr)), 0))
-        .filter(
-            or_(
-                Device.device_addr.in_(subquery_probe_request),
-                Device.device_addr.in_(subquery_other_frame)
-            )
-        )
-        .scalar()
-        or 0
-    )
-
+    count = get_visitors_count(db, TODAY)
+    set_age_header(response)
     return VisitorsCount(count=count, analysis_type="Today")
 
 @count_route.get(
     "/section/utilization", response_model=List[SectionUtilizationResponse]
 )
-async def get_section_utilization(
+def get_section_utilization(
+    response: Response,
     db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
 ) -> List[SectionUtilizationResponse]:
-
-    results = (
-        db.query(
-            Zones.name.label("section_name"),
-            func.sum(Prediction.estimated_count).label("count"),
-        )
-        .join(Zones, Zones.id == Prediction.zone_id)
-        .group_by(Zones.name)
-        .all()
-    )
-
-    section_utilization = [
+    results = get_section_utilization_counts(db)
+    set_age_header(response)
+    return [
         SectionUtilizationResponse(section_name=section_name, count=count)
         for section_name, count in results
     ]
 
-    return section_utilization
+@count_route.get(
+    "/time-series/visitors", response_model=List[TimeSeriesData]
+)
+def get_time_series_visitors(
+    granularity: Granularity = Query("hour"),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    zone: Optional[int] = Query(None),
+    max_points: Optional[int] = Query(None, ge=MIN_DOWNSAMPLE_POINTS, le=TIMESERIES_MAX_POINTS),
+    method: DownsampleMethod = Query("lttb"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> List[TimeSeriesData]:
+    stamps, counts = get_visitor_series(
+        db, granularity, start, end, zone, max_points, method
+    )
+    return series_points(stamps, counts)
 
 @count_route.get(
     "/time-series/per-day/visitors", response_model=List[TimeSeriesData]
 )
-async def get_time_series_visitors_day(
+def get_time_series_visitors_day(
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    zone: Optional[int] = Query(None),
+    max_points: Optional[int] = Query(None, ge=MIN_DOWNSAMPLE_POINTS, le=TIMESERIES_MAX_POINTS),
+    method: DownsampleMethod = Query("lttb"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> List[TimeSeriesData]:
-    result = (
-        db.query(
-            func.date(Prediction.first_seen).label("timestamp"),
-            func.sum(Prediction.estimated_count).label("count"),
-        )
-        .group_by("timestamp")
-        .order_by("timestamp")
-        .all()
+    stamps, counts = get_visitor_series(
+        db, "day", start, end, zone, max_points, method
     )
-
-    time_series_data = [
-        TimeSeriesData(count=row.count, timestamp=row.timestamp) for row in result
-    ]
-    return time_series_data
+    return series_points(stamps, counts)
 
 @count_route.get(
     "/time-series/per-hour/visitors", response_model=List[TimeSeriesData]
 )
-async def get_time_series_visitors_hour(
+def get_time_series_visitors_hour(
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    zone: Optional[int] = Query(None),
+    max_points: Optional[int] = Query(None, ge=MIN_DOWNSAMPLE_POINTS, le=TIMESERIES_MAX_POINTS),
+    method: DownsampleMethod = Query("lttb"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> List[TimeSeriesData]:
-    result = (
-        db.query(
-            func.date_format(Prediction.first_seen, "%Y-%m-%d %H:00:00").label(
-                "timestamp"
-            ),
-            func.sum(Prediction.estimated_count).label("count"),
-        )
-        .group_by("timestamp")
-        .order_by("timestamp")
-        .all()
+    stamps, counts = get_visitor_series(
+        db, "hour", start, end, zone, max_points, method
     )
-
-    time_series_data = [
-        TimeSeriesData(
-            count=int(row.count),
-            timestamp=datetime.strptime(row.timestamp, "%Y-%m-%d %H:%M:%S"),
-        )
-        for row in result
-    ]
-    return time_series_data
+    return series_points(stamps, counts)
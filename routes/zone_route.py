@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, File, UploadFile, Form, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, UploadFile, Form, Query, Response, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from services.db_services import get_db
 from services.zone_services import (
     create_zone,
@@ -13,6 +14,8 @@ from services.zone_services import (
     update_zone,
     delete_zone,
     get_info_zone_service,
+    search_zones_service,
+    get_home_service,
 )
 from schema.zone_schema import (
     AllSectionResponse,
@@ -25,11 +28,21 @@ from schema.zone_schema import (
     ZoneInfoResponse,
     PopularSectionResponse,
     ZoneUpdate,
+    ZoneSearchResponse,
 )
 from typing import List, Optional
 from fastapi.exceptions import HTTPException
 from database.models import User
 from services.auth_services import get_current_user
+from services.upload_services import save_uploads
+from services.image_services import ZONE_IMAGES, ImageSize
+from services.version_services import (
+    CATEGORIES,
+    POPULARITY,
+    RATINGS,
+    ZONES,
+    conditional_get,
+)
 
 zone_router = APIRouter()
 
@@ -38,18 +51,56 @@ zone_router = APIRouter()
 async def view_zones(
     skip: int = 0,
     limit: int = 10,
+    size: Optional[ImageSize] = Query(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    return get_zones(db=db, skip=skip, limit=limit)
+    return get_zones(db=db, skip=skip, limit=limit, size=size)
 
 
 @zone_router.get("/zones/all", response_model=List[AllSectionResponse])
-async def view_zones(
+def view_zones(
+    response: Response,
+    size: Optional[ImageSize] = Query(None),
+    etag: str = Depends(conditional_get(ZONES, CATEGORIES, RATINGS)),
+    db: Session = Depends(get_db),
+):
+    response.headers["ETag"] = etag
+    return get_all_section_section_filters(db=db, size=size)
+
+
+@zone_router.get("/zones/home")
+def get_home(
+    sections: List[str] = Query(["popular", "recommended", "all"]),
+    fields: Optional[List[str]] = Query(None),
+    section_id: Optional[int] = Query(None),
+    popular_limit: Optional[int] = Query(None, gt=0),
+    size: Optional[ImageSize] = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> dict:
+    return get_home_service(
+        db=db,
+        sections=sections,
+        fields=fields,
+        section_id=section_id,
+        popular_limit=popular_limit,
+        size=size,
+    )
+
+
+@zone_router.get("/zones/search", response_model=ZoneSearchResponse)
+def search_zones(
+    q: Optional[str] = Query(None, max_length=200),
+    category_ids: Optional[List[int]] = Query(None),
+    limit: int = Query(20, gt=0, le=100),
+    size: Optional[ImageSize] = Query(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    return get_all_section_section_filters(db=db)
+    return search_zones_service(
+        db=db, query=q, category_ids=category_ids, limit=limit, size=size
+    )
 
 
 @zone_router.post("/zones/", response_model=ZoneResponse)
@@ -61,16 +112,18 @@ async def add_zone(
     db: Session = Depends(get_db),
 ):
     zone = ZoneCreate(name=name, description=description)
-    return create_zone(db=db, zone=zone, files=files)
+    images = await save_uploads(files, ZONE_IMAGES)
+    return await run_in_threadpool(create_zone, db=db, zone=zone, images=images)
 
 
 @zone_router.get("/zones/{zone_id}", response_model=ZoneResponse)
 async def view_zone_details(
     zone_id: int,
+    size: Optional[ImageSize] = Query(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    db_zone = get_zone(db=db, zone_id=zone_id)
+    db_zone = get_zone(db=db, zone_id=zone_id, size=size)
     if db_zone is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Zone not found"
@@ -101,8 +154,9 @@ async def edit_zone(
             name=name, description=description, categories=categories
         )
 
-        db_zone = update_zone(
-            db=db, zone_id=zone_id, zone=zone_update_data, files=files
+        images = await save_uploads(files, ZONE_IMAGES)
+        db_zone = await run_in_threadpool(
+            update_zone, db=db, zone_id=zone_id, zone=zone_update_data, images=images
         )
         return db_zone
 
@@ -116,44 +170,66 @@ async def edit_zone(
 @zone_router.delete("/zones/{zone_id}", response_model=ZoneRemoved)
 async def remove_zone(
     zone_id: int,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    db_zone = delete_zone(db=db, zone_id=zone_id)
+    db_zone = await run_in_threadpool(
+        delete_zone, db=db, zone_id=zone_id, background_tasks=background_tasks
+    )
     return db_zone
 
 
 @zone_router.get("/zones/info/{zone_id}", response_model=ZoneInfoResponse)
 def get_info_zone(
     zone_id: int,
+    comment_page: int = Query(1, ge=1),
+    comment_limit: int = Query(20, gt=0, le=100),
+    size: Optional[ImageSize] = Query(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    return get_info_zone_service(db=db, zone_id=zone_id)
+    return get_info_zone_service(
+        db=db,
+        zone_id=zone_id,
+        comment_page=comment_page,
+        comment_limit=comment_limit,
+        size=size,
+    )
 
 
 @zone_router.get("/zones/popular/", response_model=List[PopularSectionResponse])
 def get_popular_zones(
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    limit: Optional[int] = Query(None, gt=0),
+    size: Optional[ImageSize] = Query(None),
+    etag: str = Depends(conditional_get(ZONES, RATINGS, POPULARITY)),
     db: Session = Depends(get_db),
 ):
-    return get_popular_zones_service(db=db)
+    response.headers["ETag"] = etag
+    return get_popular_zones_service(db=db, limit=limit, size=size)
 
 
 @zone_router.get("/zones/recommended/", response_model=List[RecommendSectionResponse])
 def get_recommended_zones(
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    size: Optional[ImageSize] = Query(None),
+    etag: str = Depends(conditional_get(ZONES, RATINGS)),
     db: Session = Depends(get_db),
 ):
-    return get_recommended_zones_service(db=db)
+    response.headers["ETag"] = etag
+    return get_recommended_zones_service(db=db, size=size)
 
 
 @zone_router.get("/web/zones/all", response_model=List[AllSectionWebApi])
-async def view_zones(
-    current_user: User = Depends(get_current_user),
+def view_zones(
+    response: Response,
+    size: Optional[ImageSize] = Query(None),
+    etag: str = Depends(conditional_get(ZONES, CATEGORIES)),
     db: Session = Depends(get_db),
 ):
-    return get_all_zones(db=db)
+    response.headers["ETag"] = etag
+    return get_all_zones(db=db, size=size)
 
 
 
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from decimal import Decimal
 from datetime import datetime
+from typing import List, Optional
 
 
 class EstimatedCount(BaseModel):
@@ -14,6 +15,10 @@ class ChartData(BaseModel):
     last_seen: datetime
     scanned_minutes: int   
 
+class TimeSeriesData(BaseModel):
+    count: int
+    timestamp: datetime
+
 class ChartDataResponse(BaseModel):
     count: int
     time: str
@@ -21,4 +26,18 @@ class ChartDataResponse(BaseModel):
 class PredictionScore(BaseModel):
     zone_name: str
     count: int
-    score: Decimal
\ No newline at end of file
+    score: Decimal
+
+class DwellBucket(BaseModel):
+    min_minutes: int
+    max_minutes: Optional[int]
+    visits: int
+
+class DwellDistribution(BaseModel):
+    zone_id: int
+    zone_name: str
+    visits: int
+    mean_minutes: float
+    median_minutes: float
+    p90_minutes: float
+    histogram: List[DwellBucket]
\ No newline at end of file
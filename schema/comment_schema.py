@@ -31,6 +31,7 @@ class CommentZoneInfo(BaseModel):
 
 class CommentUpdate(BaseModel):
     comment: str
+    rating: Optional[int] = None
 
 
 class CommentWithUserResponse(BaseModel):
@@ -0,0 +1,73 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class SyncZone(BaseModel):
+    id: int
+    name: str
+    description: Optional[str]
+    category_ids: List[int]
+    total_rating: float
+    total_reviews: int
+    date_added: Optional[datetime]
+    update_date: Optional[datetime]
+
+
+class SyncZoneImage(BaseModel):
+    id: int
+    zone_id: Optional[int]
+    image_url: str
+    update_date: Optional[datetime]
+
+
+class SyncCategory(BaseModel):
+    id: int
+    category_name: str
+    date_added: Optional[datetime]
+    update_date: Optional[datetime]
+
+
+class SyncComment(BaseModel):
+    id: int
+    zone_id: Optional[int]
+    user_id: Optional[int]
+    first_name: Optional[str]
+    last_name: Optional[str]
+    comment: Optional[str]
+    rating: int
+    date_added: Optional[datetime]
+    update_date: Optional[datetime]
+
+
+class ZoneChanges(BaseModel):
+    created: List[SyncZone] = []
+    updated: List[SyncZone] = []
+    deleted: List[int] = []
+
+
+class ZoneImageChanges(BaseModel):
+    created: List[SyncZoneImage] = []
+    updated: List[SyncZoneImage] = []
+    deleted: List[int] = []
+
+
+class CategoryChanges(BaseModel):
+    created: List[SyncCategory] = []
+    updated: List[SyncCategory] = []
+    deleted: List[int] = []
+
+
+class CommentChanges(BaseModel):
+    created: List[SyncComment] = []
+    updated: List[SyncComment] = []
+    deleted: List[int] = []
+
+
+class SyncChangesResponse(BaseModel):
+    sync_token: str
+    full: bool
+    zones: ZoneChanges
+    images: ZoneImageChanges
+    categories: CategoryChanges
+    comments: CommentChanges
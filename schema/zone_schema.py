@@ -50,6 +50,23 @@ class RecommendSectionResponse(BaseModel):
 class CategoryResponse(BaseModel):
     category_name: str
 
+class ZoneCardData(BaseModel):
+    zone_id: int
+    name: str
+    description: str
+    rating_sum: int
+    rating_count: int
+    review_count: int
+    cover_image: Optional[str] = None
+    categories: List[str]
+    status: str
+
+    @property
+    def average_rating(self) -> float:
+        if not self.rating_count:
+            return 0.0
+        return round(self.rating_sum / self.rating_count, 2)
+
 class AllSectionResponse(BaseModel):
     section_id: int
     section_name: str
@@ -68,6 +85,26 @@ class AllSectionWebApi(BaseModel):
     date_added: datetime
     update_date: datetime
 
+class ZoneSearchResult(BaseModel):
+    section_id: int
+    section_name: str
+    description: str
+    total_rating: float
+    image_url: Optional[str] = None
+    categories: List[CategoryResponse]
+    score: float
+
+class CategoryFacet(BaseModel):
+    category_id: int
+    category_name: str
+    count: int
+
+class ZoneSearchResponse(BaseModel):
+    query: str
+    total: int
+    results: List[ZoneSearchResult]
+    facets: List[CategoryFacet]
+
 class ZoneCategoryUpdate(BaseModel):
     category_id: int
 
@@ -1,6 +1,4 @@
 from datetime import datetime, timedelta
-import os
-import shutil
 from typing import Optional
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException, UploadFile, status
@@ -14,6 +12,15 @@ from schema.auth_schema import *
 from schema.user_schema import UserCreate
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import or_
+from services.upload_services import (
+    StoredUpload,
+    acquire_images,
+    release_images,
+    remove_released_images,
+    remove_uploads,
+)
+from services.image_services import PROFILE_IMAGES, image_processor
+from services.cache_services import USERS_TAG, invalidate
 from services.send_email_services import (
     send_email,
     account_verification_email_body,
@@ -186,6 +193,7 @@ async def create_user(user: UserCreate, db: Session = Depends(get_db)):
         db.add(new_user)
         db.commit()
         db.refresh(new_user)
+        invalidate(USERS_TAG)
 
         user_success = RegisterSuccess(
             id=new_user.id,
@@ -232,10 +240,7 @@ async def logout_user(user: User, db: Session = Depends(get_db)):
     pass
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
+def get_token_subject(token: str = Depends(oauth2_scheme)) -> str:
 
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -251,6 +256,15 @@ def get_current_user(
     except JWTError as e:
         raise credentials_exception
 
+    return username
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> User:
+    username = get_token_subject(token)
+
     user = db.query(User).filter(User.username == username).first()
     if not user:
         raise HTTPException(
@@ -375,24 +389,24 @@ def change_password(db: Session, change_password_data: ChangePassword):
 def update_profile_service(
     db: Session,
     update_profile_data: UpdateProfile,
-    profile_img: UploadFile = None,
+    profile_img: Optional[StoredUpload] = None,
 ):
     user = db.query(User).filter(User.id == update_profile_data.user_id).first()
 
     if not user:
+        if profile_img:
+            remove_uploads(PROFILE_IMAGES, [profile_img])
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
 
     try:
-        if profile_img:
-            filename = profile_img.filename
-            image_path = f"{PROFILE_UPLOAD_DIRECTORY}/{filename}"
-            os.makedirs(os.path.dirname(image_path), exist_ok=True)
-            with open(image_path, "wb") as buffer:
-                shutil.copyfileobj(profile_img.file, buffer)
-            user.profile_img = filename
+        released = []
+        if profile_img and profile_img.filename != user.profile_img:
+            acquire_images(db, PROFILE_IMAGES, [profile_img])
+            released = release_images(db, PROFILE_IMAGES, [user.profile_img])
+            user.profile_img = profile_img.filename
 
         user.email = update_profile_data.email
         user.first_name = update_profile_data.first_name
@@ -401,6 +415,10 @@ def update_profile_service(
         db.commit()
         db.refresh(user)
 
+        remove_released_images(PROFILE_IMAGES, released)
+        if profile_img and profile_img.created:
+            image_processor.submit(PROFILE_IMAGES, [profile_img.filename])
+
         return UpdateProfile(
             email=user.email,
             first_name=user.first_name,
@@ -410,12 +428,16 @@ def update_profile_service(
 
     except SQLAlchemyError:
         db.rollback()
+        if profile_img:
+            remove_uploads(PROFILE_IMAGES, [profile_img])
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Database error occurred",
         )
     except Exception as e:
         db.rollback()
+        if profile_img:
+            remove_uploads(PROFILE_IMAGES, [profile_img])
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e),
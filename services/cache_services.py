@@ -0,0 +1,420 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from fastapi import Response
+from config.settings import (
+    CACHE_BACKEND,
+    CACHE_DEFAULT_TTL_SECONDS,
+    CACHE_MAX_ENTRIES,
+    CACHE_REDIS_URL,
+    CACHE_REFRESH_WORKERS,
+)
+from services.db_services import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+DEVICES_TAG = "devices"
+PREDICTIONS_TAG = "predictions"
+USERS_TAG = "users"
+ZONES_TAG = "zones"
+ZONE_PREDICTIONS_TAG = "predictions:zone:{zone_id}"
+
+MISSING = object()
+
+_served_age: ContextVar[Optional[float]] = ContextVar("cache_served_age", default=None)
+
+
+def zone_predictions_tag(zone_id: int) -> str:
+    return ZONE_PREDICTIONS_TAG.format(zone_id=zone_id)
+
+
+class LRUCacheBackend:
+    """In-process LRU of cached values with per-tag version counters."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._tag_versions: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def tag_versions(self, tags: List[str]) -> List[int]:
+        with self._lock:
+            return [self._tag_versions[tag] for tag in tags]
+
+    def bump_tags(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                self._tag_versions[tag] += 1
+
+
+class RedisCacheBackend:
+    """Shared cache in Redis, so invalidations reach every worker."""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package")
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Any:
+        payload = self._client.get(f"cache:{key}")
+        return MISSING if payload is None else pickle.loads(payload)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._client.setex(f"cache:{key}", max(int(ttl), 1), pickle.dumps(value))
+
+    def tag_versions(self, tags: List[str]) -> List[int]:
+        if not tags:
+            return []
+        return [int(version or 0) for version in self._client.mget([f"tag:{tag}" for tag in tags])]
+
+    def bump_tags(self, tags: Iterable[str]) -> None:
+        pipeline = self._client.pipeline()
+        for tag in tags:
+            pipeline.incr(f"tag:{tag}")
+        pipeline.execute()
+
+
+class CacheMetrics:
+    """Hit, stale, miss and coalesced-call counters per cached function."""
+
+    def __init__(self):
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "stale": 0, "misses": 0, "coalesced": 0}
+        )
+        self._lock = threading.Lock()
+
+    def record(self, name: str, outcome: str) -> None:
+        with self._lock:
+            self._counts[name][outcome] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            snapshot = {}
+            for name, counts in sorted(self._counts.items()):
+                lookups = sum(counts.values())
+                served = lookups - counts["misses"]
+                snapshot[name] = {**counts, "hit_rate": served / lookups if lookups else 0.0}
+            return snapshot
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers share its outcome."""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self._async_flights: Dict[str, asyncio.Future] = {}
+
+    def do(self, key: str, function: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = function(*args, **kwargs)
+            return flight.result, False
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def do_async(self, key: str, function: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        # The shared call runs as its own task, so a caller that disconnects
+        # does not cancel it for the others. Only the event loop thread
+        # touches these flights, so no lock is needed.
+        task = self._async_flights.get(key)
+        shared = task is not None
+        if not shared:
+            task = asyncio.ensure_future(function(*args, **kwargs))
+            self._async_flights[key] = task
+            task.add_done_callback(lambda done: self._finish_async(key, done))
+        return await asyncio.shield(task), shared
+
+    def _finish_async(self, key: str, task: asyncio.Future) -> None:
+        self._async_flights.pop(key, None)
+        if not task.cancelled():
+            # Retrieved here so a failure whose callers all left is not logged.
+            task.exception()
+
+
+def _create_backend():
+    if CACHE_BACKEND == "redis":
+        return RedisCacheBackend(CACHE_REDIS_URL)
+    return LRUCacheBackend(CACHE_MAX_ENTRIES)
+
+
+cache_backend = _create_backend()
+cache_metrics = CacheMetrics()
+single_flight = SingleFlight()
+
+
+def invalidate(*tags: str) -> None:
+    # Entries are not deleted by tag. Each entry remembers the tag versions
+    # it was computed under, so bumping a tag turns dependent entries stale.
+    # With the in-process backend this only reaches the current worker.
+    try:
+        cache_backend.bump_tags(tags)
+    except Exception as e:
+        logger.error(f"Failed to invalidate cache tags {tags}: {e}")
+
+
+def record_age(age: float) -> None:
+    current = _served_age.get()
+    _served_age.set(age if current is None else max(current, age))
+
+
+def set_age_header(response: Response) -> None:
+    """Report the age of the oldest cached value the request was served from."""
+    age = _served_age.get()
+    if age is not None:
+        response.headers["Age"] = str(int(age))
+
+
+def _bind_arguments(signature: inspect.Signature, args, kwargs) -> Dict[str, Any]:
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return {key: value for key, value in bound.arguments.items() if key != "db"}
+
+
+class _Refresher:
+    """Runs background refreshes of stale entries, one per key at a time."""
+
+    def __init__(self, workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cache-refresh")
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def _claim(self, key: str) -> bool:
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+            return True
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            self._pending.discard(key)
+
+    def submit(self, key: str, refresh: Callable[[], None]) -> None:
+        if not self._claim(key):
+            return
+
+        def run():
+            try:
+                refresh()
+            except Exception as e:
+                logger.error(f"Background refresh of {key} failed: {e}")
+            finally:
+                self._release(key)
+
+        self._executor.submit(run)
+
+    def submit_async(self, key: str, refresh: Callable[[], Awaitable[None]]) -> None:
+        if not self._claim(key):
+            return
+
+        async def run():
+            try:
+                await refresh()
+            except Exception as e:
+                logger.error(f"Background refresh of {key} failed: {e}")
+            finally:
+                self._release(key)
+
+        asyncio.ensure_future(run())
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+cache_refresher = _Refresher(CACHE_REFRESH_WORKERS)
+
+
+def cached(
+    name: str,
+    tags: Iterable[str] = (),
+    ttl: float = CACHE_DEFAULT_TTL_SECONDS,
+    max_stale: Optional[float] = None,
+):
+    """Cache a service function by name and arguments.
+
+    Tags may use the function's argument names as format fields, e.g.
+    ``"predictions:zone:{zone_id}"``. The ``db`` session is not part of the key.
+    Concurrent misses for the same key are coalesced into one execution.
+
+    With ``max_stale``, an entry that has expired or been invalidated is still
+    served for up to ``max_stale`` seconds past its ttl while a background
+    refresh, using its own session, recomputes it.
+    """
+    tags = list(tags)
+    retention = ttl + (max_stale or 0)
+
+    def decorator(function: Callable) -> Callable:
+        signature = inspect.signature(function)
+        takes_db = "db" in signature.parameters
+
+        def resolve(args, kwargs) -> Tuple[str, List[str]]:
+            arguments = _bind_arguments(signature, args, kwargs)
+            resolved_tags = [tag.format(**arguments) for tag in tags]
+            signature_text = repr(sorted(arguments.items())) + repr(resolved_tags)
+            return f"{name}:{hashlib.sha1(signature_text.encode()).hexdigest()}", resolved_tags
+
+        def lookup(args, kwargs) -> Tuple[Optional[str], list, Any]:
+            key, resolved_tags = resolve(args, kwargs)
+            try:
+                return key, cache_backend.tag_versions(resolved_tags), cache_backend.get(key)
+            except Exception as e:
+                logger.error(f"Cache lookup for {name} failed: {e}")
+                return None, [], MISSING
+
+        def current_versions(args, kwargs) -> list:
+            # Read before computing, so an invalidation that lands while the
+            # value is computed leaves the stored entry stale.
+            return cache_backend.tag_versions(resolve(args, kwargs)[1])
+
+        def store(key: str, versions: list, value: Any) -> None:
+            try:
+                cache_backend.set(key, (versions, time.time(), value), retention)
+            except Exception as e:
+                logger.error(f"Cache store for {name} failed: {e}")
+
+        def classify(entry, versions: list) -> Tuple[str, float]:
+            if entry is MISSING:
+                return "misses", 0.0
+            entry_versions, computed_at, _ = entry
+            age = max(time.time() - computed_at, 0.0)
+            if entry_versions == versions and age < ttl:
+                return "hits", age
+            if max_stale is not None and age < retention:
+                return "stale", age
+            return "misses", 0.0
+
+        def refresh_arguments(args, kwargs, db):
+            bound = signature.bind(*args, **kwargs)
+            bound.arguments["db"] = db
+            return bound.args, bound.kwargs
+
+        if inspect.iscoroutinefunction(function):
+            async def compute_async(key, args, kwargs):
+                versions = current_versions(args, kwargs)
+                result = await function(*args, **kwargs)
+                store(key, versions, result)
+                return result
+
+            async def refresh_async(key, args, kwargs):
+                db = SessionLocal() if takes_db else None
+                try:
+                    if db is not None:
+                        args, kwargs = refresh_arguments(args, kwargs, db)
+                    await single_flight.do_async(key, compute_async, key, args, kwargs)
+                finally:
+                    if db is not None:
+                        db.close()
+
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                key, versions, entry = lookup(args, kwargs)
+                if key is None:
+                    return await function(*args, **kwargs)
+                outcome, age = classify(entry, versions)
+                if outcome != "misses":
+                    if outcome == "stale":
+                        cache_refresher.submit_async(key, lambda: refresh_async(key, args, kwargs))
+                    cache_metrics.record(name, outcome)
+                    record_age(age)
+                    return entry[2]
+
+                value, shared = await single_flight.do_async(key, compute_async, key, args, kwargs)
+                cache_metrics.record(name, "coalesced" if shared else "misses")
+                record_age(0.0)
+                return value
+
+            return async_wrapper
+
+        def compute(key, args, kwargs):
+            versions = current_versions(args, kwargs)
+            result = function(*args, **kwargs)
+            store(key, versions, result)
+            return result
+
+        def refresh(key, args, kwargs):
+            db = SessionLocal() if takes_db else None
+            try:
+                if db is not None:
+                    args, kwargs = refresh_arguments(args, kwargs, db)
+                single_flight.do(key, compute, key, args, kwargs)
+            finally:
+                if db is not None:
+                    db.close()
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            key, versions, entry = lookup(args, kwargs)
+            if key is None:
+                return function(*args, **kwargs)
+            outcome, age = classify(entry, versions)
+            if outcome != "misses":
+                if outcome == "stale":
+                    cache_refresher.submit(key, lambda: refresh(key, args, kwargs))
+                cache_metrics.record(name, outcome)
+                record_age(age)
+                return entry[2]
+
+            value, shared = single_flight.do(key, compute, key, args, kwargs)
+            cache_metrics.record(name, "coalesced" if shared else "misses")
+            record_age(0.0)
+            return value
+
+        return wrapper
+
+    return decorator
@@ -1,9 +1,20 @@
 from sqlalchemy.orm import Session
-from database.models import Category
+from sqlalchemy import func
+from database.models import Category, Zones
 from schema.category_schema import *
 from typing import List
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException, status
+from services.zone_card_services import zone_card_store
+from services.version_services import CATEGORIES, resource_versions
+from services.sync_services import CATEGORY_ENTITY, record_deletions
+from services.search_services import search_index
+
+
+def _refresh_zones(db: Session, zone_ids: List[int]) -> None:
+    # Zone cards and search documents carry category names.
+    zone_card_store.refresh_zones(db, zone_ids)
+    search_index.refresh_zones(db, zone_ids)
 
 
 def add_category(db: Session, category_data: CategoryCreate) -> CategoryResponse:
@@ -16,6 +27,9 @@ def add_category(db: Session, category_data: CategoryCreate) -> CategoryResponse
         db.commit()
         db.refresh(add_category)
 
+        resource_versions.bump(db, CATEGORIES)
+        _refresh_zones(db, [zone.id for zone in add_category.zones])
+
         return CategoryResponse(
             category_id=add_category.id,
             category_name=add_category.category,
@@ -80,8 +94,17 @@ def category_remove(db: Session, category_id: int) -> RemoveCategoryResponse:
         )
 
     try:
+        zone_ids = [zone.id for zone in category.zones]
         db.delete(category)
+        record_deletions(db, CATEGORY_ENTITY, [category_id])
+        if zone_ids:
+            db.query(Zones).filter(Zones.id.in_(zone_ids)).update(
+                {Zones.update_date: func.now()}, synchronize_session=False
+            )
         db.commit()
+
+        resource_versions.bump(db, CATEGORIES)
+        _refresh_zones(db, zone_ids)
         return RemoveCategoryResponse(message="Category deleted successfully")
 
     except SQLAlchemyError as e:
@@ -113,6 +136,9 @@ def category_update(
     db.commit()
     db.refresh(category)
 
+    resource_versions.bump(db, CATEGORIES)
+    _refresh_zones(db, [zone.id for zone in category.zones])
+
     return CategoryResponse(
         category_id=category.id,
         category_name=category.category,
@@ -1,29 +1,75 @@
 from schema.chart_schema import *
-from typing import List
-from sqlalchemy.orm import Session, joinedload
-from database.models import Prediction, Zones
+from typing import List, Optional
+import numpy as np
+from sqlalchemy import Integer, cast, func
+from sqlalchemy.orm import Session
+from database.models import Prediction, PredictionDaily, Zones
 from fastapi import HTTPException, status
 from sqlalchemy.exc import SQLAlchemyError
+from services.cache_services import (
+    PREDICTIONS_TAG,
+    ZONE_PREDICTIONS_TAG,
+    ZONES_TAG,
+    cached,
+)
+from services.columnar_services import ChartColumns
+
+
+ROW_FIELDS = {"zone": "zone_name"}
+ROW_FORMATS = {"score": "%.4f"}
+# Scores are Numeric(5, 4); fetching them as scaled integers skips building
+# one Decimal per row.
+SCORE_SCALE = 10000
+
+
+def _prediction_columns(
+    db: Session, zone_id: Optional[int] = None, with_score: bool = True
+) -> ChartColumns:
+    # Only the needed columns are selected; zone names are attached from a
+    # small id -> name dictionary instead of a join per row.
+    zones = db.query(Zones.id, Zones.name).order_by(Zones.id).all()
+    zone_ids = np.array([zone.id for zone in zones], dtype=np.int64)
+
+    fields = [Prediction.zone_id, func.coalesce(Prediction.estimated_count, 0)]
+    if with_score:
+        fields.append(
+            cast(func.round(func.coalesce(Prediction.score, 0) * SCORE_SCALE), Integer)
+        )
+    query = db.query(*fields).filter(Prediction.zone_id.isnot(None))
+    if zone_id is not None:
+        query = query.filter(Prediction.zone_id == zone_id)
+
+    rows = query.all()
+    values = list(zip(*rows)) if rows else [()] * len(fields)
+
+    data = ChartColumns()
+    data.add(
+        "zone",
+        np.searchsorted(zone_ids, np.array(values[0], dtype=np.int64)),
+        [zone.name for zone in zones],
+    )
+    data.add("count", np.array(values[1], dtype=np.int64))
+    if with_score:
+        data.add("score", np.array(values[2], dtype=np.float64) / SCORE_SCALE)
+    return data
+
 
+def _check_zone(db: Session, zone_id: int) -> None:
+    if not db.query(Zones.id).filter(Zones.id == zone_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Zone not found"
+        )
 
-def get_all_predictions_score(db: Session) -> List[PredictionScore]:
-    predictions = db.query(Prediction).options(joinedload(Prediction.zone)).all()
 
+@cached("prediction_scores", tags=(PREDICTIONS_TAG, ZONES_TAG))
+def get_all_predictions_score(db: Session) -> ChartColumns:
     try:
-        return [
-            PredictionScore(
-                zone_name=prediction.zone.name,
-                count=prediction.estimated_count,
-                score=prediction.score,
-            )
-            for prediction in predictions
-        ]
+        return _prediction_columns(db)
     except SQLAlchemyError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to fetch prediction score data",
         )
-
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -31,30 +77,12 @@ def get_all_predictions_score(db: Session) -> List[PredictionScore]:
         )
 
 
-def get_prediction_by_zone(db: Session, zone_id: int) -> List[PredictionScore]:
-    predictions = (
-        db.query(Prediction)
-        .options(joinedload(Prediction.zone))
-        .filter(Prediction.zone_id == zone_id)
-    )
-
-    check_existing_zone = db.query(Zones).filter(Zones.id == zone_id).first()
-
-    if not check_existing_zone:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Zone not found"
-        )
+@cached("prediction_scores_by_zone", tags=(ZONES_TAG, ZONE_PREDICTIONS_TAG))
+def get_prediction_by_zone(db: Session, zone_id: int) -> ChartColumns:
+    _check_zone(db, zone_id)
 
     try:
-        return [
-            PredictionScore(
-                zone_name=prediction.zone.name,
-                count=prediction.estimated_count,
-                score=prediction.score,
-            )
-            for prediction in predictions
-        ]
-
+        return _prediction_columns(db, zone_id)
     except SQLAlchemyError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -67,34 +95,14 @@ def get_prediction_by_zone(db: Session, zone_id: int) -> List[PredictionScore]:
         )
 
 
-def get_all_estimated_count(db: Session) -> List[EstimatedCount]:
-    estimated_count_result = (
-        db.query(Prediction).options(joinedload(Prediction.zone)).all()
-    )
-
-    return [
-        EstimatedCount(
-            zone_name=count.zone.name,
-            count=count.estimated_count,
-        )
-        for count in estimated_count_result
-    ]
-
+@cached("estimated_counts", tags=(PREDICTIONS_TAG, ZONES_TAG))
+def get_all_estimated_count(db: Session) -> ChartColumns:
+    return _prediction_columns(db, with_score=False)
 
-def get_estimated_count_by_zone(db: Session, zone_id: int) -> List[EstimatedCount]:
-    estimated_count_result = (
-        db.query(Prediction).options(joinedload(Prediction.zone)).filter(
-            Prediction.zone_id == zone_id
-        )
-    )
 
-    return [
-        EstimatedCount(
-            zone_name=count.zone.name,
-            count=count.estimated_count,
-        )
-        for count in estimated_count_result
-    ]
+@cached("estimated_counts_by_zone", tags=(ZONES_TAG, ZONE_PREDICTIONS_TAG))
+def get_estimated_count_by_zone(db: Session, zone_id: int) -> ChartColumns:
+    return _prediction_columns(db, zone_id, with_score=False)
 
 
 from sqlalchemy import func
@@ -104,14 +112,16 @@ class DailyVisitorsData(BaseModel):
     timestamp: datetime
     total_visitors: int
 
+@cached("daily_visitors_by_zone", tags=(ZONES_TAG, ZONE_PREDICTIONS_TAG))
 def get_daily_visitors_by_section(db: Session, zone_id: int) -> List[DailyVisitorsData]:
     query = (
         db.query(
-            func.date(Prediction.first_seen).label("date"),
-            func.coalesce(func.sum(Prediction.estimated_count), 0).label('total_visitors')
+            PredictionDaily.bucket_date.label("date"),
+            func.coalesce(func.sum(PredictionDaily.visitor_count), 0).label('total_visitors')
         ).filter(
-            Prediction.zone_id == zone_id,
-        ).group_by(func.date(Prediction.first_seen))
+            PredictionDaily.zone_id == zone_id,
+        ).group_by(PredictionDaily.bucket_date)
+        .order_by(PredictionDaily.bucket_date)
     )
 
     results = query.all()
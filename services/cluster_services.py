@@ -0,0 +1,244 @@
+import logging
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
+from config.settings import (
+    DEVICE_CLUSTER_LINK_SECONDS,
+    DEVICE_CLUSTER_POWER_TOLERANCE,
+    DEVICE_CLUSTERING_BATCH_SIZE,
+)
+from database.models import Device, DeviceCluster
+from services.cache_services import DEVICES_TAG, invalidate
+from services.rollup_services import lock_pipeline_state, settled_ceiling, settled_count
+
+logger = logging.getLogger(__name__)
+
+DEVICE_CLUSTERING = "device_clustering"
+
+
+def visitor_key():
+    # Linked randomized addresses share their cluster's id; every other
+    # address stands for itself.
+    return func.coalesce(DeviceCluster.cluster_id, Device.device_addr)
+
+
+def with_clusters(query: Query) -> Query:
+    return query.outerjoin(DeviceCluster, DeviceCluster.device_addr == Device.device_addr)
+
+
+def _summarize(frames) -> List[dict]:
+    # One summary per address: when and where it was first and last seen,
+    # its mean signal strength and its most common frame type.
+    addrs, moments, powers, frame_types, zones = zip(*frames)
+    addr_codes, addr_values = pd.factorize(np.array(addrs, dtype=object))
+    type_codes, type_values = pd.factorize(np.array(frame_types, dtype=object))
+    origin = min(moments)
+    base = np.datetime64(origin, "s")
+    seconds = (pd.to_datetime(list(moments)).values.astype("datetime64[s]") - base).astype(np.int64)
+
+    order = np.lexsort((seconds, addr_codes))
+    addr_codes = addr_codes[order]
+    starts = np.flatnonzero(np.r_[True, addr_codes[1:] != addr_codes[:-1]])
+    ends = np.r_[starts[1:], len(order)] - 1
+    zones = np.array([-1 if zone is None else zone for zone in zones], dtype=np.int64)[order]
+
+    powers = np.array([np.nan if power is None else power for power in powers], dtype=np.float64)[order]
+    measured = ~np.isnan(powers)
+    power_sums = np.add.reduceat(np.where(measured, powers, 0.0), starts)
+    power_counts = np.add.reduceat(measured.astype(np.int64), starts)
+    mean_powers = np.divide(
+        power_sums, power_counts, out=np.full(len(starts), np.nan), where=power_counts > 0
+    )
+
+    type_counts = np.bincount(
+        addr_codes * len(type_values) + type_codes[order],
+        minlength=len(addr_values) * len(type_values),
+    ).reshape(len(addr_values), len(type_values))
+    dominant_types = type_values[type_counts.argmax(axis=1)]
+
+    first_seen = (base + seconds[order][starts].astype("timedelta64[s]")).astype("datetime64[us]")
+    last_seen = (base + seconds[order][ends].astype("timedelta64[s]")).astype("datetime64[us]")
+    return [
+        {
+            "device_addr": addr_values[code],
+            "first_zone": None if first_zone < 0 else first_zone,
+            "zone": None if last_zone < 0 else last_zone,
+            "frame_type": dominant_types[code],
+            "first_seen": first,
+            "last_seen": last,
+            "device_power": None if np.isnan(power) else power,
+            "frame_count": count,
+        }
+        for code, first_zone, last_zone, first, last, power, count in zip(
+            addr_codes[starts].tolist(),
+            zones[starts].tolist(),
+            zones[ends].tolist(),
+            first_seen.tolist(),
+            last_seen.tolist(),
+            mean_powers.tolist(),
+            (ends - starts + 1).tolist(),
+        )
+    ]
+
+
+def _merge(cluster: DeviceCluster, summary: dict) -> None:
+    if summary["device_power"] is not None:
+        if cluster.device_power is None:
+            cluster.device_power = summary["device_power"]
+        else:
+            total = cluster.frame_count + summary["frame_count"]
+            cluster.device_power = (
+                cluster.device_power * cluster.frame_count
+                + summary["device_power"] * summary["frame_count"]
+            ) / total
+    cluster.first_seen = min(cluster.first_seen, summary["first_seen"])
+    if summary["last_seen"] >= cluster.last_seen:
+        cluster.last_seen = summary["last_seen"]
+        cluster.zone = summary["zone"]
+    cluster.frame_count += summary["frame_count"]
+
+
+def _link_cost(
+    predecessor: DeviceCluster,
+    successor: DeviceCluster,
+    link_seconds: int,
+    power_tolerance: float,
+) -> Optional[float]:
+    if predecessor.has_successor or predecessor.first_seen >= successor.first_seen:
+        return None
+    gap = (successor.first_seen - predecessor.last_seen).total_seconds() / link_seconds
+    if predecessor.device_power is None or successor.device_power is None:
+        return gap + 1.0
+    power = abs(predecessor.device_power - successor.device_power) / power_tolerance
+    if power > 1.0:
+        return None
+    return gap + power
+
+
+def _link(
+    new_clusters: List[Tuple[DeviceCluster, Optional[int]]],
+    candidates: List[DeviceCluster],
+    link_seconds: int = DEVICE_CLUSTER_LINK_SECONDS,
+    power_tolerance: float = DEVICE_CLUSTER_POWER_TOLERANCE,
+) -> int:
+    # Candidates are indexed by (zone, frame type) and sorted by last sighting,
+    # so each new address only looks at the addresses that went quiet in the
+    # link window before it appeared, never at every known address.
+    index: Dict[Tuple[Optional[int], str], List[DeviceCluster]] = defaultdict(list)
+    for candidate in sorted(candidates, key=lambda c: c.last_seen):
+        index[(candidate.zone, candidate.frame_type)].append(candidate)
+    last_seen = {key: [c.last_seen for c in group] for key, group in index.items()}
+
+    window = timedelta(seconds=link_seconds)
+    linked = 0
+    for cluster, first_zone in sorted(new_clusters, key=lambda item: item[0].first_seen):
+        key = (first_zone, cluster.frame_type)
+        group = index.get(key, [])
+        lo = bisect_left(last_seen.get(key, []), cluster.first_seen - window)
+        hi = bisect_right(last_seen.get(key, []), cluster.first_seen)
+
+        best, best_cost = None, None
+        for candidate in group[lo:hi]:
+            if candidate is cluster:
+                continue
+            cost = _link_cost(candidate, cluster, link_seconds, power_tolerance)
+            if cost is not None and (best_cost is None or cost < best_cost):
+                best, best_cost = candidate, cost
+
+        if best is None:
+            cluster.cluster_id = cluster.device_addr
+        else:
+            best.has_successor = True
+            cluster.cluster_id = best.cluster_id
+            linked += 1
+    return linked
+
+
+def cluster_new_devices(db: Session, batch_size: int = DEVICE_CLUSTERING_BATCH_SIZE) -> int:
+    # Randomized addresses are consumed past a stored id mark, so memory is
+    # bounded by the batch and the link window rather than the whole table.
+    linked = 0
+    while True:
+        state = lock_pipeline_state(db, DEVICE_CLUSTERING)
+        fetched = (
+            db.query(
+                Device.id,
+                Device.device_addr,
+                Device.date_detected,
+                Device.device_power,
+                Device.frame_type,
+                Device.zone,
+                Device.is_randomized,
+            )
+            .filter(Device.id > state.last_id)
+            .order_by(Device.id)
+            .limit(batch_size)
+            .all()
+        )
+        # Every frame is read so gaps in the ids can be told apart from
+        # frames of addresses that are not randomized.
+        ceiling = settled_ceiling(db, DEVICE_CLUSTERING, Device.id)
+        settled = fetched[: settled_count(DEVICE_CLUSTERING, state.last_id, [row.id for row in fetched], ceiling)]
+        rows = [row for row in settled if row.is_randomized]
+        if not settled:
+            db.commit()
+            break
+
+        frames = [row[1:6] for row in rows if row.device_addr and row.date_detected]
+        summaries = _summarize(frames) if frames else []
+        existing = {
+            cluster.device_addr: cluster
+            for cluster in db.query(DeviceCluster).filter(
+                DeviceCluster.device_addr.in_([s["device_addr"] for s in summaries])
+            )
+        }
+
+        new_clusters = []
+        for summary in summaries:
+            cluster = existing.get(summary["device_addr"])
+            if cluster is not None:
+                _merge(cluster, summary)
+                continue
+            cluster = DeviceCluster(
+                device_addr=summary["device_addr"],
+                zone=summary["zone"],
+                frame_type=summary["frame_type"],
+                first_seen=summary["first_seen"],
+                last_seen=summary["last_seen"],
+                device_power=summary["device_power"],
+                frame_count=summary["frame_count"],
+                has_successor=False,
+            )
+            new_clusters.append((cluster, summary["first_zone"]))
+
+        if new_clusters:
+            # Sessions do not autoflush; the merged sightings must be visible
+            # to the candidate query.
+            db.flush()
+            earliest = min(cluster.first_seen for cluster, _ in new_clusters)
+            latest = max(cluster.first_seen for cluster, _ in new_clusters)
+            known = (
+                db.query(DeviceCluster)
+                .filter(
+                    DeviceCluster.last_seen >= earliest - timedelta(seconds=DEVICE_CLUSTER_LINK_SECONDS),
+                    DeviceCluster.last_seen <= latest,
+                    DeviceCluster.has_successor == False,
+                )
+                .all()
+            )
+            linked += _link(new_clusters, known + [cluster for cluster, _ in new_clusters])
+            db.add_all([cluster for cluster, _ in new_clusters])
+
+        state.last_id = settled[-1].id
+        db.commit()
+        if len(settled) < batch_size:
+            break
+
+    if linked:
+        invalidate(DEVICES_TAG)
+    return linked
@@ -0,0 +1,80 @@
+import json
+import struct
+from typing import Dict, List, Literal, Optional
+import numpy as np
+from fastapi import Response
+
+ChartLayout = Literal["rows", "columnar", "binary"]
+
+BINARY_MEDIA_TYPE = "application/vnd.taralibrary.columns"
+
+
+class ChartColumns:
+    """Column-oriented chart data; dictionary columns hold codes into a list of values."""
+
+    def __init__(self):
+        self.columns: Dict[str, np.ndarray] = {}
+        self.dictionaries: Dict[str, list] = {}
+
+    def add(self, name: str, values: np.ndarray, dictionary: Optional[list] = None) -> None:
+        self.columns[name] = values
+        if dictionary is not None:
+            self.dictionaries[name] = dictionary
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), ()))
+
+    def values(self, name: str, fmt: Optional[str] = None) -> list:
+        column = self.columns[name]
+        if name in self.dictionaries:
+            return np.array(self.dictionaries[name], dtype=object)[column].tolist()
+        if fmt is not None:
+            return np.char.mod(fmt, column).tolist()
+        return column.tolist()
+
+
+def _json_response(content) -> Response:
+    return Response(
+        content=json.dumps(content, separators=(",", ":")),
+        media_type="application/json",
+    )
+
+
+def _binary_body(data: ChartColumns) -> bytes:
+    # Layout: a little-endian uint32 header length, a JSON header describing
+    # each column, then the raw little-endian column buffers back to back.
+    columns, buffers, offset = [], [], 0
+    for name, column in data.columns.items():
+        if name in data.dictionaries:
+            dtype = "<u2" if len(data.dictionaries[name]) <= 0xFFFF else "<u4"
+        else:
+            dtype = "<f4" if column.dtype.kind == "f" else "<i4"
+        buffer = column.astype(dtype).tobytes()
+        description = {"name": name, "dtype": dtype, "offset": offset, "length": len(buffer)}
+        if name in data.dictionaries:
+            description["dictionary"] = data.dictionaries[name]
+        columns.append(description)
+        buffers.append(buffer)
+        offset += len(buffer)
+
+    header = json.dumps({"rows": len(data), "columns": columns}, separators=(",", ":")).encode()
+    return b"".join([struct.pack("<I", len(header)), header, *buffers])
+
+
+def columns_response(
+    data: ChartColumns,
+    layout: str = "rows",
+    row_fields: Optional[Dict[str, str]] = None,
+    row_formats: Optional[Dict[str, str]] = None,
+) -> Response:
+    # Rows are built straight from the column lists; no model is created per row.
+    if layout == "binary":
+        return Response(content=_binary_body(data), media_type=BINARY_MEDIA_TYPE)
+    if layout == "columnar":
+        return _json_response({name: data.values(name) for name in data.columns})
+
+    row_fields = row_fields or {}
+    row_formats = row_formats or {}
+    names: List[str] = [row_fields.get(name, name) for name in data.columns]
+    values = [data.values(name, row_formats.get(name)) for name in data.columns]
+    return _json_response([dict(zip(names, row)) for row in zip(*values)])
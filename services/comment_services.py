@@ -11,6 +11,10 @@ from typing import List
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException, status
 from services.auth_services import verify_current_user
+from services.zone_card_services import zone_card_store
+from services.rating_services import apply_rating_change
+from services.version_services import RATINGS, resource_versions
+from services.sync_services import COMMENT_ENTITY, record_deletions
 
 
 def add_comment(
@@ -42,8 +46,12 @@ def add_comment(
         )
 
         db.add(add_comment)
+        apply_rating_change(db, comment_data.zone_id, comment_data.rating, 1)
         db.commit()
         db.refresh(add_comment)
+
+        resource_versions.bump(db, RATINGS)
+        zone_card_store.refresh_zones(db, [add_comment.zone_id])
         return add_comment
 
 
@@ -138,7 +146,9 @@ def edit_comment(
     update_data: CommentUpdate,
 ) -> CommentViewResponse:
 
-    comment_db = db.query(Comment).filter(Comment.id == comment_id).first()
+    comment_db = (
+        db.query(Comment).filter(Comment.id == comment_id).with_for_update().first()
+    )
 
     if not comment_db:
 
@@ -151,9 +161,26 @@ def edit_comment(
 
         comment_db.comment = update_data.comment
 
+        rating_changed = (
+            update_data.rating is not None and update_data.rating != comment_db.rating
+        )
+        if rating_changed:
+            # Comments stored without a rating are left out of the count.
+            apply_rating_change(
+                db,
+                comment_db.zone_id,
+                update_data.rating - (comment_db.rating or 0),
+                int(comment_db.rating is None),
+            )
+            comment_db.rating = update_data.rating
+
         db.commit()
         db.refresh(comment_db)
 
+        if rating_changed:
+            resource_versions.bump(db, RATINGS)
+            zone_card_store.refresh_zones(db, [comment_db.zone_id])
+
         return CommentViewResponse(
             id=comment_db.id,
             zone_id=comment_db.zone_id,
@@ -182,7 +209,9 @@ def edit_comment(
 
 def delete_comment(db: Session, comment_id: int) -> DeleteComment:
 
-    check_comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    check_comment = (
+        db.query(Comment).filter(Comment.id == comment_id).with_for_update().first()
+    )
 
     if not check_comment:
         raise HTTPException(
@@ -191,11 +220,19 @@ def delete_comment(db: Session, comment_id: int) -> DeleteComment:
         )
 
     try:
-        db.query(Comment).filter(Comment.id == comment_id).delete(
+        zone_id = check_comment.zone_id
+        deleted = db.query(Comment).filter(Comment.id == comment_id).delete(
             synchronize_session=False
         )
+        if deleted:
+            if check_comment.rating is not None:
+                apply_rating_change(db, zone_id, -check_comment.rating, -1)
+            record_deletions(db, COMMENT_ENTITY, [comment_id])
         db.commit()
 
+        resource_versions.bump(db, RATINGS)
+        zone_card_store.refresh_zones(db, [zone_id])
+
         return DeleteComment(
             message="Comment deleted successfully",
             is_deleted=True,
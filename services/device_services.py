@@ -1,22 +1,143 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterator, Optional
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session, Query as OrmQuery
 from database.models import Device
 from schema.device_schema import DeviceResponse
+from services.cache_services import cached
+from services.db_services import SessionLocal
 from sqlalchemy.exc import SQLAlchemyError
 
 from fastapi import Query
 
-def get_all_devices(db: Session, page: int = Query(1, ge=1), limit: int = Query(500, gt=0)) -> dict:
+ESTIMATED_TOTAL_TTL_SECONDS = 60
+
+EXPORT_CHUNK_SIZE = 10000
+EXPORT_YIELD_PER = 1000
+EXPORT_COLUMNS = (
+    Device.id,
+    Device.device_addr,
+    Device.date_detected,
+    Device.is_randomized,
+    Device.device_power,
+    Device.frame_type,
+    Device.zone,
+    Device.processed,
+)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+
+
+def filter_devices(
+    query: OrmQuery,
+    zone: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    device_addr: Optional[str] = None,
+) -> OrmQuery:
+    if zone is not None:
+        query = query.filter(Device.zone == zone)
+    if device_addr is not None:
+        query = query.filter(Device.device_addr == device_addr)
+    if start is not None:
+        query = query.filter(Device.date_detected >= start)
+    if end is not None:
+        query = query.filter(Device.date_detected < end)
+    return query
+
+
+def _table_statistics_rows(db: Session) -> int:
+    rows = db.execute(
+        text(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name"
+        ),
+        {"table_name": Device.__tablename__},
+    ).scalar()
+    return int(rows or 0)
+
+
+def _explain_rows(db: Session, query: OrmQuery) -> int:
+    compiled = query.statement.compile(dialect=db.get_bind().dialect)
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    plan = db.connection().exec_driver_sql(f"EXPLAIN {compiled.string}", params).mappings().first()
+    if not plan:
+        return 0
+
+    rows = plan.get("rows") or 0
+    filtered = plan.get("filtered") or 100
+    return int(int(rows) * float(filtered) / 100)
+
+
+# Estimated totals are cached per filter set so the statistics lookup does not
+# run on every page request either. The shared cache bounds the number of
+# filter sets kept.
+@cached("device_estimated_total", ttl=ESTIMATED_TOTAL_TTL_SECONDS)
+def get_estimated_total(
+    db: Session,
+    zone: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    device_addr: Optional[str] = None,
+) -> int:
+    if zone is None and start is None and end is None and device_addr is None:
+        return _table_statistics_rows(db)
+
+    query = filter_devices(
+        db.query(Device),
+        zone=zone,
+        start=start,
+        end=end,
+        device_addr=device_addr,
+    )
+    return _explain_rows(db, query)
+
+
+def get_all_devices(
+    db: Session,
+    page: int = Query(1, ge=1),
+    limit: int = Query(500, gt=0),
+    exact: bool = False,
+    zone: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    device_addr: Optional[str] = None,
+) -> dict:
     offset = (page - 1) * limit
-    total_devices = db.query(Device).count()
-    devices = db.query(Device).offset(offset).limit(limit).all()
+    query = filter_devices(
+        db.query(Device),
+        zone=zone,
+        start=start,
+        end=end,
+        device_addr=device_addr,
+    )
+
+    try:
+        if exact:
+            total_devices = query.count()
+        else:
+            total_devices = get_estimated_total(
+                db, zone=zone, start=start, end=end, device_addr=device_addr
+            )
+
+        devices = query.order_by(Device.id).offset(offset).limit(limit).all()
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to retrieve devices: {str(e)}")
 
     if not devices:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No devices found")
-    
+
     try:
         return {
             "total": total_devices,
+            "total_is_estimate": not exact,
             "page": page,
             "limit": limit,
             "devices": [
@@ -33,9 +154,80 @@ def get_all_devices(db: Session, page: int = Query(1, ge=1), limit: int = Query(
                 for device in devices
             ]
         }
-    
+
     except SQLAlchemyError as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to retrieve devices: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve devices")
 
+
+def _encode_export_rows(rows: list, export_format: str) -> str:
+    if export_format == "ndjson":
+        return "".join(
+            json.dumps(
+                {
+                    field: value.isoformat() if isinstance(value, datetime) else value
+                    for field, value in zip(EXPORT_FIELDS, row)
+                }
+            )
+            + "\n"
+            for row in rows
+        )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue()
+
+
+def iter_device_export(
+    export_format: str = "csv",
+    zone: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    after_id: int = 0,
+    compress: bool = False,
+) -> Iterator[bytes]:
+    # The export outlives the request scoped session, so it owns its own.
+    # Rows are read in id ordered keyset chunks: mysqlconnector buffers whole
+    # result sets client side, so the chunk size is what bounds memory while
+    # yield_per/stream_results keep row hydration incremental within a chunk.
+    db = SessionLocal()
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+
+    def encode(payload: str) -> bytes:
+        data = payload.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    try:
+        if export_format == "csv":
+            yield encode(",".join(EXPORT_FIELDS) + "\n")
+
+        last_id = after_id
+        while True:
+            statement = (
+                filter_devices(select(*EXPORT_COLUMNS), zone=zone, start=start, end=end)
+                .filter(Device.id > last_id)
+                .order_by(Device.id)
+                .limit(EXPORT_CHUNK_SIZE)
+                .execution_options(stream_results=True, yield_per=EXPORT_YIELD_PER)
+            )
+
+            fetched = 0
+            for partition in db.execute(statement).partitions():
+                fetched += len(partition)
+                last_id = partition[-1][0]
+                chunk = encode(_encode_export_rows(partition, export_format))
+                if chunk:
+                    yield chunk
+
+            if fetched < EXPORT_CHUNK_SIZE:
+                break
+
+        if compressor:
+            yield compressor.flush()
+    finally:
+        db.close()
@@ -0,0 +1,216 @@
+import argparse
+import logging
+from datetime import datetime, time, timedelta
+from typing import List
+import numpy as np
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from config.settings import (
+    OCCUPANCY_CONFIDENT_PROBES,
+    OCCUPANCY_LATENESS_SECONDS,
+    OCCUPANCY_MAX_WINDOWS_PER_BATCH,
+    OCCUPANCY_WINDOW_SECONDS,
+    SESSION_GAP_SECONDS,
+)
+from database.models import Device, EstimatorWatermark, Prediction
+from services.cluster_services import cluster_new_devices, visitor_key, with_clusters
+from services.session_services import encode_addresses, seconds_since, sessionize, sort_order
+from services.visitor_services import PROBE_REQUEST
+
+logger = logging.getLogger(__name__)
+
+
+def floor_to_window(moment: datetime, window_seconds: int) -> datetime:
+    midnight = datetime.combine(moment.date(), time.min)
+    elapsed = int((moment - midnight).total_seconds())
+    return midnight + timedelta(seconds=elapsed - elapsed % window_seconds)
+
+
+def estimate_windows(
+    zone_id: int,
+    origin: datetime,
+    frames,
+    window_seconds: int = OCCUPANCY_WINDOW_SECONDS,
+    gap_seconds: int = SESSION_GAP_SECONDS,
+) -> List[dict]:
+    """One prediction per window of ``frames`` (visitor key, date_detected, frame_type)."""
+    if not frames:
+        return []
+
+    addrs, moments, frame_types = zip(*frames)
+    base = np.datetime64(origin, "s")
+    seconds = seconds_since(moments, origin)
+    probes = np.array(frame_types, dtype=object) == PROBE_REQUEST
+    addr_codes = encode_addresses(addrs)
+
+    # Each (window, device) pair is one key; sorting by it lets reduceat
+    # summarise every device's frames in a window without a Python loop.
+    device_count = int(addr_codes.max()) + 1
+    keys = (seconds // window_seconds) * device_count + addr_codes
+    order = sort_order(keys, seconds)
+    keys, seconds, probes = keys[order], seconds[order], probes[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+    frame_counts = np.diff(np.r_[starts, len(keys)])
+    probe_counts = np.add.reduceat(probes.astype(np.int64), starts)
+    first = seconds[starts]
+    last = seconds[np.r_[starts[1:], len(keys)] - 1]
+    # Any non-probe frame means the device is associated with the access
+    # point; a device seen only probing gains confidence with every probe.
+    confidence = np.where(
+        probe_counts < frame_counts,
+        1.0,
+        np.minimum(probe_counts / OCCUPANCY_CONFIDENT_PROBES, 1.0),
+    )
+
+    windows = keys[starts] // device_count
+    window_starts = np.flatnonzero(np.r_[True, windows[1:] != windows[:-1]])
+    devices = np.diff(np.r_[window_starts, len(windows)])
+    expected = np.add.reduceat(confidence, window_starts)
+    scores = expected / devices
+    first_seen = base + np.minimum.reduceat(first, window_starts).astype("timedelta64[s]")
+    last_seen = base + np.maximum.reduceat(last, window_starts).astype("timedelta64[s]")
+    # Dwell counts only the time within visits, so a device that leaves and
+    # comes back inside one window is not credited with the time away.
+    visits = sessionize(keys, np.zeros_like(keys), seconds, gap_seconds)
+    visit_windows = np.searchsorted(windows[window_starts], visits.addrs // device_count)
+    dwell_minutes = np.bincount(
+        visit_windows, weights=visits.dwell_seconds, minlength=len(window_starts)
+    ) / 60
+
+    return [
+        {
+            "zone_id": zone_id,
+            "estimated_count": int(round(count)),
+            "score": round(score, 4),
+            "first_seen": first_moment,
+            "last_seen": last_moment,
+            "scanned_minutes": int(round(minutes)),
+        }
+        for count, score, first_moment, last_moment, minutes in zip(
+            expected.tolist(),
+            scores.tolist(),
+            first_seen.astype("datetime64[us]").tolist(),
+            last_seen.astype("datetime64[us]").tolist(),
+            dwell_minutes.tolist(),
+        )
+    ]
+
+
+def _initial_window_end(db: Session, zone_id: int, window_seconds: int) -> datetime:
+    # The external estimator flags the frames it has consumed, so the first
+    # run picks up from the oldest frame it has not seen yet.
+    oldest = (
+        db.query(func.min(Device.date_detected))
+        .filter(Device.zone == zone_id, Device.processed == False)
+        .scalar()
+    )
+    if oldest is None:
+        oldest = db.query(func.max(Device.date_detected)).filter(Device.zone == zone_id).scalar()
+    return floor_to_window(oldest, window_seconds)
+
+
+def _lock_watermark(db: Session, zone_id: int, window_seconds: int) -> EstimatorWatermark:
+    # The row lock serialises workers, so each window is estimated once.
+    watermark = (
+        db.query(EstimatorWatermark)
+        .filter(EstimatorWatermark.zone_id == zone_id)
+        .with_for_update()
+        .first()
+    )
+    if watermark is not None:
+        return watermark
+
+    try:
+        db.add(
+            EstimatorWatermark(
+                zone_id=zone_id,
+                window_end=_initial_window_end(db, zone_id, window_seconds),
+            )
+        )
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+    return (
+        db.query(EstimatorWatermark)
+        .filter(EstimatorWatermark.zone_id == zone_id)
+        .with_for_update()
+        .one()
+    )
+
+
+def estimate_zone(
+    db: Session,
+    zone_id: int,
+    latest_frame: datetime,
+    window_seconds: int = OCCUPANCY_WINDOW_SECONDS,
+    lateness_seconds: int = OCCUPANCY_LATENESS_SECONDS,
+    max_windows: int = OCCUPANCY_MAX_WINDOWS_PER_BATCH,
+) -> int:
+    # A window closes once the zone's own frames have moved lateness_seconds
+    # past its end, so a collector that uploads late does not lose frames.
+    cutoff = floor_to_window(latest_frame - timedelta(seconds=lateness_seconds), window_seconds)
+    step = timedelta(seconds=window_seconds)
+    written = 0
+    while True:
+        watermark = _lock_watermark(db, zone_id, window_seconds)
+        start = watermark.window_end
+        end = min(cutoff, start + step * max_windows)
+        if end <= start:
+            db.commit()
+            return written
+
+        frames = (
+            with_clusters(
+                db.query(visitor_key(), Device.date_detected, Device.frame_type).select_from(Device)
+            )
+            .filter(
+                Device.zone == zone_id,
+                Device.date_detected >= start,
+                Device.date_detected < end,
+            )
+            .all()
+        )
+        values = estimate_windows(zone_id, start, frames, window_seconds)
+        if values:
+            db.execute(insert(Prediction), values)
+        watermark.window_end = end
+        db.commit()
+        written += len(values)
+
+
+def run_estimator(db: Session) -> int:
+    # Randomized addresses are linked first, so each window counts devices
+    # rather than the addresses they rotated through.
+    cluster_new_devices(db)
+    latest_frames = (
+        db.query(Device.zone, func.max(Device.date_detected))
+        .filter(Device.zone.isnot(None))
+        .group_by(Device.zone)
+        .all()
+    )
+    written = 0
+    for zone_id, latest_frame in latest_frames:
+        if latest_frame is not None:
+            written += estimate_zone(db, zone_id, latest_frame)
+    return written
+
+
+def main() -> None:
+    from services.db_services import SessionLocal
+
+    parser = argparse.ArgumentParser(
+        description="Estimate zone occupancy from every closed window of device frames."
+    )
+    parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"Wrote {run_estimator(db)} predictions")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
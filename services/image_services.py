@@ -0,0 +1,237 @@
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Literal, Optional
+from PIL import Image, ImageOps
+from config.settings import (
+    DIR_UPLOAD_PROFILE_IMG,
+    DIR_UPLOAD_ZONE_IMG,
+    IMAGE_VARIANT_CACHE_BYTES,
+    IMAGE_VARIANT_DIRECTORY,
+    IMAGE_WORKERS,
+    PROFILE_UPLOAD_DIRECTORY,
+    ZONE_UPLOAD_DIRECTORY,
+)
+
+logger = logging.getLogger(__name__)
+
+ImageSize = Literal["thumb", "card", "full"]
+ImageFormat = Literal["webp", "jpeg"]
+
+ZONE_IMAGES = "zones"
+PROFILE_IMAGES = "profiles"
+
+VARIANT_SIZES: Dict[str, int] = {"full": 1280, "card": 480, "thumb": 160}
+VARIANT_EXTENSIONS: Dict[str, str] = {"webp": "webp", "jpeg": "jpg"}
+VARIANT_QUALITY = 82
+
+IMAGE_SOURCES = {
+    ZONE_IMAGES: (ZONE_UPLOAD_DIRECTORY, DIR_UPLOAD_ZONE_IMG),
+    PROFILE_IMAGES: (PROFILE_UPLOAD_DIRECTORY, DIR_UPLOAD_PROFILE_IMG),
+}
+
+
+def image_url(
+    kind: str,
+    filename: Optional[str],
+    size: Optional[ImageSize] = None,
+    image_format: ImageFormat = "webp",
+) -> str:
+    _, static_dir = IMAGE_SOURCES[kind]
+    if size is None or not filename:
+        return f"/static/{static_dir}/{filename}"
+    return f"/api/v1/images/{kind}/{size}/{filename}.{VARIANT_EXTENSIONS[image_format]}"
+
+
+def zone_image_url(filename: Optional[str], size: Optional[ImageSize] = None) -> str:
+    return image_url(ZONE_IMAGES, filename, size)
+
+
+def profile_image_url(filename: Optional[str], size: Optional[ImageSize] = None) -> str:
+    return image_url(PROFILE_IMAGES, filename, size)
+
+
+def parse_variant_name(name: str) -> Optional[tuple]:
+    for image_format, extension in VARIANT_EXTENSIONS.items():
+        suffix = f".{extension}"
+        if name.endswith(suffix):
+            return name[: -len(suffix)], image_format
+    return None
+
+
+def _save_variant(image: Image.Image, path: str, image_format: str) -> None:
+    if image_format == "jpeg" and image.mode != "RGB":
+        image = image.convert("RGB")
+    elif image_format == "webp" and image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        image.save(temp_path, format=image_format.upper(), quality=VARIANT_QUALITY)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+class ImageProcessor:
+    """Builds resized WebP and JPEG variants of uploaded images in a bounded disk cache."""
+
+    def __init__(self, max_workers: int, cache_bytes: int):
+        self.max_workers = max_workers
+        self.cache_bytes = cache_bytes
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._cached_bytes = 0
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._scanned = False
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="image-variants"
+                )
+            return self._executor
+
+    def source_path(self, kind: str, filename: str) -> str:
+        upload_directory, _ = IMAGE_SOURCES[kind]
+        return os.path.join(upload_directory, filename)
+
+    def variant_path(self, kind: str, filename: str, size: str, image_format: str) -> str:
+        return os.path.join(
+            IMAGE_VARIANT_DIRECTORY, kind, size, f"{filename}.{VARIANT_EXTENSIONS[image_format]}"
+        )
+
+    def _scan(self) -> None:
+        # Variants written by earlier runs join the cache oldest-first.
+        files = []
+        for root, _, names in os.walk(IMAGE_VARIANT_DIRECTORY):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, path, stat.st_size))
+
+        with self._lock:
+            for _, path, size in sorted(files):
+                self._entries[path] = size
+                self._cached_bytes += size
+            self._scanned = True
+        self._evict()
+
+    def _track(self, path: str) -> None:
+        if not self._scanned:
+            self._scan()
+        size = os.path.getsize(path)
+        with self._lock:
+            self._cached_bytes += size - self._entries.pop(path, 0)
+            self._entries[path] = size
+        self._evict()
+
+    def _touch(self, path: str) -> None:
+        if not self._scanned:
+            self._scan()
+        with self._lock:
+            if path in self._entries:
+                self._entries.move_to_end(path)
+
+    def _evict(self) -> None:
+        evicted = []
+        with self._lock:
+            while self._cached_bytes > self.cache_bytes and len(self._entries) > 1:
+                path, size = self._entries.popitem(last=False)
+                self._cached_bytes -= size
+                evicted.append(path)
+        for path in evicted:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _untrack(self, path: str) -> None:
+        with self._lock:
+            self._cached_bytes -= self._entries.pop(path, 0)
+
+    def _render(self, kind: str, filename: str, sizes: List[str], image_formats: List[str]) -> None:
+        source = self.source_path(kind, filename)
+        largest = max(VARIANT_SIZES[size] for size in sizes)
+
+        with Image.open(source) as original:
+            # JPEG sources decode straight at a reduced scale.
+            original.draft("RGB", (largest, largest))
+            image = ImageOps.exif_transpose(original)
+            image.load()
+
+        # Each size is resized from the previous (larger) one.
+        for size in sorted(sizes, key=lambda size: -VARIANT_SIZES[size]):
+            pixels = VARIANT_SIZES[size]
+            image = image.copy()
+            image.thumbnail((pixels, pixels), Image.LANCZOS)
+            for image_format in image_formats:
+                path = self.variant_path(kind, filename, size, image_format)
+                _save_variant(image, path, image_format)
+                self._track(path)
+
+    def _render_all(self, kind: str, filename: str) -> None:
+        try:
+            self._render(kind, filename, list(VARIANT_SIZES), list(VARIANT_EXTENSIONS))
+        except Exception as e:
+            logger.error(f"Failed to generate variants for {kind}/{filename}: {e}")
+
+    def submit(self, kind: str, filenames: List[str]) -> None:
+        executor = self._get_executor()
+        for filename in filenames:
+            executor.submit(self._render_all, kind, filename)
+
+    def get_variant(self, kind: str, filename: str, size: str, image_format: str) -> str:
+        path = self.variant_path(kind, filename, size, image_format)
+        if os.path.exists(path):
+            self._touch(path)
+            return path
+
+        if not os.path.exists(self.source_path(kind, filename)):
+            raise FileNotFoundError(filename)
+
+        # Concurrent requests for the same missing variant share one render.
+        executor = self._get_executor()
+        with self._lock:
+            future = self._pending.get(path)
+            if future is None:
+                future = executor.submit(self._render, kind, filename, [size], [image_format])
+                self._pending[path] = future
+        try:
+            future.result()
+        finally:
+            with self._lock:
+                self._pending.pop(path, None)
+        return path
+
+    def remove_variants(self, kind: str, filename: str) -> None:
+        for size in VARIANT_SIZES:
+            for image_format in VARIANT_EXTENSIONS:
+                path = self.variant_path(kind, filename, size, image_format)
+                self._untrack(path)
+                if os.path.exists(path):
+                    try:
+                        os.remove(path)
+                    except OSError as e:
+                        logger.error(f"Failed to remove image variant {path}: {e}")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+image_processor = ImageProcessor(max_workers=IMAGE_WORKERS, cache_bytes=IMAGE_VARIANT_CACHE_BYTES)
@@ -0,0 +1,99 @@
+import logging
+import math
+import threading
+from datetime import date, timedelta
+from typing import Dict, List
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from config.settings import POPULARITY_PRIOR_WEIGHT, POPULARITY_VISITOR_DAYS
+from database.models import PredictionDaily, Zones
+from services.zone_card_services import zone_card_store
+from services.version_services import POPULARITY, RATINGS, resource_versions
+
+logger = logging.getLogger(__name__)
+
+RATING_WEIGHT = 0.6
+VOLUME_WEIGHT = 0.2
+VISITOR_WEIGHT = 0.2
+MAX_RATING = 5
+
+
+class PopularityIndex:
+    """Ranked zone ids blending smoothed rating, review volume and recent visitors."""
+
+    def __init__(self):
+        self._ranked: List[int] = []
+        self._scores: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self.computed = False
+
+    def _recent_visitors(self, db: Session) -> Dict[int, int]:
+        # Read from the daily rollups, whose id checkpoint already waits out
+        # predictions that are still committing; the window costs one row per
+        # zone and day however many predictions it covers.
+        window_start = date.today() - timedelta(days=POPULARITY_VISITOR_DAYS - 1)
+        return {
+            zone_id: int(visitors or 0)
+            for zone_id, visitors in db.query(
+                PredictionDaily.zone_id, func.sum(PredictionDaily.visitor_count)
+            )
+            .filter(PredictionDaily.bucket_date >= window_start)
+            .group_by(PredictionDaily.zone_id)
+        }
+
+    def recompute(self, db: Session) -> None:
+        with self._lock:
+            zones = db.query(Zones.id, Zones.rating_sum, Zones.rating_count).all()
+            total_sum = sum(rating_sum or 0 for _, rating_sum, _ in zones)
+            total_count = sum(rating_count or 0 for _, _, rating_count in zones)
+            prior_mean = total_sum / total_count if total_count else 0.0
+
+            visitors = self._recent_visitors(db)
+
+            max_reviews = max((rating_count or 0 for _, _, rating_count in zones), default=0)
+            max_visitors = max(visitors.values(), default=0)
+
+            scores = {}
+            for zone_id, rating_sum, rating_count in zones:
+                rating_sum, rating_count = rating_sum or 0, rating_count or 0
+                smoothed_rating = (POPULARITY_PRIOR_WEIGHT * prior_mean + rating_sum) / (
+                    POPULARITY_PRIOR_WEIGHT + rating_count
+                )
+                volume = math.log1p(rating_count) / math.log1p(max_reviews) if max_reviews else 0.0
+                traffic = visitors.get(zone_id, 0) / max_visitors if max_visitors else 0.0
+                scores[zone_id] = (
+                    RATING_WEIGHT * smoothed_rating / MAX_RATING
+                    + VOLUME_WEIGHT * volume
+                    + VISITOR_WEIGHT * traffic
+                )
+
+            ranked = sorted(scores, key=lambda zone_id: (-scores[zone_id], zone_id))
+            changed = self.computed and ranked != self._ranked
+            self._scores = scores
+            self._ranked = ranked
+            self.computed = True
+
+        if changed:
+            resource_versions.bump(db, POPULARITY)
+            zone_card_store.invalidate_views()
+
+    def pull(self, db: Session) -> None:
+        # Another worker's ratings or ranking moved; an index this worker has
+        # not computed yet is built fresh when first read.
+        if self.computed:
+            self.recompute(db)
+
+    def ensure_computed(self, db: Session) -> None:
+        if not self.computed:
+            self.recompute(db)
+
+    def ranked(self, db: Session) -> List[int]:
+        self.ensure_computed(db)
+        return self._ranked
+
+    def score(self, zone_id: int) -> float:
+        return self._scores.get(zone_id, 0.0)
+
+
+popularity_index = PopularityIndex()
+resource_versions.on_change((RATINGS, POPULARITY), popularity_index.pull)
@@ -0,0 +1,72 @@
+import logging
+from typing import List
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from database.models import Comment, Zones
+from services.zone_card_services import zone_card_store
+from services.version_services import RATINGS, resource_versions
+
+logger = logging.getLogger(__name__)
+
+
+def apply_rating_change(db: Session, zone_id: int, sum_delta: int, count_delta: int) -> None:
+    # Relative UPDATE so concurrent comment writes on the same zone cannot
+    # overwrite each other; the caller commits it with the comment change.
+    db.query(Zones).filter(Zones.id == zone_id).update(
+        {
+            Zones.rating_sum: Zones.rating_sum + sum_delta,
+            Zones.rating_count: Zones.rating_count + count_delta,
+        },
+        synchronize_session=False,
+    )
+
+
+def average_rating(rating_sum: int, rating_count: int) -> float:
+    if not rating_count:
+        return 0.0
+    return round(rating_sum / rating_count, 2)
+
+
+def reconcile_zone_ratings(db: Session) -> List[int]:
+    actual = (
+        db.query(
+            Comment.zone_id.label("zone_id"),
+            func.sum(Comment.rating).label("rating_sum"),
+            func.count(Comment.rating).label("rating_count"),
+        )
+        .group_by(Comment.zone_id)
+        .subquery()
+    )
+
+    drifted_ids = [
+        zone_id
+        for (zone_id,) in db.query(Zones.id)
+        .outerjoin(actual, actual.c.zone_id == Zones.id)
+        .filter(
+            (Zones.rating_sum != func.coalesce(actual.c.rating_sum, 0))
+            | (Zones.rating_count != func.coalesce(actual.c.rating_count, 0))
+        )
+        .all()
+    ]
+
+    if not drifted_ids:
+        return []
+
+    logger.warning(f"Repairing rating aggregates for zones {drifted_ids}")
+
+    db.query(Zones).filter(Zones.id.in_(drifted_ids)).update(
+        {
+            Zones.rating_sum: select(func.coalesce(func.sum(Comment.rating), 0))
+            .where(Comment.zone_id == Zones.id)
+            .scalar_subquery(),
+            Zones.rating_count: select(func.count(Comment.rating))
+            .where(Comment.zone_id == Zones.id)
+            .scalar_subquery(),
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+
+    resource_versions.bump(db, RATINGS)
+    zone_card_store.refresh_zones(db, drifted_ids)
+    return drifted_ids
@@ -0,0 +1,210 @@
+import argparse
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, List, Sequence, Tuple
+from sqlalchemy import func
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from config.settings import PIPELINE_GAP_SECONDS, PREDICTION_ROLLUP_BATCH_SIZE
+from database.models import PipelineState, Prediction, PredictionDaily, PredictionHourly
+
+logger = logging.getLogger(__name__)
+
+PREDICTION_ROLLUP = "prediction_rollup"
+
+# When each missing id was first noticed, per pipeline. Only the delay before
+# skipping a gap depends on it, so it need not outlive the process.
+_gaps: Dict[Tuple[str, int], float] = {}
+# Highest id already committed when each pipeline first ran in this process.
+# Gaps at or below it are rolled-back inserts from before, not open ones.
+_ceilings: Dict[str, int] = {}
+_gaps_lock = threading.Lock()
+
+
+def lock_pipeline_state(db: Session, name: str) -> PipelineState:
+    # The row lock serialises workers, so each row past the mark is consumed
+    # exactly once even when several processes run the same job.
+    state = (
+        db.query(PipelineState)
+        .filter(PipelineState.name == name)
+        .with_for_update()
+        .first()
+    )
+    if state is not None:
+        return state
+
+    try:
+        db.add(PipelineState(name=name, last_id=0))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+    return (
+        db.query(PipelineState)
+        .filter(PipelineState.name == name)
+        .with_for_update()
+        .one()
+    )
+
+
+def settled_ceiling(db: Session, name: str, column, refresh: bool = False) -> int:
+    """Highest ``column`` value committed when ``name`` first ran in this process."""
+    with _gaps_lock:
+        if not refresh and name in _ceilings:
+            return _ceilings[name]
+    ceiling = db.query(func.max(column)).scalar() or 0
+    with _gaps_lock:
+        if refresh:
+            _ceilings[name] = ceiling
+        return _ceilings.setdefault(name, ceiling)
+
+
+def settled_count(
+    name: str,
+    last_id: int,
+    ids: Sequence[int],
+    ceiling: int = 0,
+    gap_seconds: int = PIPELINE_GAP_SECONDS,
+) -> int:
+    """Number of leading ``ids`` past ``last_id`` that are safe to consume."""
+    # Auto-increment ids are assigned at insert but become visible at commit,
+    # so a missing id above the ceiling may still be an open transaction.
+    # Consumption stops there until the id has been missing for gap_seconds,
+    # after which it is taken to be a rolled-back insert. Gaps at or below
+    # the ceiling are skipped at once, so a backfill does not wait on each
+    # historical gap.
+    now = time.monotonic()
+    expected = last_id + 1
+    count = 0
+    with _gaps_lock:
+        for row_id in ids:
+            missing = max(expected, ceiling + 1)
+            if row_id > missing:
+                noticed = _gaps.setdefault((name, missing), now)
+                if now - noticed < gap_seconds:
+                    break
+            expected = row_id + 1
+            count += 1
+        for key in [key for key in _gaps if key[0] == name and key[1] < expected]:
+            del _gaps[key]
+    return count
+
+
+def _aggregate(rows) -> Tuple[List[dict], List[dict]]:
+    hourly: Dict[Tuple[int, datetime], List[int]] = defaultdict(lambda: [0, 0, 0])
+    daily: Dict[Tuple[int, date], List[int]] = defaultdict(lambda: [0, 0, 0])
+
+    for _, zone_id, first_seen, estimated_count, scanned_minutes in rows:
+        if zone_id is None or first_seen is None:
+            continue
+        hour = first_seen.replace(minute=0, second=0, microsecond=0)
+        for totals in (hourly[(zone_id, hour)], daily[(zone_id, first_seen.date())]):
+            totals[0] += estimated_count or 0
+            totals[1] += 1
+            totals[2] += scanned_minutes or 0
+
+    def values(buckets, bucket_column):
+        return [
+            {
+                "zone_id": zone_id,
+                bucket_column: bucket,
+                "visitor_count": visitor_count,
+                "prediction_count": prediction_count,
+                "scanned_minutes": scanned_minutes,
+            }
+            for (zone_id, bucket), (visitor_count, prediction_count, scanned_minutes) in buckets.items()
+        ]
+
+    return values(hourly, "bucket_start"), values(daily, "bucket_date")
+
+
+def _upsert(db: Session, model, values: List[dict]) -> None:
+    if not values:
+        return
+    stmt = insert(model).values(values)
+    stmt = stmt.on_duplicate_key_update(
+        visitor_count=model.visitor_count + stmt.inserted.visitor_count,
+        prediction_count=model.prediction_count + stmt.inserted.prediction_count,
+        scanned_minutes=model.scanned_minutes + stmt.inserted.scanned_minutes,
+    )
+    db.execute(stmt)
+
+
+def apply_new_predictions(db: Session, batch_size: int = PREDICTION_ROLLUP_BATCH_SIZE) -> int:
+    # Predictions are append-only, so the rollups only need the rows above the
+    # stored high-water mark. Each batch commits together with the new mark.
+    applied = 0
+    while True:
+        state = lock_pipeline_state(db, PREDICTION_ROLLUP)
+        fetched = (
+            db.query(
+                Prediction.id,
+                Prediction.zone_id,
+                Prediction.first_seen,
+                Prediction.estimated_count,
+                Prediction.scanned_minutes,
+            )
+            .filter(Prediction.id > state.last_id)
+            .order_by(Prediction.id)
+            .limit(batch_size)
+            .all()
+        )
+        ceiling = settled_ceiling(db, PREDICTION_ROLLUP, Prediction.id)
+        rows = fetched[: settled_count(PREDICTION_ROLLUP, state.last_id, [row.id for row in fetched], ceiling)]
+        if not rows:
+            db.commit()
+            return applied
+
+        hourly, daily = _aggregate(rows)
+        _upsert(db, PredictionHourly, hourly)
+        _upsert(db, PredictionDaily, daily)
+        state.last_id = rows[-1].id
+        db.commit()
+
+        applied += len(rows)
+        if len(rows) < batch_size:
+            return applied
+
+
+def rebuild_rollups(db: Session, batch_size: int = PREDICTION_ROLLUP_BATCH_SIZE) -> int:
+    state = lock_pipeline_state(db, PREDICTION_ROLLUP)
+    db.query(PredictionHourly).delete(synchronize_session=False)
+    db.query(PredictionDaily).delete(synchronize_session=False)
+    # Starting just below the oldest row keeps ids removed before it from
+    # being waited on as gaps.
+    state.last_id = (db.query(func.min(Prediction.id)).scalar() or 1) - 1
+    settled_ceiling(db, PREDICTION_ROLLUP, Prediction.id, refresh=True)
+    db.commit()
+    return apply_new_predictions(db, batch_size)
+
+
+def main() -> None:
+    from services.db_services import SessionLocal
+
+    parser = argparse.ArgumentParser(
+        description="Backfill the hourly and daily prediction rollups."
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Clear the rollups and recompute them from every stored prediction.",
+    )
+    parser.add_argument("--batch-size", type=int, default=PREDICTION_ROLLUP_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.rebuild:
+            applied = rebuild_rollups(db, args.batch_size)
+        else:
+            applied = apply_new_predictions(db, args.batch_size)
+        print(f"Rolled up {applied} predictions")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
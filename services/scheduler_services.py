@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from typing import Callable, List, Tuple
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from services.db_services import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJobScheduler:
+    """Runs registered jobs on the event loop's threadpool at fixed intervals."""
+
+    def __init__(self):
+        self.jobs: List[Tuple[str, float, Callable[[Session], None]]] = []
+        self.startup_jobs: List[Tuple[str, Callable[[Session], None]]] = []
+        self.tasks: List[asyncio.Task] = []
+
+    def add_job(self, name: str, interval_seconds: float, job: Callable[[Session], None]) -> None:
+        self.jobs.append((name, interval_seconds, job))
+
+    def add_startup_job(self, name: str, job: Callable[[Session], None]) -> None:
+        self.startup_jobs.append((name, job))
+
+    def run_job(self, name: str, job: Callable[[Session], None]) -> None:
+        db = SessionLocal()
+        try:
+            job(db)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Background job {name} failed: {e}")
+        finally:
+            db.close()
+
+    async def _run_forever(self, name: str, interval_seconds: float, job: Callable[[Session], None]) -> None:
+        while True:
+            await run_in_threadpool(self.run_job, name, job)
+            await asyncio.sleep(interval_seconds)
+
+    async def start(self) -> None:
+        # Startup jobs run once in the background so they never delay serving.
+        for name, job in self.startup_jobs:
+            self.tasks.append(asyncio.create_task(run_in_threadpool(self.run_job, name, job)))
+        for name, interval_seconds, job in self.jobs:
+            self.tasks.append(
+                asyncio.create_task(self._run_forever(name, interval_seconds, job))
+            )
+
+    async def stop(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks.clear()
+
+
+scheduler = PeriodicJobScheduler()
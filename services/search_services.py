@@ -0,0 +1,181 @@
+import bisect
+import logging
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session, selectinload
+from database.models import Zones
+
+logger = logging.getLogger(__name__)
+
+NAME_WEIGHT = 3.0
+CATEGORY_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+PREFIX_MATCH_FACTOR = 0.5
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+class ZoneDocument:
+    __slots__ = ("zone_id", "name", "category_ids", "category_names", "terms")
+
+    def __init__(self, zone: Zones):
+        self.zone_id = zone.id
+        self.name = zone.name or ""
+        self.category_ids = {category.id for category in zone.categories}
+        self.category_names = {category.id: category.category for category in zone.categories}
+
+        terms: Dict[str, float] = defaultdict(float)
+        for field, weight in (
+            ([zone.name], NAME_WEIGHT),
+            ([category.category for category in zone.categories], CATEGORY_WEIGHT),
+            ([zone.description], DESCRIPTION_WEIGHT),
+        ):
+            for text in field:
+                for term in tokenize(text):
+                    terms[term] = max(terms[term], weight)
+        self.terms = dict(terms)
+
+
+class ZoneSearchIndex:
+    """Inverted index over zone names, descriptions and category names."""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._terms: List[str] = []
+        self._documents: Dict[int, ZoneDocument] = {}
+        self._lock = threading.Lock()
+        self.built = False
+
+    def _load_zones(self, db: Session, zone_ids: Optional[Iterable[int]] = None) -> List[Zones]:
+        query = db.query(Zones).options(selectinload(Zones.categories))
+        if zone_ids is not None:
+            query = query.filter(Zones.id.in_(list(zone_ids)))
+        return query.all()
+
+    def _add(self, document: ZoneDocument) -> None:
+        self._documents[document.zone_id] = document
+        for term, weight in document.terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+            postings[document.zone_id] = weight
+
+    def _remove(self, zone_id: int) -> None:
+        document = self._documents.pop(zone_id, None)
+        if document is None:
+            return
+        for term in document.terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(zone_id, None)
+            if not postings:
+                del self._postings[term]
+                index = bisect.bisect_left(self._terms, term)
+                if index < len(self._terms) and self._terms[index] == term:
+                    del self._terms[index]
+
+    def rebuild(self, db: Session) -> None:
+        documents = [ZoneDocument(zone) for zone in self._load_zones(db)]
+        with self._lock:
+            self._postings = {}
+            self._terms = []
+            self._documents = {}
+            for document in documents:
+                self._add(document)
+            self.built = True
+
+    def ensure_built(self, db: Session) -> None:
+        if not self.built:
+            self.rebuild(db)
+
+    def refresh_zones(self, db: Session, zone_ids: Iterable[int]) -> None:
+        # Called from write paths after their commit; a failure is repaired by
+        # the periodic rebuild.
+        zone_ids = list(zone_ids)
+        if not zone_ids or not self.built:
+            return
+        try:
+            documents = [ZoneDocument(zone) for zone in self._load_zones(db, zone_ids)]
+            with self._lock:
+                for zone_id in zone_ids:
+                    self._remove(zone_id)
+                for document in documents:
+                    self._add(document)
+        except Exception as e:
+            logger.error(f"Failed to refresh search index for zones {zone_ids}: {e}")
+
+    def _match(self, token: str) -> Dict[int, float]:
+        # Terms are kept sorted, so every term starting with the token sits in
+        # one contiguous run found by binary search.
+        scores: Dict[int, float] = {}
+        index = bisect.bisect_left(self._terms, token)
+        while index < len(self._terms) and self._terms[index].startswith(token):
+            term = self._terms[index]
+            factor = 1.0 if term == token else PREFIX_MATCH_FACTOR
+            for zone_id, weight in self._postings[term].items():
+                score = weight * factor
+                if score > scores.get(zone_id, 0.0):
+                    scores[zone_id] = score
+            index += 1
+        return scores
+
+    def search(
+        self,
+        query: Optional[str],
+        category_ids: Optional[Iterable[int]] = None,
+    ) -> Tuple[List[Tuple[int, float]], Dict[int, Tuple[str, int]]]:
+        tokens = list(dict.fromkeys(tokenize(query)))
+        selected_categories: Set[int] = set(category_ids or [])
+
+        with self._lock:
+            if tokens:
+                scores: Optional[Dict[int, float]] = None
+                for token in tokens:
+                    matches = self._match(token)
+                    if scores is None:
+                        scores = matches
+                    else:
+                        scores = {
+                            zone_id: score + matches[zone_id]
+                            for zone_id, score in scores.items()
+                            if zone_id in matches
+                        }
+                    if not scores:
+                        break
+                scores = scores or {}
+            else:
+                scores = {zone_id: 0.0 for zone_id in self._documents}
+
+            # Facet counts are taken before the category filter so the client
+            # can show how many results each category would leave.
+            facets: Dict[int, Tuple[str, int]] = {}
+            for zone_id in scores:
+                document = self._documents[zone_id]
+                for category_id, category_name in document.category_names.items():
+                    _, count = facets.get(category_id, (category_name, 0))
+                    facets[category_id] = (category_name, count + 1)
+
+            if selected_categories:
+                scores = {
+                    zone_id: score
+                    for zone_id, score in scores.items()
+                    if self._documents[zone_id].category_ids & selected_categories
+                }
+
+            ranked = sorted(
+                scores.items(),
+                key=lambda item: (-item[1], self._documents[item[0]].name.lower(), item[0]),
+            )
+
+        return ranked, facets
+
+
+search_index = ZoneSearchIndex()
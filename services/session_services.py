@@ -0,0 +1,243 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from config.settings import SESSION_GAP_SECONDS, SESSION_MAX_RANGE_DAYS
+from database.models import Device, Zones
+from schema.chart_schema import DwellBucket, DwellDistribution
+from services.cache_services import DEVICES_TAG, ZONES_TAG, cached
+from services.cluster_services import visitor_key, with_clusters
+from services.timeseries_services import local_naive
+
+DWELL_HISTOGRAM_EDGES_MINUTES = (0, 5, 15, 30, 60, 120)
+
+# Sightings are loaded and sessionized a day at a time, which bounds memory
+# for long ranges; a visit spanning midnight is counted as two.
+SESSION_CHUNK = timedelta(days=1)
+
+
+def encode_addresses(addrs: Sequence[str]) -> np.ndarray:
+    # Hash-based factorizing is much faster than sorting the strings.
+    codes, _ = pd.factorize(np.array(addrs, dtype=object))
+    return codes.astype(np.int64)
+
+
+def seconds_since(moments: Sequence[datetime], origin: datetime) -> np.ndarray:
+    stamps = pd.to_datetime(list(moments)).values.astype("datetime64[s]")
+    return (stamps - np.datetime64(origin, "s")).astype(np.int64)
+
+
+class Visits:
+    """Visits split from device sightings, as parallel per-visit arrays."""
+
+    def __init__(
+        self,
+        addrs: np.ndarray,
+        zones: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        frames: np.ndarray,
+    ):
+        self.addrs = addrs
+        self.zones = zones
+        self.starts = starts
+        self.ends = ends
+        self.frames = frames
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def dwell_seconds(self) -> np.ndarray:
+        return self.ends - self.starts
+
+
+def sort_order(*columns: np.ndarray) -> np.ndarray:
+    """Order sorting by the given non-negative integer columns, most significant first."""
+    # A single composite int64 key sorts several times faster than lexsort;
+    # lexsort remains for columns whose spans do not fit in one key.
+    spans = [int(column.max()) + 1 if len(column) else 1 for column in columns]
+    non_negative = all(len(column) == 0 or column.min() >= 0 for column in columns)
+    if non_negative and np.prod(spans, dtype=float) < 2 ** 62:
+        key = np.zeros(len(columns[0]), dtype=np.int64)
+        for column, span in zip(columns, spans):
+            key = key * span + column
+        return np.argsort(key)
+    return np.lexsort(columns[::-1])
+
+
+def sighting_order(addrs: np.ndarray, zones: np.ndarray, seconds: np.ndarray) -> np.ndarray:
+    return sort_order(addrs, zones, seconds)
+
+
+def sessionize(
+    addrs: np.ndarray,
+    zones: np.ndarray,
+    seconds: np.ndarray,
+    gap_seconds: int = SESSION_GAP_SECONDS,
+) -> Visits:
+    """Split sightings sorted by (address, zone, timestamp) into visits.
+
+    A visit ends where the address or zone changes, or where the device goes
+    unseen for longer than ``gap_seconds``.
+    """
+    if not len(seconds):
+        empty = np.empty(0, dtype=np.int64)
+        return Visits(empty, empty, empty, empty, empty)
+
+    breaks = (addrs[1:] != addrs[:-1]) | (zones[1:] != zones[:-1]) | (np.diff(seconds) > gap_seconds)
+    starts = np.flatnonzero(np.r_[True, breaks])
+    ends = np.r_[starts[1:], len(seconds)] - 1
+    return Visits(
+        addrs[starts],
+        zones[starts],
+        seconds[starts],
+        seconds[ends],
+        ends - starts + 1,
+    )
+
+
+def collect_dwell(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    zone_id: Optional[int] = None,
+    gap_seconds: int = SESSION_GAP_SECONDS,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Zone and dwell seconds of every visit that starts in [start, end)."""
+    zones, dwell = [], []
+    chunk_start = start
+    while chunk_start < end:
+        chunk_end = min(chunk_start + SESSION_CHUNK, end)
+        query = with_clusters(
+            db.query(visitor_key(), Device.zone, Device.date_detected).select_from(Device)
+        ).filter(
+            Device.zone.isnot(None),
+            Device.date_detected >= chunk_start,
+            Device.date_detected < chunk_end,
+        )
+        if zone_id is not None:
+            query = query.filter(Device.zone == zone_id)
+        rows = query.all()
+
+        if rows:
+            addrs, zone_ids, moments = zip(*rows)
+            addrs = encode_addresses(addrs)
+            zone_ids = np.array(zone_ids, dtype=np.int64)
+            seconds = seconds_since(moments, chunk_start)
+            order = sighting_order(addrs, zone_ids, seconds)
+            visits = sessionize(addrs[order], zone_ids[order], seconds[order], gap_seconds)
+            zones.append(visits.zones)
+            dwell.append(visits.dwell_seconds)
+        chunk_start = chunk_end
+
+    if not zones:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(zones), np.concatenate(dwell)
+
+
+def _quantiles(values: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    # Linear interpolation within each sorted group, as np.quantile does.
+    position = q * (counts - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, counts - 1)
+    fraction = position - lower
+    return values[starts + lower] * (1 - fraction) + values[starts + upper] * fraction
+
+
+def dwell_distribution(
+    zones: np.ndarray,
+    dwell_seconds: np.ndarray,
+    edges: Sequence[int] = DWELL_HISTOGRAM_EDGES_MINUTES,
+) -> List[Dict]:
+    """Per-zone visit count, mean, median, 90th percentile and histogram, in minutes."""
+    if not len(zones):
+        return []
+
+    order = sort_order(zones, dwell_seconds)
+    zones = zones[order]
+    minutes = dwell_seconds[order] / 60
+    starts = np.flatnonzero(np.r_[True, zones[1:] != zones[:-1]])
+    counts = np.diff(np.r_[starts, len(zones)])
+
+    means = np.add.reduceat(minutes, starts) / counts
+    medians = _quantiles(minutes, starts, counts, 0.5)
+    p90s = _quantiles(minutes, starts, counts, 0.9)
+
+    # The last bucket is open-ended.
+    bins = np.searchsorted(np.asarray(edges[1:]), minutes, side="right")
+    group = np.repeat(np.arange(len(starts)), counts)
+    histograms = np.bincount(
+        group * len(edges) + bins, minlength=len(starts) * len(edges)
+    ).reshape(len(starts), len(edges))
+
+    return [
+        {
+            "zone_id": zone_id,
+            "visits": visits,
+            "mean_minutes": round(mean, 2),
+            "median_minutes": round(median, 2),
+            "p90_minutes": round(p90, 2),
+            "histogram": histogram,
+        }
+        for zone_id, visits, mean, median, p90, histogram in zip(
+            zones[starts].tolist(),
+            counts.tolist(),
+            means.tolist(),
+            medians.tolist(),
+            p90s.tolist(),
+            histograms.tolist(),
+        )
+    ]
+
+
+@cached("dwell_distribution", tags=(DEVICES_TAG, ZONES_TAG))
+def get_dwell_distribution(
+    db: Session,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    zone_id: Optional[int] = None,
+    gap_seconds: int = SESSION_GAP_SECONDS,
+) -> List[DwellDistribution]:
+    end = local_naive(end) if end is not None else datetime.now()
+    start = local_naive(start) if start is not None else end - timedelta(days=1)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end",
+        )
+    if end - start > timedelta(days=SESSION_MAX_RANGE_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The requested range may span at most {SESSION_MAX_RANGE_DAYS} days.",
+        )
+    if zone_id is not None and not db.query(Zones.id).filter(Zones.id == zone_id).first():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Zone not found")
+
+    zones, dwell = collect_dwell(db, start, end, zone_id, gap_seconds)
+    distributions = dwell_distribution(zones, dwell)
+    names = dict(
+        db.query(Zones.id, Zones.name)
+        .filter(Zones.id.in_([d["zone_id"] for d in distributions]))
+        .all()
+    )
+
+    edges = DWELL_HISTOGRAM_EDGES_MINUTES
+    upper_edges = list(edges[1:]) + [None]
+    return [
+        DwellDistribution(
+            zone_id=d["zone_id"],
+            zone_name=names.get(d["zone_id"], ""),
+            visits=d["visits"],
+            mean_minutes=d["mean_minutes"],
+            median_minutes=d["median_minutes"],
+            p90_minutes=d["p90_minutes"],
+            histogram=[
+                DwellBucket(min_minutes=lower, max_minutes=upper, visits=visits)
+                for lower, upper, visits in zip(edges, upper_edges, d["histogram"])
+            ],
+        )
+        for d in distributions
+    ]
@@ -0,0 +1,38 @@
+import os
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+from services.upload_services import is_content_addressed
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class ContentAddressedStaticFiles(StaticFiles):
+    """Serves hash-named uploads with a strong ETag and an immutable cache policy."""
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        filename = os.path.basename(full_path)
+        if not is_content_addressed(filename):
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        content_hash = os.path.splitext(filename)[0]
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            headers={
+                "etag": f'"{content_hash}"',
+                "cache-control": IMMUTABLE_CACHE_CONTROL,
+            },
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,188 @@
+import base64
+import binascii
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, selectinload
+from config.settings import SYNC_OVERLAP_SECONDS, SYNC_TOMBSTONE_RETENTION_DAYS
+from database.models import Category, Comment, Tombstone, ZoneImage, Zones
+from schema.sync_schema import (
+    CategoryChanges,
+    CommentChanges,
+    SyncCategory,
+    SyncChangesResponse,
+    SyncComment,
+    SyncZone,
+    SyncZoneImage,
+    ZoneChanges,
+    ZoneImageChanges,
+)
+from services.image_services import zone_image_url
+from services.rating_services import average_rating
+
+ZONE_ENTITY = "zone"
+ZONE_IMAGE_ENTITY = "zone_image"
+CATEGORY_ENTITY = "category"
+COMMENT_ENTITY = "comment"
+
+
+def _as_datetime(value) -> datetime:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def encode_sync_token(moment: datetime) -> str:
+    return base64.urlsafe_b64encode(moment.isoformat().encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> datetime:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        return datetime.fromisoformat(base64.urlsafe_b64decode(padded).decode())
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync token",
+        )
+
+
+def record_deletions(db: Session, entity: str, entity_ids: List[int]) -> None:
+    # Added to the caller's transaction so the tombstone commits with the delete.
+    db.add_all([Tombstone(entity=entity, entity_id=entity_id) for entity_id in entity_ids])
+
+
+def prune_tombstones(db: Session) -> None:
+    cutoff = _as_datetime(db.query(func.now()).scalar()) - timedelta(
+        days=SYNC_TOMBSTONE_RETENTION_DAYS
+    )
+    db.query(Tombstone).filter(Tombstone.deleted_at < cutoff).delete(synchronize_session=False)
+    db.commit()
+
+
+def _split_changes(rows, since: Optional[datetime], convert: Callable) -> Tuple[list, list]:
+    created, updated = [], []
+    for row in rows:
+        date_added = _as_datetime(row.date_added)
+        if since is None or date_added is None or date_added >= since:
+            created.append(convert(row))
+        else:
+            updated.append(convert(row))
+    return created, updated
+
+
+def _deleted_ids(db: Session, entity: str, since: Optional[datetime]) -> List[int]:
+    if since is None:
+        return []
+    return [
+        entity_id
+        for (entity_id,) in db.query(Tombstone.entity_id)
+        .filter(Tombstone.entity == entity, Tombstone.deleted_at >= since)
+        .distinct()
+        .all()
+    ]
+
+
+def _sync_zone(zone: Zones) -> SyncZone:
+    return SyncZone(
+        id=zone.id,
+        name=zone.name,
+        description=zone.description,
+        category_ids=sorted(category.id for category in zone.categories),
+        total_rating=average_rating(zone.rating_sum or 0, zone.rating_count or 0),
+        total_reviews=zone.rating_count or 0,
+        date_added=zone.date_added,
+        update_date=zone.update_date,
+    )
+
+
+def _sync_zone_image(image: ZoneImage) -> SyncZoneImage:
+    return SyncZoneImage(
+        id=image.id,
+        zone_id=image.zone_id,
+        image_url=zone_image_url(image.image_url),
+        update_date=image.update_date,
+    )
+
+
+def _sync_category(category: Category) -> SyncCategory:
+    return SyncCategory(
+        id=category.id,
+        category_name=category.category,
+        date_added=category.date_added,
+        update_date=category.update_date,
+    )
+
+
+def _sync_comment(comment: Comment) -> SyncComment:
+    return SyncComment(
+        id=comment.id,
+        zone_id=comment.zone_id,
+        user_id=comment.user_id,
+        first_name=comment.user.first_name if comment.user else None,
+        last_name=comment.user.last_name if comment.user else None,
+        comment=comment.comment,
+        rating=comment.rating or 0,
+        date_added=comment.date_added,
+        update_date=comment.update_date,
+    )
+
+
+def get_changes(db: Session, sync_token: Optional[str] = None) -> SyncChangesResponse:
+    now = _as_datetime(db.query(func.now()).scalar())
+    since = decode_sync_token(sync_token) if sync_token else None
+
+    # Tombstones older than the retention window are pruned, so an older
+    # token can no longer be answered with a delta.
+    if since is not None and since < now - timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS):
+        since = None
+
+    def changed(query, column):
+        return query.filter(column >= since) if since is not None else query
+
+    zones = changed(
+        db.query(Zones).options(selectinload(Zones.categories)), Zones.update_date
+    ).order_by(Zones.id)
+    images = changed(db.query(ZoneImage), ZoneImage.update_date).order_by(ZoneImage.id)
+    categories = changed(db.query(Category), Category.update_date).order_by(Category.id)
+    comments = changed(
+        db.query(Comment).options(joinedload(Comment.user)), Comment.update_date
+    ).order_by(Comment.id)
+
+    created_zones, updated_zones = _split_changes(zones, since, _sync_zone)
+    created_images, updated_images = _split_changes(
+        images, since, _sync_zone_image
+    )
+    created_categories, updated_categories = _split_changes(
+        categories, since, _sync_category
+    )
+    created_comments, updated_comments = _split_changes(comments, since, _sync_comment)
+
+    # The next token starts a little before now so rows committed by
+    # transactions still open during this read are picked up next time;
+    # clients apply changes idempotently by id.
+    return SyncChangesResponse(
+        sync_token=encode_sync_token(now - timedelta(seconds=SYNC_OVERLAP_SECONDS)),
+        full=since is None,
+        zones=ZoneChanges(
+            created=created_zones,
+            updated=updated_zones,
+            deleted=_deleted_ids(db, ZONE_ENTITY, since),
+        ),
+        images=ZoneImageChanges(
+            created=created_images,
+            updated=updated_images,
+            deleted=_deleted_ids(db, ZONE_IMAGE_ENTITY, since),
+        ),
+        categories=CategoryChanges(
+            created=created_categories,
+            updated=updated_categories,
+            deleted=_deleted_ids(db, CATEGORY_ENTITY, since),
+        ),
+        comments=CommentChanges(
+            created=created_comments,
+            updated=updated_comments,
+            deleted=_deleted_ids(db, COMMENT_ENTITY, since),
+        ),
+    )
@@ -0,0 +1,206 @@
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Literal, Optional, Tuple
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from config.settings import TIMESERIES_MAX_POINTS, TIMESERIES_MAX_RAW_POINTS
+from database.models import Prediction, PredictionDaily, PredictionHourly, Zones
+from schema.chart_schema import TimeSeriesData
+from services.cache_services import PREDICTIONS_TAG, cached
+
+Granularity = Literal["5m", "15m", "hour", "day", "week"]
+DownsampleMethod = Literal["lttb", "minmax"]
+
+MIN_DOWNSAMPLE_POINTS = 4
+
+GRANULARITY_SECONDS: Dict[str, int] = {
+    "5m": 5 * 60,
+    "15m": 15 * 60,
+    "hour": 60 * 60,
+    "day": 24 * 60 * 60,
+    "week": 7 * 24 * 60 * 60,
+}
+
+DEFAULT_SPANS: Dict[str, timedelta] = {
+    "5m": timedelta(days=1),
+    "15m": timedelta(days=1),
+    "hour": timedelta(days=7),
+    "day": timedelta(days=30),
+    "week": timedelta(weeks=26),
+}
+
+
+def local_naive(moment: datetime) -> datetime:
+    # Predictions are stored as naive server-local times.
+    if moment.tzinfo is not None:
+        return moment.astimezone().replace(tzinfo=None)
+    return moment
+
+
+def floor_to_bucket(moment: datetime, granularity: str) -> datetime:
+    midnight = datetime.combine(moment.date(), time.min)
+    if granularity == "week":
+        return midnight - timedelta(days=moment.weekday())
+    step = GRANULARITY_SECONDS[granularity]
+    elapsed = int((moment - midnight).total_seconds())
+    return midnight + timedelta(seconds=elapsed - elapsed % step)
+
+
+def resolve_range(
+    granularity: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    max_buckets: int = TIMESERIES_MAX_POINTS,
+) -> Tuple[datetime, int]:
+    end = local_naive(end) if end is not None else datetime.now()
+    start = local_naive(start) if start is not None else end - DEFAULT_SPANS[granularity]
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end",
+        )
+
+    step = GRANULARITY_SECONDS[granularity]
+    origin = floor_to_bucket(start, granularity)
+    buckets = -(-int((end - origin).total_seconds()) // step)
+    if buckets > max_buckets:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"The requested range spans {buckets} {granularity} buckets; at most "
+                f"{max_buckets} are allowed. Narrow the range or use a coarser granularity."
+            ),
+        )
+    return origin, buckets
+
+
+def _source_rows(
+    db: Session, granularity: str, lower: datetime, upper: datetime, zone_id: Optional[int]
+):
+    # Sub-hour buckets come from the raw predictions, coarser ones from the
+    # rollups. The range is a plain comparison on the indexed bucket column.
+    if granularity in ("5m", "15m"):
+        column, value, zone_column = Prediction.first_seen, Prediction.estimated_count, Prediction.zone_id
+    elif granularity == "hour":
+        column, value, zone_column = PredictionHourly.bucket_start, PredictionHourly.visitor_count, PredictionHourly.zone_id
+    else:
+        column, value, zone_column = PredictionDaily.bucket_date, PredictionDaily.visitor_count, PredictionDaily.zone_id
+        lower, upper = lower.date(), upper.date()
+
+    query = db.query(column, func.coalesce(value, 0)).filter(column >= lower, column < upper)
+    if zone_id is not None:
+        query = query.filter(zone_column == zone_id)
+    return query.all()
+
+
+@cached("visitor_series", tags=(PREDICTIONS_TAG,))
+def get_visitor_series(
+    db: Session,
+    granularity: str = "hour",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    zone_id: Optional[int] = None,
+    max_points: Optional[int] = None,
+    method: str = "lttb",
+) -> Tuple[np.ndarray, np.ndarray]:
+    if zone_id is not None and not db.query(Zones.id).filter(Zones.id == zone_id).first():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Zone not found")
+
+    # Downsampled requests may span more raw buckets, since only max_points
+    # of them are returned.
+    max_buckets = TIMESERIES_MAX_RAW_POINTS if max_points else TIMESERIES_MAX_POINTS
+    origin, buckets = resolve_range(granularity, start, end, max_buckets)
+    step = GRANULARITY_SECONDS[granularity]
+    upper = origin + timedelta(seconds=step * buckets)
+    rows = _source_rows(db, granularity, origin, upper, zone_id)
+
+    base = np.datetime64(origin, "s")
+    stamps = base + np.arange(buckets, dtype=np.int64) * np.timedelta64(step, "s")
+    if not rows:
+        return downsample(stamps, np.zeros(buckets, dtype=np.int64), max_points, method)
+
+    moments, values = zip(*rows)
+    offsets = (np.array(moments, dtype="datetime64[s]") - base).astype(np.int64)
+    # Empty buckets are zero-filled by bincount rather than looped over.
+    counts = np.bincount(
+        offsets // step, weights=np.array(values, dtype=np.float64), minlength=buckets
+    )[:buckets]
+    return downsample(stamps, np.rint(counts).astype(np.int64), max_points, method)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of the points to keep."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    # The first and last points are always kept; the rest are split into
+    # threshold - 2 buckets, and the next bucket's mean anchors each choice.
+    edges = np.append(np.linspace(1, n - 1, threshold - 1).astype(np.int64), n)
+    sums_x = np.add.reduceat(x, edges[:-1])
+    sums_y = np.add.reduceat(y, edges[:-1])
+    sizes = np.diff(edges)
+    mean_x, mean_y = sums_x / sizes, sums_y / sizes
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        areas = np.abs(
+            (x[previous] - mean_x[bucket + 1]) * (y[lo:hi] - y[previous])
+            - (x[previous] - x[lo:hi]) * (mean_y[bucket + 1] - y[previous])
+        )
+        previous = lo + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def minmax_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the minimum and maximum of each bucket, plus both ends."""
+    n = len(y)
+    if threshold >= n:
+        return np.arange(n)
+
+    buckets = max((threshold - 2) // 2, 1)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    bucket_of = np.repeat(np.arange(buckets), np.diff(edges))
+    # Sorting by (bucket, value) puts each bucket's minimum first and its
+    # maximum last, at positions given by the bucket edges.
+    order = np.lexsort((y, bucket_of))
+    return np.unique(
+        np.concatenate(([0, n - 1], order[edges[:-1]], order[edges[1:] - 1]))
+    )
+
+
+def downsample_indices(
+    stamps: np.ndarray,
+    counts: np.ndarray,
+    max_points: int,
+    method: str = "lttb",
+) -> np.ndarray:
+    if method == "minmax":
+        return minmax_indices(counts, max_points)
+    return lttb_indices(stamps.astype("datetime64[s]").astype(np.int64), counts, max_points)
+
+
+def downsample(
+    stamps: np.ndarray,
+    counts: np.ndarray,
+    max_points: Optional[int],
+    method: str = "lttb",
+) -> Tuple[np.ndarray, np.ndarray]:
+    if not max_points or len(counts) <= max_points:
+        return stamps, counts
+    indices = downsample_indices(stamps, counts, max_points, method)
+    return stamps[indices], counts[indices]
+
+
+def series_points(stamps: np.ndarray, counts: np.ndarray) -> List[TimeSeriesData]:
+    return [
+        TimeSeriesData(timestamp=timestamp, count=count)
+        for timestamp, count in zip(stamps.astype("datetime64[us]").tolist(), counts.tolist())
+    ]
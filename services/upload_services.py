@@ -0,0 +1,193 @@
+import hashlib
+import os
+import re
+import uuid
+from collections import Counter
+from typing import List, Optional
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException, UploadFile, status
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from config.settings import MAX_UPLOAD_SIZE_BYTES
+from database.models import ImageBlob
+from services.db_services import SessionLocal
+from services.image_services import IMAGE_SOURCES, image_processor
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{64}(\.[a-z0-9]{1,8})?$")
+
+
+class StoredUpload(BaseModel):
+    filename: str
+    original_filename: str
+    content_hash: str
+    size: int
+    created: bool
+
+
+def upload_directory(kind: str) -> str:
+    directory, _ = IMAGE_SOURCES[kind]
+    return directory
+
+
+def content_addressed_name(content_hash: str, original_filename: Optional[str]) -> str:
+    extension = os.path.splitext(original_filename or "")[1].lower()
+    if not re.fullmatch(r"\.[a-z0-9]{1,8}", extension):
+        extension = ""
+    return f"{content_hash}{extension}"
+
+
+def is_content_addressed(filename: str) -> bool:
+    return bool(CONTENT_ADDRESSED_NAME.match(filename))
+
+
+async def save_upload(
+    file: UploadFile,
+    kind: str,
+    max_bytes: int = MAX_UPLOAD_SIZE_BYTES,
+) -> StoredUpload:
+    if not (file.content_type or "").startswith("image/"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File {file.filename} is not an image",
+        )
+
+    directory = upload_directory(kind)
+    await aiofiles.os.makedirs(directory, exist_ok=True)
+
+    # The name is only known once the content is hashed, so the upload is
+    # streamed to a temporary file first and renamed afterwards.
+    temp_location = os.path.join(directory, f".{uuid.uuid4().hex}.upload")
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        async with aiofiles.open(temp_location, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File {file.filename} exceeds the {max_bytes // (1024 * 1024)} MB upload limit",
+                    )
+                digest.update(chunk)
+                await buffer.write(chunk)
+
+        content_hash = digest.hexdigest()
+        filename = content_addressed_name(content_hash, file.filename)
+        file_location = os.path.join(directory, filename)
+
+        created = not await aiofiles.os.path.exists(file_location)
+        if created:
+            await aiofiles.os.replace(temp_location, file_location)
+    finally:
+        if await aiofiles.os.path.exists(temp_location):
+            await aiofiles.os.remove(temp_location)
+
+    return StoredUpload(
+        filename=filename,
+        original_filename=file.filename or filename,
+        content_hash=content_hash,
+        size=size,
+        created=created,
+    )
+
+
+async def save_uploads(
+    files: Optional[List[UploadFile]],
+    kind: str,
+    max_bytes: int = MAX_UPLOAD_SIZE_BYTES,
+) -> List[StoredUpload]:
+    stored: List[StoredUpload] = []
+    try:
+        for file in files or []:
+            stored.append(await save_upload(file, kind, max_bytes))
+    except BaseException:
+        remove_uploads(kind, stored)
+        raise
+    return stored
+
+
+def acquire_images(db: Session, kind: str, uploads: List[StoredUpload]) -> None:
+    # Runs inside the caller's transaction, so the references are committed
+    # together with the rows that point at the files.
+    counts = Counter(upload.filename for upload in uploads)
+    uploads_by_name = {upload.filename: upload for upload in uploads}
+
+    for filename, count in counts.items():
+        blob = (
+            db.query(ImageBlob)
+            .filter(ImageBlob.kind == kind, ImageBlob.filename == filename)
+            .with_for_update()
+            .first()
+        )
+        if blob:
+            blob.ref_count += count
+        else:
+            upload = uploads_by_name[filename]
+            db.add(
+                ImageBlob(
+                    kind=kind,
+                    filename=filename,
+                    content_hash=upload.content_hash,
+                    size=upload.size,
+                    ref_count=count,
+                )
+            )
+
+
+def release_images(db: Session, kind: str, filenames: List[Optional[str]]) -> List[str]:
+    counts = Counter(filename for filename in filenames if filename)
+    released = []
+
+    for filename, count in counts.items():
+        blob = (
+            db.query(ImageBlob)
+            .filter(ImageBlob.kind == kind, ImageBlob.filename == filename)
+            .with_for_update()
+            .first()
+        )
+        if blob is None:
+            # Files stored before content addressing have no reference count
+            # and may be shared, so they are left on disk.
+            continue
+
+        blob.ref_count -= count
+        if blob.ref_count <= 0:
+            db.delete(blob)
+            released.append(filename)
+
+    return released
+
+
+def remove_released_images(kind: str, filenames: List[str]) -> None:
+    if not filenames:
+        return
+
+    directory = upload_directory(kind)
+    db = SessionLocal()
+    try:
+        referenced = {
+            filename
+            for (filename,) in db.query(ImageBlob.filename).filter(
+                ImageBlob.kind == kind, ImageBlob.filename.in_(filenames)
+            )
+        }
+    finally:
+        db.close()
+
+    # A file may have been uploaded again since it was released.
+    for filename in filenames:
+        if filename in referenced:
+            continue
+        file_location = os.path.join(directory, filename)
+        if os.path.exists(file_location):
+            os.remove(file_location)
+        image_processor.remove_variants(kind, filename)
+
+
+def remove_uploads(kind: str, uploads: List[StoredUpload]) -> None:
+    # Used when the transaction that would have referenced the uploads fails.
+    # Files that already existed before this upload are left alone.
+    remove_released_images(kind, [upload.filename for upload in uploads if upload.created])
@@ -1,12 +1,19 @@
-import os
 from pydantic import EmailStr
 from sqlalchemy.orm import Session
-from config.settings import PROFILE_UPLOAD_DIRECTORY
 from database.models import User
-from fastapi import File, HTTPException, UploadFile, status
+from fastapi import HTTPException, status
 from typing import List, Optional
 from sqlalchemy.exc import SQLAlchemyError
 from services.auth_services import get_password_hash
+from services.upload_services import (
+    StoredUpload,
+    acquire_images,
+    release_images,
+    remove_released_images,
+    remove_uploads,
+)
+from services.image_services import PROFILE_IMAGES, image_processor
+from services.cache_services import USERS_TAG, invalidate
 from schema.user_schema import (
     AddUserResponse,
     UserCreate,
@@ -50,6 +57,7 @@ def add_user(db: Session, user: UserCreate) -> AddUserResponse:
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    invalidate(USERS_TAG)
 
     return AddUserResponse(
         message="User added successfully",
@@ -107,8 +115,12 @@ def delete_user(db: Session, userId: int) -> UserDeleteResponse:
         )
 
     try:
+        released = release_images(db, PROFILE_IMAGES, [response.profile_img])
         db.delete(response)
         db.commit()
+        invalidate(USERS_TAG)
+
+        remove_released_images(PROFILE_IMAGES, released)
 
         return UserDeleteResponse(
             message="User deleted successfully",
@@ -133,43 +145,26 @@ def update_user(
     is_verified: bool,
     is_staff: bool,
     is_active: bool,
-    profile_img: Optional[UploadFile] = File(None),
+    profile_img: Optional[StoredUpload] = None,
 ) -> UserUpdateResponse:
     
     user = db.query(User).filter(User.id == user_id).first()
 
     if not user:
+        if profile_img:
+            remove_uploads(PROFILE_IMAGES, [profile_img])
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
 
-    if not os.path.exists(PROFILE_UPLOAD_DIRECTORY):
-        os.makedirs(PROFILE_UPLOAD_DIRECTORY)
-
-    if profile_img:
-        allowed_extensions = {"jpg", "jpeg", "png"}
-        ext = profile_img.filename.split(".")[-1].lower()
-        if ext not in allowed_extensions:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid file type. Only JPEG and PNG are allowed.",
-            )
-
-        file_location = os.path.join(PROFILE_UPLOAD_DIRECTORY, profile_img.filename)
-        if os.path.exists(file_location):
-            base, extension = os.path.splitext(profile_img.filename)
-            counter = 1
-            while os.path.exists(file_location):
-                file_location = os.path.join(PROFILE_UPLOAD_DIRECTORY, f"{base}_{counter}{extension}")
-                counter += 1
-
-        with open(file_location, "wb") as buffer:
-            buffer.write(profile_img.file.read())
-        
-        user.profile_img = os.path.basename(file_location)
-
     try:
+        released = []
+        if profile_img and profile_img.filename != user.profile_img:
+            acquire_images(db, PROFILE_IMAGES, [profile_img])
+            released = release_images(db, PROFILE_IMAGES, [user.profile_img])
+            user.profile_img = profile_img.filename
+
         user.username = username
         user.email = email
         user.first_name = first_name
@@ -181,6 +176,11 @@ def update_user(
 
         db.commit()
         db.refresh(user)
+        invalidate(USERS_TAG)
+
+        remove_released_images(PROFILE_IMAGES, released)
+        if profile_img and profile_img.created:
+            image_processor.submit(PROFILE_IMAGES, [profile_img.filename])
 
         return UserUpdateResponse(
             message="User updated successfully",
@@ -188,6 +188,8 @@ def update_user(
 
     except SQLAlchemyError as e:
         db.rollback()
+        if profile_img:
+            remove_uploads(PROFILE_IMAGES, [profile_img])
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to update user: {str(e)}",
@@ -0,0 +1,129 @@
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Tuple
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database.models import ResourceVersion
+from services.auth_services import get_current_user, get_token_subject
+from services.db_services import get_db, oauth2_scheme
+
+logger = logging.getLogger(__name__)
+
+ZONES = "zones"
+CATEGORIES = "categories"
+RATINGS = "ratings"
+POPULARITY = "popularity"
+
+Versions = Tuple[Tuple[str, int], ...]
+
+
+class ResourceVersions:
+    """Version counters for each resource family, kept in the resource_versions table."""
+
+    def __init__(self):
+        # The versions this worker has caught up with, and the in-memory
+        # state to refresh when another worker moves a family past them.
+        self._seen: Dict[str, int] = {}
+        self._listeners: Dict[str, List[Callable[[Session], None]]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def on_change(self, families: Iterable[str], listener: Callable[[Session], None]) -> None:
+        for family in families:
+            self._listeners[family].append(listener)
+
+    def _increment(self, db: Session, families: Iterable[str]) -> None:
+        for family in families:
+            updated = (
+                db.query(ResourceVersion)
+                .filter(ResourceVersion.family == family)
+                .update({ResourceVersion.version: ResourceVersion.version + 1}, synchronize_session=False)
+            )
+            if not updated:
+                db.add(ResourceVersion(family=family, version=1))
+        db.commit()
+
+    def bump(self, db: Session, *families: str) -> None:
+        # Called after the write has committed, which a failed bump must not
+        # undo; clients then see the change on the family's next bump.
+        try:
+            try:
+                self._increment(db, families)
+            except IntegrityError:
+                # Another worker created the row first.
+                db.rollback()
+                self._increment(db, families)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to bump resource versions {families}: {e}")
+
+    def snapshot(self, db: Session, families: Iterable[str]) -> Versions:
+        families = sorted(families)
+        versions = dict(
+            db.query(ResourceVersion.family, ResourceVersion.version)
+            .filter(ResourceVersion.family.in_(families))
+            .all()
+        )
+        return tuple((family, versions.get(family, 0)) for family in families)
+
+    def etag(self, versions: Versions, resource: str) -> str:
+        joined = ",".join(f"{family}={version}" for family, version in versions)
+        digest = hashlib.sha1(f"{joined}|{resource}".encode()).hexdigest()
+        return f'"{digest}"'
+
+    def catch_up(self, db: Session, versions: Versions) -> None:
+        with self._lock:
+            stale = [family for family, version in versions if self._seen.get(family) != version]
+            for family, version in versions:
+                self._seen[family] = version
+
+        listeners = []
+        for family in stale:
+            for listener in self._listeners[family]:
+                if listener not in listeners:
+                    listeners.append(listener)
+        for listener in listeners:
+            listener(db)
+
+
+resource_versions = ResourceVersions()
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def conditional_get(*families: str):
+    # A matching If-None-Match ends the request with 304 after decoding the
+    # token and reading the shared version rows. Full responses load the
+    # user first and bring this worker's in-memory state up to date.
+    def dependency(
+        request: Request,
+        token: str = Depends(oauth2_scheme),
+        db: Session = Depends(get_db),
+    ) -> str:
+        get_token_subject(token)
+
+        resource = request.url.path
+        if request.url.query:
+            resource = f"{resource}?{request.url.query}"
+        versions = resource_versions.snapshot(db, families)
+        etag = resource_versions.etag(versions, resource)
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, etag):
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag},
+            )
+
+        get_current_user(token, db)
+        resource_versions.catch_up(db, versions)
+        return etag
+
+    return dependency
@@ -0,0 +1,158 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+from database.models import Device, PipelineState, Prediction, PredictionDaily, User, Zones
+from services.cache_services import (
+    DEVICES_TAG,
+    PREDICTIONS_TAG,
+    USERS_TAG,
+    ZONES_TAG,
+    cached,
+    invalidate,
+    zone_predictions_tag,
+)
+from services.cluster_services import visitor_key, with_clusters
+from services.rollup_services import PREDICTION_ROLLUP
+from config.settings import DASHBOARD_CACHE_TTL_SECONDS, DASHBOARD_MAX_STALE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+TODAY = "today"
+LAST_DAY = "last-day"
+LAST_WEEK = "last-week"
+LAST_MONTH = "last-month"
+
+PROBE_REQUEST = "Probe Request"
+MIN_PROBE_REQUESTS = 25
+
+
+DASHBOARD_CACHE = dict(ttl=DASHBOARD_CACHE_TTL_SECONDS, max_stale=DASHBOARD_MAX_STALE_SECONDS)
+
+
+@cached("count_superusers", tags=(USERS_TAG,), **DASHBOARD_CACHE)
+def count_superusers(db: Session) -> int:
+    return db.query(User).filter(User.is_superuser == True).count()
+
+
+@cached("count_users", tags=(USERS_TAG,), **DASHBOARD_CACHE)
+def count_users(db: Session) -> int:
+    return db.query(User).count()
+
+
+@cached("count_sections", tags=(ZONES_TAG,), **DASHBOARD_CACHE)
+def count_sections(db: Session) -> int:
+    return db.query(Zones).count()
+
+
+def visitor_window(window: str) -> Tuple[datetime, datetime]:
+    today_start = datetime.now(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    today_end = today_start.replace(hour=23, minute=59, second=59, microsecond=999999)
+
+    if window == LAST_MONTH:
+        return today_start - timedelta(days=30), today_end
+    if window == LAST_WEEK:
+        return today_start - timedelta(days=7), today_end
+    if window == LAST_DAY:
+        return today_start - timedelta(days=1), today_start
+    return today_start, today_start + timedelta(days=1)
+
+
+def count_visitors(
+    db: Session, start: datetime, end: datetime, zone_id: Optional[int] = None
+) -> int:
+    # A visitor seen only through probe requests counts once it has sent more
+    # than MIN_PROBE_REQUESTS of them; any other frame type counts at once.
+    # Visitors are device clusters, so rotated randomized addresses of one
+    # phone count once.
+    visitor = visitor_key()
+
+    def visitors(frame_filter):
+        query = with_clusters(db.query(visitor).select_from(Device)).filter(
+            and_(
+                Device.date_detected >= start,
+                Device.date_detected < end,
+                frame_filter,
+            )
+        )
+        if zone_id is not None:
+            query = query.filter(Device.zone == zone_id)
+        return query.group_by(visitor)
+
+    probing = visitors(Device.frame_type == PROBE_REQUEST).having(func.count() > MIN_PROBE_REQUESTS)
+    connected = visitors(Device.frame_type != PROBE_REQUEST)
+    counted = probing.union(connected).subquery()
+    return db.query(func.count()).select_from(counted).scalar() or 0
+
+
+@cached("visitors_count", tags=(DEVICES_TAG,), **DASHBOARD_CACHE)
+def get_visitors_count(db: Session, window: str) -> int:
+    start, end = visitor_window(window)
+    return count_visitors(db, start, end)
+
+
+@cached("section_utilization", tags=(PREDICTIONS_TAG, ZONES_TAG), **DASHBOARD_CACHE)
+def get_section_utilization_counts(db: Session) -> List[Tuple[str, int]]:
+    results = (
+        db.query(
+            Zones.name.label("section_name"),
+            func.sum(PredictionDaily.visitor_count).label("count"),
+        )
+        .join(Zones, Zones.id == PredictionDaily.zone_id)
+        .group_by(Zones.name)
+        .all()
+    )
+    return [(section_name, int(count)) for section_name, count in results]
+
+
+def warm_dashboard_cache(db: Session) -> None:
+    count_superusers(db)
+    count_users(db)
+    count_sections(db)
+    for window in (TODAY, LAST_DAY, LAST_WEEK, LAST_MONTH):
+        get_visitors_count(db, window)
+    get_section_utilization_counts(db)
+
+
+class IngestWatcher:
+    """Invalidates cached visitor data when the ingest pipeline adds rows."""
+
+    def __init__(self):
+        self._last_device_id: Optional[int] = None
+        self._last_prediction_id: Optional[int] = None
+
+    def check(self, db: Session) -> None:
+        # Devices and predictions are written by the collectors, not by this
+        # API, so their high-water marks are polled instead.
+        device_id = db.query(func.max(Device.id)).scalar() or 0
+        if self._last_device_id is not None and device_id != self._last_device_id:
+            invalidate(DEVICES_TAG)
+        self._last_device_id = device_id
+
+        prediction_id = (
+            db.query(PipelineState.last_id)
+            .filter(PipelineState.name == PREDICTION_ROLLUP)
+            .scalar()
+            or 0
+        )
+        previous = self._last_prediction_id
+        if previous is not None and prediction_id > previous:
+            zone_ids = [
+                zone_id
+                for (zone_id,) in db.query(Prediction.zone_id)
+                .filter(Prediction.id > previous, Prediction.id <= prediction_id)
+                .distinct()
+                .all()
+                if zone_id is not None
+            ]
+            invalidate(PREDICTIONS_TAG, *(zone_predictions_tag(zone_id) for zone_id in zone_ids))
+        elif previous is not None and prediction_id < previous:
+            # The rollups were rebuilt; every prediction-derived entry is suspect.
+            invalidate(PREDICTIONS_TAG, ZONES_TAG)
+        self._last_prediction_id = prediction_id
+
+
+ingest_watcher = IngestWatcher()
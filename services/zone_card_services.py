@@ -0,0 +1,273 @@
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+from config.settings import ZONE_CARD_REBUILD_SECONDS
+from database.models import Prediction, ZoneCard, ZoneImage, Zones
+from schema.zone_schema import ZoneCardData
+from services.version_services import CATEGORIES, RATINGS, ZONES, resource_versions
+
+logger = logging.getLogger(__name__)
+
+CARD_DESCRIPTION_WORDS = 7
+
+
+def classify_zone(estimated_count: int) -> str:
+    CONGESTED_THRESHOLD = 50
+    SPACIOUS_THRESHOLD = 10
+
+    if estimated_count >= CONGESTED_THRESHOLD:
+        return "Congested"
+    elif estimated_count <= SPACIOUS_THRESHOLD:
+        return "Spacious"
+    else:
+        return "Moderate"
+
+
+def current_hour_prediction_counts(db: Session):
+    current_hour = datetime.now().replace(minute=0, second=0, microsecond=0)
+
+    return (
+        db.query(
+            Prediction.zone_id.label("zone_id"),
+            func.count(Prediction.id).label("current_hour_count"),
+        )
+        .filter(
+            Prediction.first_seen >= current_hour,
+            Prediction.first_seen < current_hour + timedelta(hours=1),
+        )
+        .group_by(Prediction.zone_id)
+    )
+
+
+def zone_card_query(db: Session, zone_ids: Optional[List[int]] = None):
+    # Each child table is aggregated on its own before the join so a zone
+    # contributes exactly one row, however many images or predictions it has.
+    # Ratings come from the aggregates maintained on the zone row.
+    image_subquery = (
+        db.query(
+            ZoneImage.zone_id.label("zone_id"),
+            func.min(ZoneImage.image_url).label("image_url"),
+        )
+        .group_by(ZoneImage.zone_id)
+        .subquery()
+    )
+
+    prediction_subquery = current_hour_prediction_counts(db).subquery()
+
+    query = (
+        db.query(
+            Zones,
+            image_subquery.c.image_url,
+            func.coalesce(prediction_subquery.c.current_hour_count, 0).label(
+                "current_hour_count"
+            ),
+        )
+        .outerjoin(image_subquery, image_subquery.c.zone_id == Zones.id)
+        .outerjoin(prediction_subquery, prediction_subquery.c.zone_id == Zones.id)
+        .options(selectinload(Zones.categories))
+    )
+
+    if zone_ids is not None:
+        query = query.filter(Zones.id.in_(zone_ids))
+
+    return query.order_by(Zones.id)
+
+
+def build_zone_cards(db: Session, zone_ids: Optional[List[int]] = None) -> List[ZoneCardData]:
+    return [
+        ZoneCardData(
+            zone_id=zone.id,
+            name=zone.name,
+            description=" ".join((zone.description or "").split()[:CARD_DESCRIPTION_WORDS]),
+            rating_sum=zone.rating_sum or 0,
+            rating_count=zone.rating_count or 0,
+            review_count=zone.rating_count or 0,
+            cover_image=image_url,
+            categories=[category.category for category in zone.categories],
+            status=classify_zone(int(current_hour_count)),
+        )
+        for zone, image_url, current_hour_count in zone_card_query(db, zone_ids=zone_ids)
+    ]
+
+
+def _card_from_record(record: ZoneCard) -> ZoneCardData:
+    return ZoneCardData(
+        zone_id=record.zone_id,
+        name=record.name,
+        description=record.description or "",
+        rating_sum=record.rating_sum,
+        rating_count=record.rating_count,
+        review_count=record.review_count,
+        cover_image=record.cover_image,
+        categories=json.loads(record.categories or "[]"),
+        status=record.status,
+    )
+
+
+def _record_from_card(card: ZoneCardData) -> ZoneCard:
+    return ZoneCard(
+        zone_id=card.zone_id,
+        name=card.name,
+        description=card.description,
+        rating_sum=card.rating_sum,
+        rating_count=card.rating_count,
+        review_count=card.review_count,
+        cover_image=card.cover_image,
+        categories=json.dumps(card.categories),
+        status=card.status,
+    )
+
+
+class ZoneCardStore:
+    """In-memory zone cards backed by the zone_cards table."""
+
+    def __init__(self):
+        self._cards: Dict[int, ZoneCardData] = {}
+        self._views: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._synced_at: Optional[datetime] = None
+        self._rebuilt_at = 0.0
+
+    def _replace(self, db: Session, cards: Dict[int, ZoneCardData]) -> None:
+        with self._lock:
+            changed = self._loaded and cards != self._cards
+            self._cards = cards
+            self._views = {}
+            self._loaded = True
+        if changed:
+            resource_versions.bump(db, ZONES)
+
+    def _upsert(
+        self,
+        db: Session,
+        cards: List[ZoneCardData],
+        removed_ids: List[int] = (),
+        bump: bool = True,
+    ) -> None:
+        with self._lock:
+            updated = dict(self._cards)
+            for card in cards:
+                updated[card.zone_id] = card
+            for zone_id in removed_ids:
+                updated.pop(zone_id, None)
+            self._cards = updated
+            self._views = {}
+        # Cards pulled from other workers were bumped by the worker that
+        # wrote them.
+        if bump:
+            resource_versions.bump(db, ZONES)
+
+    def _persist(self, db: Session, cards: List[ZoneCardData], removed_ids: List[int] = ()) -> None:
+        for card in cards:
+            db.merge(_record_from_card(card))
+        if removed_ids:
+            db.query(ZoneCard).filter(ZoneCard.zone_id.in_(removed_ids)).delete(
+                synchronize_session=False
+            )
+        db.commit()
+
+    def rebuild(self, db: Session) -> None:
+        synced_at = db.query(func.now()).scalar()
+        cards = build_zone_cards(db)
+        zone_ids = {card.zone_id for card in cards}
+        stale_ids = [
+            zone_id
+            for (zone_id,) in db.query(ZoneCard.zone_id).all()
+            if zone_id not in zone_ids
+        ]
+        self._persist(db, cards, stale_ids)
+        self._replace(db, {card.zone_id: card for card in cards})
+        self._synced_at = synced_at
+        self._rebuilt_at = time.monotonic()
+
+    def load(self, db: Session) -> None:
+        synced_at = db.query(func.now()).scalar()
+        records = db.query(ZoneCard).all()
+        if not records:
+            self.rebuild(db)
+            return
+
+        self._replace(db, {record.zone_id: _card_from_record(record) for record in records})
+        self._synced_at = synced_at
+
+    def ensure_loaded(self, db: Session) -> None:
+        if not self._loaded:
+            self.load(db)
+
+    def refresh_zones(self, db: Session, zone_ids: List[int]) -> None:
+        # Called from write paths after their own commit. A failure here must
+        # not fail the write; the periodic sync repairs the card.
+        if not zone_ids:
+            return
+        try:
+            cards = build_zone_cards(db, zone_ids=list(zone_ids))
+            found_ids = {card.zone_id for card in cards}
+            removed_ids = [zone_id for zone_id in zone_ids if zone_id not in found_ids]
+            self._persist(db, cards, removed_ids)
+            self._upsert(db, cards, removed_ids)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to refresh zone cards {zone_ids}: {e}")
+
+    def remove_zone(self, db: Session, zone_id: int) -> None:
+        self.refresh_zones(db, [zone_id])
+
+    def refresh_occupancy(self, db: Session) -> None:
+        counts = dict(current_hour_prediction_counts(db).all())
+        changed = []
+        for card in self._cards.values():
+            status = classify_zone(int(counts.get(card.zone_id, 0)))
+            if card.status != status:
+                changed.append(card.model_copy(update={"status": status}))
+        if changed:
+            self._persist(db, changed)
+            self._upsert(db, changed)
+
+    def pull(self, db: Session) -> None:
+        # Pick up cards written by other workers since the last sync.
+        if not self._loaded:
+            return
+        synced_at = db.query(func.now()).scalar()
+        changed = [
+            _card_from_record(record)
+            for record in db.query(ZoneCard).filter(ZoneCard.update_date >= self._synced_at).all()
+        ]
+        current_ids = {zone_id for (zone_id,) in db.query(ZoneCard.zone_id).all()}
+        removed_ids = [zone_id for zone_id in self._cards if zone_id not in current_ids]
+        if changed or removed_ids:
+            self._upsert(db, changed, removed_ids, bump=False)
+        self._synced_at = synced_at
+
+    def sync(self, db: Session) -> None:
+        if not self._loaded or time.monotonic() - self._rebuilt_at > ZONE_CARD_REBUILD_SECONDS:
+            self.rebuild(db)
+            return
+
+        self.pull(db)
+        self.refresh_occupancy(db)
+
+    def cards(self, db: Session) -> List[ZoneCardData]:
+        self.ensure_loaded(db)
+        return sorted(self._cards.values(), key=lambda card: card.zone_id)
+
+    def invalidate_views(self) -> None:
+        with self._lock:
+            self._views = {}
+
+    def view(self, db: Session, name: str, build: Callable[[List[ZoneCardData]], Any]) -> Any:
+        # Read endpoints memoize their response lists until the next change.
+        self.ensure_loaded(db)
+        views = self._views
+        if name not in views:
+            views[name] = build(self.cards(db))
+        return views[name]
+
+
+zone_card_store = ZoneCardStore()
+resource_versions.on_change((ZONES, CATEGORIES, RATINGS), zone_card_store.pull)
@@ -1,15 +1,11 @@
 from datetime import date, datetime, timedelta
-import uuid
-import os
-import shutil
 from pydantic import BaseModel
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import Dict, List, Optional, Set
 from schema.chart_schema import ChartDataResponse
 from database.models import Zones, ZoneImage, Comment, Prediction, Category, Device
 from sqlalchemy.exc import SQLAlchemyError
-from fastapi import UploadFile, status
-from config.settings import ZONE_UPLOAD_DIRECTORY, DIR_UPLOAD_ZONE_IMG, DIR_UPLOAD_PROFILE_IMG
+from fastapi import BackgroundTasks, status
 from fastapi.exceptions import HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
@@ -26,42 +22,69 @@ from schema.zone_schema import (
     ZoneRemoved,
     CategoryResponse,
     ZoneUpdate,
+    ZoneCardData,
+    ZoneSearchResponse,
+    ZoneSearchResult,
+    CategoryFacet,
+)
+from services.zone_card_services import zone_card_store
+from services.rating_services import average_rating
+from services.image_services import (
+    ZONE_IMAGES,
+    ImageSize,
+    image_processor,
+    profile_image_url,
+    zone_image_url,
+)
+from services.popularity_services import popularity_index
+from services.version_services import ZONES, resource_versions
+from services.cache_services import ZONES_TAG, invalidate
+from services.sync_services import ZONE_ENTITY, ZONE_IMAGE_ENTITY, record_deletions
+from services.search_services import search_index
+from services.visitor_services import count_visitors
+from services.upload_services import (
+    StoredUpload,
+    acquire_images,
+    release_images,
+    remove_released_images,
+    remove_uploads,
 )
 from schema.comment_schema import CommentViewResponse
-from statistics import mean
-from sqlalchemy import and_, case, func
+from sqlalchemy import func
 
 
 def create_zone(
     db: Session,
     zone: ZoneCreate,
-    files: List[UploadFile],
+    images: List[StoredUpload],
 ) -> ZoneResponse:
     db_zone = Zones(name=zone.name, description=zone.description)
 
     try:
         db.add(db_zone)
-        db.commit()
-        db.refresh(db_zone)
+        db.flush()
 
-        image_responses = []
-        for file in files:
-            unique_filename = f"{uuid.uuid4()}_{file.filename}"
-            file_location = os.path.join(ZONE_UPLOAD_DIRECTORY, unique_filename)
-
-            with open(file_location, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+        zone_images = [
+            ZoneImage(image_url=image.filename, zone_id=db_zone.id) for image in images
+        ]
+        db.add_all(zone_images)
+        acquire_images(db, ZONE_IMAGES, images)
+        db.commit()
 
-            zone_image = ZoneImage(image_url=unique_filename, zone_id=db_zone.id)
-            db.add(zone_image)
-            db.commit()
+        image_processor.submit(ZONE_IMAGES, [image.filename for image in images if image.created])
 
-            image_responses.append(
-                ZoneImageResponse(
-                    id=zone_image.id,
-                    image_url=f"/static/{DIR_UPLOAD_ZONE_IMG}/{zone_image.image_url}",
-                )
+        image_responses = [
+            ZoneImageResponse(
+                id=zone_image.id,
+                image_url=zone_image_url(zone_image.image_url),
             )
+            for zone_image in zone_images
+        ]
+
+        resource_versions.bump(db, ZONES)
+        invalidate(ZONES_TAG)
+        zone_card_store.refresh_zones(db, [db_zone.id])
+        search_index.refresh_zones(db, [db_zone.id])
 
         return ZoneResponse(
             id=db_zone.id,
@@ -72,13 +95,17 @@ def create_zone(
 
     except SQLAlchemyError as e:
         db.rollback()
+        remove_uploads(ZONE_IMAGES, images)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     except Exception as e:
         db.rollback()
+        remove_uploads(ZONE_IMAGES, images)
         raise HTTPException(status_code=500, detail=f"Something went wrong: {str(e)}")
 
 
-def get_zones(db: Session, skip: int = 0, limit: int = 10) -> List[ZoneResponse]:
+def get_zones(
+    db: Session, skip: int = 0, limit: int = 10, size: Optional[ImageSize] = None
+) -> List[ZoneResponse]:
     zones = (
         db.query(Zones)
         .options(joinedload(Zones.images))
@@ -102,7 +129,7 @@ def get_zones(db: Session, skip: int = 0, limit: int = 10) -> List[ZoneResponse]
                 images=[
                     ZoneImageResponse(
                         id=image.id,
-                        image_url=f"/static/{DIR_UPLOAD_ZONE_IMG}/{image.image_url}",
+                        image_url=zone_image_url(image.image_url, size),
                     )
                     for image in zone.images
                 ],
@@ -112,7 +139,7 @@ def get_zones(db: Session, skip: int = 0, limit: int = 10) -> List[ZoneResponse]
     return zone_responses
 
 
-def get_zone(db: Session, zone_id: int) -> ZoneResponse:
+def get_zone(db: Session, zone_id: int, size: Optional[ImageSize] = None) -> ZoneResponse:
     zone = (
         db.query(Zones)
         .filter(Zones.id == zone_id)
@@ -132,7 +159,7 @@ def get_zone(db: Session, zone_id: int) -> ZoneResponse:
         images=[
             ZoneImageResponse(
                 id=image.id,
-                image_url=f"/static/{DIR_UPLOAD_ZONE_IMG}/{image.image_url}",
+                image_url=zone_image_url(image.image_url, size),
             )
             for image in zone.images
         ],
@@ -143,13 +170,14 @@ def update_zone(
     db: Session,
     zone_id: int,
     zone: ZoneUpdate,
-    files: Optional[List[UploadFile]] = None,
+    images: Optional[List[StoredUpload]] = None,
 ) -> ZoneResponse:
 
     from database.models import zone_category_association
 
     db_zone = db.query(Zones).filter(Zones.id == zone_id).first()
     if not db_zone:
+        remove_uploads(ZONE_IMAGES, images or [])
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Zone not found"
         )
@@ -166,75 +194,69 @@ def update_zone(
         if zone.categories is not None:
 
             existing_category_ids = {
-                assoc.category_id
-                for assoc in db.query(zone_category_association)
+                category_id
+                for (category_id,) in db.query(zone_category_association.c.category_id)
                 .filter(zone_category_association.c.zone_id == zone_id)
                 .all()
             }
 
             new_category_ids = {cat.category_id for cat in zone.categories}
-
-            for existing_id in existing_category_ids:
-                if existing_id not in new_category_ids:
-                    db.query(zone_category_association).filter(
-                        zone_category_association.c.zone_id == zone_id,
-                        zone_category_association.c.category_id == existing_id,
-                    ).delete()
-
-            for category_data in zone.categories:
-
-                if category_data.category_id in existing_category_ids:
-                    continue
-
-                category = (
-                    db.query(Category)
-                    .filter(Category.id == category_data.category_id)
-                    .first()
-                )
-                if not category:
+            added_category_ids = new_category_ids - existing_category_ids
+
+            if added_category_ids:
+                found_category_ids = {
+                    category_id
+                    for (category_id,) in db.query(Category.id)
+                    .filter(Category.id.in_(added_category_ids))
+                    .all()
+                }
+                missing_category_ids = sorted(added_category_ids - found_category_ids)
+                if missing_category_ids:
                     raise HTTPException(
                         status_code=status.HTTP_404_NOT_FOUND,
-                        detail=f"Category with id {category_data.category_id} not found",
+                        detail=f"Category with id {missing_category_ids[0]} not found",
                     )
 
-                new_association = zone_category_association.insert().values(
-                    zone_id=zone_id, category_id=category_data.category_id
-                )
-
-                db.execute(new_association)
+            # Category links are not columns of the zone row, so a change to
+            # them is recorded on update_date for the delta sync.
+            if new_category_ids != existing_category_ids:
+                db_zone.update_date = func.now()
 
-        db.commit()
+                db.execute(
+                    zone_category_association.delete().where(
+                        zone_category_association.c.zone_id == zone_id,
+                        zone_category_association.c.category_id.notin_(new_category_ids),
+                    )
+                )
 
-        if files:
-            for file in files:
-                try:
-                    if not file.content_type.startswith("image/"):
-                        raise HTTPException(
-                            status_code=status.HTTP_400_BAD_REQUEST,
-                            detail=f"File {file.filename} is not an image",
+                if added_category_ids:
+                    db.execute(
+                        zone_category_association.insert().values(
+                            [
+                                {"zone_id": zone_id, "category_id": category_id}
+                                for category_id in sorted(added_category_ids)
+                            ]
                         )
-
-                    unique_filename = f"{uuid.uuid4()}_{file.filename}"
-                    file_location = os.path.join(ZONE_UPLOAD_DIRECTORY, unique_filename)
-
-                    os.makedirs(ZONE_UPLOAD_DIRECTORY, exist_ok=True)
-
-                    with open(file_location, "wb+") as buffer:
-                        shutil.copyfileobj(file.file, buffer)
-
-                    zone_image = ZoneImage(
-                        image_url=unique_filename, zone_id=db_zone.id
                     )
-                    db.add(zone_image)
-                    db.flush()
 
-                except Exception as e:
-                    print(f"Error processing file {file.filename}: {str(e)}")
-                    continue
+        if images:
+            db.add_all(
+                [ZoneImage(image_url=image.filename, zone_id=db_zone.id) for image in images]
+            )
+            acquire_images(db, ZONE_IMAGES, images)
+
+        db.commit()
 
-            db.commit()
+        if images:
+            image_processor.submit(
+                ZONE_IMAGES, [image.filename for image in images if image.created]
+            )
 
         db.refresh(db_zone)
+        resource_versions.bump(db, ZONES)
+        invalidate(ZONES_TAG)
+        zone_card_store.refresh_zones(db, [db_zone.id])
+        search_index.refresh_zones(db, [db_zone.id])
 
         return ZoneResponse(
             id=db_zone.id,
@@ -243,7 +265,7 @@ def update_zone(
             images=[
                 ZoneImageResponse(
                     id=image.id,
-                    image_url=f"/static/{DIR_UPLOAD_ZONE_IMG}/{image.image_url}",
+                    image_url=zone_image_url(image.image_url),
                 )
                 for image in db_zone.images
             ],
@@ -251,22 +273,27 @@ def update_zone(
 
     except SQLAlchemyError as e:
         db.rollback()
+        remove_uploads(ZONE_IMAGES, images or [])
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Database error: {str(e)}",
         )
     except HTTPException as he:
         db.rollback()
+        remove_uploads(ZONE_IMAGES, images or [])
         raise he
     except Exception as e:
         db.rollback()
+        remove_uploads(ZONE_IMAGES, images or [])
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}",
         )
 
 
-def delete_zone(db: Session, zone_id: int) -> ZoneRemoved | None:
+def delete_zone(
+    db: Session, zone_id: int, background_tasks: BackgroundTasks
+) -> ZoneRemoved | None:
     db_zone = db.query(Zones).filter(Zones.id == zone_id).first()
 
     if not db_zone:
@@ -276,26 +303,22 @@ def delete_zone(db: Session, zone_id: int) -> ZoneRemoved | None:
         )
 
     try:
+        filenames = [image.image_url for image in db_zone.images]
+        record_deletions(db, ZONE_IMAGE_ENTITY, [image.id for image in db_zone.images])
+        record_deletions(db, ZONE_ENTITY, [zone_id])
+        for image in db_zone.images:
+            db.delete(image)
         db.delete(db_zone)
+        released = release_images(db, ZONE_IMAGES, filenames)
         db.commit()
 
-        for image in db_zone.images:
-            image_path = os.path.join(ZONE_UPLOAD_DIRECTORY, image.image_url)
-            if os.path.exists(image_path):
-                try:
-                    os.remove(image_path)
-                except OSError as e:
-                    raise HTTPException(
-                        status_code=500, detail=f"Failed to delete image: {str(e)}"
-                    )
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Error occurred while deleting image: {str(e)}",
-                )
+        # Files still referenced by another zone are kept.
+        background_tasks.add_task(remove_released_images, ZONE_IMAGES, released)
 
-            db.delete(image)
-            db.commit()
+        resource_versions.bump(db, ZONES)
+        invalidate(ZONES_TAG)
+        zone_card_store.remove_zone(db, zone_id)
+        search_index.refresh_zones(db, [zone_id])
 
         return ZoneRemoved(
             message="You have successfully removed the zone",
@@ -306,19 +329,21 @@ def delete_zone(db: Session, zone_id: int) -> ZoneRemoved | None:
         raise e
 
 
-def get_info_zone_service(db: Session, zone_id: int) -> ZoneInfoResponse:
-    current_day = date.today()
-    
+def get_info_zone_service(
+    db: Session,
+    zone_id: int,
+    comment_page: int = 1,
+    comment_limit: int = 20,
+    size: Optional[ImageSize] = None,
+) -> ZoneInfoResponse:
+    today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    today_end = today_start + timedelta(days=1)
+
     try:
         zone = (
             db.query(Zones)
             .filter(Zones.id == zone_id)
-            .options(
-                joinedload(Zones.predictions),
-                joinedload(Zones.comment_related),
-                joinedload(Zones.categories),
-                joinedload(Zones.images),
-            )
+            .options(selectinload(Zones.images))
             .first()
         )
 
@@ -328,12 +353,25 @@ def get_info_zone_service(db: Session, zone_id: int) -> ZoneInfoResponse:
                 detail="Zone not found",
             )
 
-        total_rating = round(mean(rating.rating for rating in zone.comment_related), 2) if zone.comment_related else 0.0
+        todays_predictions = (
+            db.query(Prediction.estimated_count, Prediction.first_seen)
+            .filter(
+                Prediction.zone_id == zone_id,
+                Prediction.first_seen >= today_start,
+                Prediction.first_seen < today_end,
+            )
+            .order_by(Prediction.first_seen.desc())
+            .all()
+        )
 
-        sorted_predictions = sorted(
-            zone.predictions,
-            key=lambda prediction: prediction.first_seen,
-            reverse=True
+        comments = (
+            db.query(Comment)
+            .options(joinedload(Comment.user))
+            .filter(Comment.zone_id == zone_id)
+            .order_by(Comment.date_added.desc(), Comment.id.desc())
+            .offset((comment_page - 1) * comment_limit)
+            .limit(comment_limit)
+            .all()
         )
 
         return ZoneInfoResponse(
@@ -346,34 +384,36 @@ def get_info_zone_service(db: Session, zone_id: int) -> ZoneInfoResponse:
                     zone_id=comment.zone_id,
                     first_name=comment.user.first_name,
                     last_name=comment.user.last_name,
-                    profile_img=f"/static/{DIR_UPLOAD_PROFILE_IMG}/{comment.user.profile_img}",
+                    profile_img=profile_image_url(comment.user.profile_img, "thumb" if size else None),
                     comment=comment.comment,
                     rating=comment.rating,
                     date_added=comment.date_added.strftime("%m/%d/%Y"),
                     update_date=comment.update_date.strftime("%m/%d/%Y"),
                 )
-                for comment in zone.comment_related
-            ] if zone.comment_related else [],
+                for comment in comments
+            ],
             images=[
                 ZoneImageResponse(
                     id=image.id,
                     zone_id=image.zone_id,
-                    image_url=f"/static/{DIR_UPLOAD_ZONE_IMG}/{image.image_url}",
+                    image_url=zone_image_url(image.image_url, size),
                 )
                 for image in zone.images
-            ] if zone.images else [],
+            ],
             predictions=[
                 ChartDataResponse(
-                    count=prediction.estimated_count,
-                    time=prediction.first_seen.strftime("%I:%M %p"),
+                    count=estimated_count,
+                    time=first_seen.strftime("%I:%M %p"),
                 )
-                for prediction in sorted_predictions
-                if prediction.first_seen.date() == current_day
-            ] if sorted_predictions else [],
-            total_rating=total_rating,
-            total_reviews=len(zone.comment_related),
+                for estimated_count, first_seen in todays_predictions
+            ],
+            total_rating=average_rating(zone.rating_sum or 0, zone.rating_count or 0),
+            total_reviews=zone.rating_count or 0,
         )
 
+    except HTTPException:
+        raise
+
     except SQLAlchemyError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -386,127 +426,124 @@ def get_info_zone_service(db: Session, zone_id: int) -> ZoneInfoResponse:
             detail=f"Something went wrong while fetching zone information: {e}",
         )
 
-def get_popular_zones_service(db: Session) -> List[PopularSectionResponse]:
-    query_popular_zones = (
-        db.query(
-            Zones,
-            func.avg(Comment.rating).label("average_rating"),
-            func.min(ZoneImage.image_url).label("image_url")
-        )
-        .outerjoin(Comment)
-        .outerjoin(ZoneImage)
-        .group_by(Zones.id)
-        .order_by(func.avg(Comment.rating).desc())
-        .options(joinedload(Zones.comment_related))
-        .all()
-    )
+def get_popular_zones_service(
+    db: Session, limit: Optional[int] = None, size: Optional[ImageSize] = None
+) -> List[PopularSectionResponse]:
+    def build(cards: List[ZoneCardData]) -> List[PopularSectionResponse]:
+        cards_by_zone = {card.zone_id: card for card in cards}
+        ranked_ids = popularity_index.ranked(db)
+        ranked = [cards_by_zone[zone_id] for zone_id in ranked_ids if zone_id in cards_by_zone]
+        unranked_ids = set(cards_by_zone) - set(ranked_ids)
+        ranked += [card for card in cards if card.zone_id in unranked_ids]
+        return [
+            PopularSectionResponse(
+                section_id=card.zone_id,
+                section_name=card.name,
+                total_rating=card.average_rating,
+                image_url=zone_image_url(card.cover_image, size) if card.cover_image else None,
+            )
+            for card in ranked
+        ]
+
+    popular_zones = zone_card_store.view(db, f"popular:{size}", build)
+    return popular_zones[:limit] if limit else popular_zones
+
+
+def get_recommended_zones_service(
+    db: Session, size: Optional[ImageSize] = None
+) -> List[RecommendSectionResponse]:
+    def build(cards: List[ZoneCardData]) -> List[RecommendSectionResponse]:
+        return [
+            RecommendSectionResponse(
+                section_id=card.zone_id,
+                status=card.status,
+                section_name=card.name,
+                description=card.description,
+                total_rating=card.average_rating,
+                image_url=zone_image_url(card.cover_image, size) if card.cover_image else None,
+            )
+            for card in cards
+        ]
+
+    return zone_card_store.view(db, f"recommended:{size}", build)
+
+
+def get_all_section_section_filters(
+    db: Session, size: Optional[ImageSize] = None
+) -> List[AllSectionResponse]:
+    def build(cards: List[ZoneCardData]) -> List[AllSectionResponse]:
+        return [
+            AllSectionResponse(
+                section_id=card.zone_id,
+                section_name=card.name,
+                description=card.description,
+                total_rating=card.average_rating,
+                image_url=zone_image_url(card.cover_image, size) if card.cover_image else None,
+                categories=[
+                    CategoryResponse(
+                        category_name=category,
+                    )
+                    for category in card.categories
+                ],
+            )
+            for card in cards
+        ]
 
-    return [
-        PopularSectionResponse(
-            section_id=popular_zone.id,
-            section_name=popular_zone.name,
-            total_rating=round(avg_rating, 2) if avg_rating is not None else 0.0,
-            image_url=(
-                f"/static/{DIR_UPLOAD_ZONE_IMG}/{image_url}" if image_url else None
-            ),
-        )
-        for popular_zone, avg_rating, image_url in query_popular_zones
-    ]
+    return zone_card_store.view(db, f"all_sections:{size}", build)
 
 
-def classify_zone(estimated_count: int) -> str:
-    CONGESTED_THRESHOLD = 50
-    SPACIOUS_THRESHOLD = 10
-
-    if estimated_count >= CONGESTED_THRESHOLD:
-        return "Congested"
-    elif estimated_count <= SPACIOUS_THRESHOLD:
-        return "Spacious"
-    else:
-        return "Moderate"
-
-
-def get_recommended_zones_service(db: Session) -> List[RecommendSectionResponse]:
-    current_datetime = datetime.now()
-    current_hour = current_datetime.replace(minute=0, second=0, microsecond=0)
-
-    query_recommended_zones = (
-        db.query(
-            Zones,
-            func.coalesce(func.avg(Comment.rating), 0.0).label("average_rating"),
-            func.max(ZoneImage.image_url).label("image_url"),
-            func.count(
-                case(
-                    (
-                        and_(
-                            Prediction.first_seen >= current_hour,
-                            Prediction.first_seen < current_hour + timedelta(hours=1)
-                        ),
-                        Prediction.estimated_count
-                    )
-                )
-            ).label("current_hour_count"),
+def search_zones_service(
+    db: Session,
+    query: Optional[str] = None,
+    category_ids: Optional[List[int]] = None,
+    limit: int = 20,
+    size: Optional[ImageSize] = None,
+) -> ZoneSearchResponse:
+    search_index.ensure_built(db)
+    ranked, facets = search_index.search(query, category_ids)
+    cards = {card.zone_id: card for card in zone_card_store.cards(db)}
+
+    results = []
+    for zone_id, score in ranked:
+        card = cards.get(zone_id)
+        if card is None:
+            continue
+        results.append(
+            ZoneSearchResult(
+                section_id=card.zone_id,
+                section_name=card.name,
+                description=card.description,
+                total_rating=card.average_rating,
+                image_url=zone_image_url(card.cover_image, size) if card.cover_image else None,
+                categories=[
+                    CategoryResponse(category_name=category) for category in card.categories
+                ],
+                score=round(score, 3),
+            )
         )
-        .outerjoin(Comment)
-        .outerjoin(Prediction)
-        .outerjoin(ZoneImage)
-        .group_by(Zones.id)
-        .order_by(Zones.id)
-        .options(joinedload(Zones.predictions))
-        .all()
+        if len(results) >= limit:
+            break
+
+    return ZoneSearchResponse(
+        query=query or "",
+        total=len(ranked),
+        results=results,
+        facets=[
+            CategoryFacet(category_id=category_id, category_name=category_name, count=count)
+            for category_id, (category_name, count) in sorted(
+                facets.items(), key=lambda item: (-item[1][1], item[1][0])
+            )
+        ],
     )
 
-    return [
-        RecommendSectionResponse(
-            section_id=zone.id,
-            status=classify_zone(current_hour_count),
-            section_name=zone.name,
-            description=" ".join(zone.description.split()[:7]),
-            total_rating=round(average_rating, 2),
-            image_url=(
-                f"/static/{DIR_UPLOAD_ZONE_IMG}/{image_url}" if image_url else None
-            ),
-        )
-        for zone, average_rating, image_url, current_hour_count in query_recommended_zones
-    ]
-
 
-def get_all_section_section_filters(db: Session) -> List[AllSectionResponse]:
-    query_all_sections = (
-        db.query(
-            Zones,
-            func.coalesce(func.avg(Comment.rating), 0.0).label("average_rating"),
-            func.max(ZoneImage.image_url).label('image_url'),
-        )
-        .outerjoin(Comment)
-        .outerjoin(ZoneImage)
-        .group_by(Zones.id)
+def get_all_zones(db: Session, size: Optional[ImageSize] = None) -> List[AllSectionWebApi]:
+    zones = (
+        db.query(Zones)
+        .options(selectinload(Zones.images), selectinload(Zones.categories))
         .all()
     )
 
-    return [
-        AllSectionResponse(
-            section_id=popular_zone.id,
-            section_name=popular_zone.name,
-            description=" ".join(popular_zone.description.split()[:7]),
-            total_rating=round(average_rating, 2),
-            image_url=(
-                f"/static/{DIR_UPLOAD_ZONE_IMG}/{image_url}" if image_url else None
-            ),
-            categories=[
-                CategoryResponse(
-                    category_name=category.category,
-                )
-                for category in popular_zone.categories
-            ],
-        )
-        for popular_zone, average_rating, image_url in query_all_sections
-    ]
-
-
-def get_all_zones(db: Session) -> List[AllSectionWebApi]:
-    zones = db.query(Zones).options(joinedload(Zones.images)).all()
-
     if not zones:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="No zones found"
@@ -522,7 +559,7 @@ def get_all_zones(db: Session) -> List[AllSectionWebApi]:
                 image_url=[
                     ZoneImageResponse(
                         id=image.id,
-                        image_url=f"/static/{DIR_UPLOAD_ZONE_IMG}/{image.image_url}",
+                        image_url=zone_image_url(image.image_url, size),
                     )
                     for image in zone.images
                 ],
@@ -556,48 +593,7 @@ def get_section_count_analysis(db: Session, sectionId: int) -> dict:
     section_name = section_name[0] if section_name else None
 
     def get_count(start, end):
-        subquery_probe_request = (
-            db.query(Device.device_addr)
-            .filter(
-                and_(
-                    Device.date_detected >= start,
-                    Device.date_detected < end,
-                    Device.zone == sectionId,
-                    Device.frame_type == "Probe Request"
-                )
-            )
-            .group_by(Device.device_addr)
-            .having(func.count(Device.device_addr) > 25)
-            .subquery()
-        )
-
-        subquery_other_frame = (
-            db.query(Device.device_addr)
-            .filter(
-                and_(
-                    Device.date_detected >= start,
-                    Device.date_detected < end,
-                    Device.zone == sectionId,
-                    Device.frame_type != "Probe Request"
-                )
-            )
-            .group_by(Device.device_addr)
-            .subquery()
-        )
-
-        count = (
-            db.query(func.coalesce(func.count(func.distinct(Device.device_addr)), 0))
-            .filter(
-                or_(
-                    Device.device_addr.in_(subquery_probe_request),
-                    Device.device_addr.in_(subquery_other_frame)
-                )
-            )
-            .scalar()
-            or 0
-        )
-
-        return count
+        return count_visitors(db, start, end, sectionId)
 
     counts = {
         "section": section_name,
@@ -609,3 +605,70 @@ def get_section_count_analysis(db: Session, sectionId: int) -> dict:
     }
 
     return counts
+
+
+HOME_SECTIONS = {
+    "popular": PopularSectionResponse,
+    "recommended": RecommendSectionResponse,
+    "all": AllSectionResponse,
+}
+HOME_COUNTS_SECTION = "counts"
+
+
+def parse_home_fields(fields: Optional[List[str]]) -> Dict[str, Set[str]]:
+    selected: Dict[str, Set[str]] = {}
+    for field in fields or []:
+        section, _, name = field.partition(".")
+        model = HOME_SECTIONS.get(section)
+        if model is None or name not in model.model_fields:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field {field}; expected <section>.<field> for sections {', '.join(HOME_SECTIONS)}",
+            )
+        selected.setdefault(section, set()).add(name)
+    return selected
+
+
+def get_home_service(
+    db: Session,
+    sections: List[str],
+    fields: Optional[List[str]] = None,
+    section_id: Optional[int] = None,
+    popular_limit: Optional[int] = None,
+    size: Optional[ImageSize] = None,
+) -> dict:
+    unknown = [
+        section for section in sections
+        if section not in HOME_SECTIONS and section != HOME_COUNTS_SECTION
+    ]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown sections: {', '.join(unknown)}",
+        )
+    if HOME_COUNTS_SECTION in sections and section_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="section_id is required for the counts section",
+        )
+
+    selected_fields = parse_home_fields(fields)
+
+    # All card sections are views over the same in-memory zone cards, loaded
+    # at most once for the whole response.
+    zone_card_store.ensure_loaded(db)
+    builders = {
+        "popular": lambda: get_popular_zones_service(db, limit=popular_limit, size=size),
+        "recommended": lambda: get_recommended_zones_service(db, size=size),
+        "all": lambda: get_all_section_section_filters(db, size=size),
+    }
+
+    home = {}
+    for section in dict.fromkeys(sections):
+        if section == HOME_COUNTS_SECTION:
+            home[section] = get_section_count_analysis(db, section_id)
+            continue
+        include = selected_fields.get(section)
+        home[section] = [item.model_dump(include=include) for item in builders[section]()]
+
+    return home
@@ -0,0 +1,19 @@
+import os
+
+# The settings module requires these at import; the tests themselves run on
+# in-memory SQLite databases.
+for name, value in {
+    "DATABASE_NAME": "test",
+    "DATABASE_USERNAME": "test",
+    "DATABASE_PASSWORD": "test",
+    "DATABASE_HOST": "localhost",
+    "SECRET_KEY": "test",
+    "ALGORITHM": "HS256",
+    "ZONE_UPLOAD_DIRECTORY": "static/zone",
+    "PROFILE_UPLOAD_DIRECTORY": "static/profile",
+    "SMTP_SERVER": "localhost",
+    "SMTP_USERNAME": "test",
+    "SMTP_PASSWORD": "test",
+    "SMTP_PORT": "25",
+}.items():
+    os.environ.setdefault(name, value)
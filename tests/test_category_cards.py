@@ -0,0 +1,47 @@
+import unittest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from database.models import Base, Category, Zones
+from schema.category_schema import CategoryCreate
+from services.category_services import add_category, category_remove, category_update
+from services.zone_card_services import zone_card_store
+
+
+class CategoryZoneCardTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)()
+
+        self.category = Category(category="Reading")
+        self.db.add(Zones(name="Reference", description="Quiet tables", categories=[self.category]))
+        self.db.commit()
+        zone_card_store.rebuild(self.db)
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def _card_categories(self):
+        return [card.categories for card in zone_card_store.cards(self.db)]
+
+    def test_rename_refreshes_cards(self):
+        category_update(self.db, self.category.id, CategoryCreate(category_name="Study"))
+        self.assertEqual(self._card_categories(), [["Study"]])
+
+    def test_remove_refreshes_cards(self):
+        category_remove(self.db, self.category.id)
+        self.assertEqual(self._card_categories(), [[]])
+
+    def test_create_leaves_cards_unchanged(self):
+        add_category(self.db, CategoryCreate(category_name="Computers"))
+        self.assertEqual(self._card_categories(), [["Reading"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from database.models import Base, Comment, User, Zones
+from services.comment_services import delete_comment
+from services.rating_services import reconcile_zone_ratings
+
+
+class NullRatingTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)()
+
+        user = User(username="reader", email="reader@example.com", first_name="Test", last_name="User")
+        self.zone = Zones(name="Reference", description="Quiet tables", rating_sum=4, rating_count=1)
+        self.db.add_all([user, self.zone])
+        self.db.flush()
+        self.rated = Comment(user_id=user.id, zone_id=self.zone.id, comment="Quiet", rating=4)
+        self.unrated = Comment(user_id=user.id, zone_id=self.zone.id, comment="Busy", rating=None)
+        self.db.add_all([self.rated, self.unrated])
+        self.db.flush()
+        # The column default would turn an explicit None into 0 on insert.
+        self.db.query(Comment).filter(Comment.id == self.unrated.id).update({Comment.rating: None})
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def _aggregates(self):
+        self.db.refresh(self.zone)
+        return self.zone.rating_sum, self.zone.rating_count
+
+    def test_deleting_an_unrated_comment_keeps_the_count(self):
+        delete_comment(self.db, self.unrated.id)
+        self.assertEqual(self._aggregates(), (4, 1))
+        self.assertEqual(reconcile_zone_ratings(self.db), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+from services import rollup_services
+from services.rollup_services import settled_count
+
+
+class SettledCountTest(unittest.TestCase):
+    def tearDown(self):
+        rollup_services._gaps.clear()
+
+    def test_stops_at_gap_above_ceiling(self):
+        self.assertEqual(settled_count("test", 0, [1, 2, 4, 5], ceiling=2), 2)
+
+    def test_skips_gaps_at_or_below_ceiling(self):
+        self.assertEqual(settled_count("test", 0, [2, 5, 9, 10], ceiling=8), 4)
+
+    def test_waits_on_part_of_gap_above_ceiling(self):
+        self.assertEqual(settled_count("test", 0, [1, 5, 6], ceiling=3), 1)
+
+    def test_skips_gap_after_delay(self):
+        self.assertEqual(settled_count("test", 0, [1, 3], gap_seconds=0), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
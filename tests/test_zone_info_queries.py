@@ -0,0 +1,85 @@
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from database.models import Base, Comment, Prediction, User, ZoneImage, Zones
+from services.zone_services import get_info_zone_service
+
+# Zone with its images, today's predictions and one page of comments with
+# their users.
+ZONE_INFO_QUERIES = 4
+
+
+class ZoneInfoQueryCountTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)()
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self._record_statement)
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def _record_statement(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def _add_zone(self, comments: int, predictions: int) -> int:
+        zone = Zones(name=f"Zone {comments}", description="Reading area")
+        self.db.add(zone)
+        self.db.flush()
+
+        users = [
+            User(
+                username=f"user{zone.id}-{i}",
+                email=f"user{zone.id}-{i}@example.com",
+                first_name="Test",
+                last_name="User",
+            )
+            for i in range(comments)
+        ]
+        self.db.add_all(users)
+        self.db.flush()
+
+        now = datetime.now()
+        self.db.add_all(ZoneImage(zone_id=zone.id, image_url=f"{zone.id}-{i}.jpg") for i in range(2))
+        self.db.add_all(
+            Comment(user_id=user.id, zone_id=zone.id, comment="Quiet", rating=4) for user in users
+        )
+        # Half of the predictions are from earlier days and must not be read.
+        self.db.add_all(
+            Prediction(
+                zone_id=zone.id,
+                score=0.9,
+                estimated_count=i,
+                first_seen=now - timedelta(days=i % 2, minutes=i),
+                last_seen=now - timedelta(days=i % 2),
+                scanned_minutes=5,
+            )
+            for i in range(predictions)
+        )
+        self.db.commit()
+        return zone.id
+
+    def _count_queries(self, zone_id: int) -> int:
+        self.db.expunge_all()
+        del self.statements[:]
+        get_info_zone_service(self.db, zone_id, comment_limit=100)
+        return len(self.statements)
+
+    def test_query_count_does_not_grow_with_history(self):
+        small_zone = self._add_zone(comments=2, predictions=4)
+        large_zone = self._add_zone(comments=50, predictions=400)
+
+        self.assertEqual(self._count_queries(small_zone), ZONE_INFO_QUERIES)
+        self.assertEqual(self._count_queries(large_zone), ZONE_INFO_QUERIES)
+
+
+if __name__ == "__main__":
+    unittest.main()